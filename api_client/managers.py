@@ -3,6 +3,7 @@ from django.db import models
 from django.utils import timezone
 
 from api_client.enums import ClientCodes
+from base.managers import BaseQuerySet
 
 
 class ClientLogQueryset(models.QuerySet):
@@ -12,7 +13,7 @@ class ClientLogQueryset(models.QuerySet):
         return self.filter(created_at__lt=deletion_time)
 
 
-class ClientConfigQueryset(models.QuerySet):
+class ClientConfigQueryset(BaseQuerySet):
     def is_disabled(self, client_code: ClientCodes):
         client_config, _ = self.get_or_create(client_code=client_code)
         return not client_config.enabled
@@ -0,0 +1,113 @@
+// Constants
+const DIRECT_UPLOAD_SELECTOR = 'input[type="file"][data-direct-upload]';
+// Number of parts uploaded at the same time
+const PARALLEL_UPLOADS = 4;
+
+// Types
+type DirectUpload = {
+  upload: string,
+  part_size: number,
+  part_urls: string[],
+};
+
+// Functions
+function getCsrfToken(form: HTMLFormElement) {
+  const input = form.querySelector('input[name="csrfmiddlewaretoken"]') as HTMLInputElement | null;
+  return input?.value ?? '';
+}
+
+async function postJson(url: string, data: object, csrfToken: string) {
+  const response = await fetch(url, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json', 'X-CSRFToken': csrfToken },
+    body: JSON.stringify(data),
+  });
+  if (!response.ok) {
+    throw new Error(await response.text());
+  }
+  return response.json();
+}
+
+/**
+ * Uploads the parts of the file, `PARALLEL_UPLOADS` at a time, and returns
+ * the pairs of part number and ETag to complete the upload.
+ */
+async function uploadParts(file: File, upload: DirectUpload) {
+  const parts: [number, string][] = [];
+  let nextPart = 0;
+
+  async function uploadNextParts() {
+    while (nextPart < upload.part_urls.length) {
+      const index = nextPart;
+      nextPart += 1;
+
+      const start = index * upload.part_size;
+      // eslint-disable-next-line no-await-in-loop
+      const response = await fetch(upload.part_urls[index], {
+        method: 'PUT',
+        body: file.slice(start, start + upload.part_size),
+      });
+      const etag = response.headers.get('ETag');
+      if (!response.ok || !etag) {
+        throw new Error(`Part ${index + 1} failed`);
+      }
+      parts.push([index + 1, etag]);
+    }
+  }
+
+  const workers = Math.min(PARALLEL_UPLOADS, upload.part_urls.length);
+  await Promise.all(Array.from({ length: workers }, uploadNextParts));
+  return parts;
+}
+
+/**
+ * Uploads the selected file of the input straight to the storage, and stores
+ * the token of the uploaded file in the hidden input of the form.
+ */
+async function directUpload(input: HTMLInputElement, form: HTMLFormElement) {
+  const file = input.files?.[0];
+  const tokenInput = document.getElementById(input.dataset.directUpload ?? '') as HTMLInputElement | null;
+  if (!file || !tokenInput || !input.dataset.directUploadUrl) return;
+
+  const csrfToken = getCsrfToken(form);
+  const startUrl = input.dataset.directUploadUrl;
+  const upload = await postJson(startUrl, {
+    name: file.name,
+    size: file.size,
+    content_type: file.type,
+  }, csrfToken) as DirectUpload;
+
+  const parts = await uploadParts(file, upload);
+  const { token } = await postJson(`${startUrl}complete/`, {
+    upload: upload.upload,
+    parts,
+  }, csrfToken) as { token: string };
+
+  tokenInput.value = token;
+  // the form doesn't send the file again
+  // eslint-disable-next-line no-param-reassign
+  input.value = '';
+}
+
+// Initialize behavior
+window.addEventListener('DOMContentLoaded', () => {
+  document.querySelectorAll(DIRECT_UPLOAD_SELECTOR).forEach((element) => {
+    const input = element as HTMLInputElement;
+    const { form } = input;
+    if (!form) return;
+
+    form.addEventListener('submit', (event) => {
+      if (!input.files?.length || input.dataset.directUploadFailed) return;
+
+      event.preventDefault();
+      event.stopImmediatePropagation();
+      const { submitter } = event as SubmitEvent;
+      directUpload(input, form)
+        .catch(() => {
+          // send the file with the form instead
+          input.dataset.directUploadFailed = 'true';
+        })
+        .finally(() => form.requestSubmit(submitter));
+    });
+  });
+});
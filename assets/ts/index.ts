@@ -15,6 +15,7 @@ import '../scss/main.scss';
 import './vendors/choices';
 
 // Behaviors
+import './behaviors/direct-upload';
 import './behaviors/input-rut';
 import './behaviors/regions';
 
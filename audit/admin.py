@@ -0,0 +1,192 @@
+from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
+from django.contrib.contenttypes.models import ContentType
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.urls import NoReverseMatch
+from django.urls import reverse
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+from django.utils.html import format_html
+from django.utils.translation import gettext_lazy as _
+
+from audit.managers import AuditLogEntryQuerySet
+from audit.models import AuditLogEntry
+from base.admin import ActionFilter
+from base.admin import FilterBase
+from base.audit import audited_models
+from users.models.user import User
+
+CURSOR_VAR = "cursor"
+
+
+class AuditUserFilter(FilterBase):
+    """Lists the users with entries without scanning the whole log."""
+
+    title = "user"
+    parameter_name = "user_id"
+
+    def lookups(self, request, model_admin):
+        user_ids = AuditLogEntry.objects.user_ids()
+        return tuple((u.id, str(u)) for u in User.objects.filter(pk__in=user_ids))
+
+
+class ContentTypeFilter(FilterBase):
+    title = "content type"
+    parameter_name = "content_type_id"
+
+    def lookups(self, request, model_admin):
+        content_types = ContentType.objects.get_for_models(*audited_models)
+        return sorted(
+            ((ct.id, str(ct)) for ct in content_types.values()),
+            key=lambda choice: choice[1],
+        )
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that counts the entries with the query planner estimate."""
+
+    @cached_property
+    def count(self):
+        if not isinstance(self.object_list, AuditLogEntryQuerySet):
+            # the history view paginates the admin LogEntry objects
+            return super().count
+        return self.object_list.estimated_count()
+
+
+class KeysetChangeList(ChangeList):
+    """
+    Change list paginated with a cursor on (action_time, id) instead of page
+    numbers: every page is read from the time index, however old it is.
+    """
+
+    def __init__(self, request, *args, **kwargs):
+        self.cursor = self.parse_cursor(request.GET.get(CURSOR_VAR))
+        super().__init__(request, *args, **kwargs)
+
+    def parse_cursor(self, value):
+        try:
+            action_time, pk = value.rsplit("_", 1)
+            return parse_datetime(action_time), int(pk)
+        except (AttributeError, TypeError, ValueError):
+            return None
+
+    def get_filters_params(self, params=None):
+        params = super().get_filters_params(params)
+        params.pop(CURSOR_VAR, None)
+        return params
+
+    def get_query_string(self, new_params=None, remove=None):
+        # filters and searches start again from the newest entries
+        return super().get_query_string(new_params, [*(remove or []), CURSOR_VAR])
+
+    def get_results(self, request):
+        self.paginator = self.model_admin.get_paginator(
+            request, self.queryset, self.list_per_page
+        )
+        queryset = self.queryset
+        if self.cursor and self.cursor[0]:
+            action_time, pk = self.cursor
+            queryset = queryset.filter(
+                Q(action_time__lt=action_time) | Q(action_time=action_time, pk__lt=pk)
+            )
+
+        entries = list(queryset[: self.list_per_page + 1])
+        self.result_list = entries[: self.list_per_page]
+        self.next_cursor = None
+        if len(entries) > self.list_per_page:
+            last = self.result_list[-1]
+            self.next_cursor = f"{last.action_time.isoformat()}_{last.pk}"
+
+        self.result_count = self.paginator.count
+        self.show_full_result_count = False
+        self.full_result_count = None
+        self.can_show_all = False
+        self.multi_page = bool(self.cursor or self.next_cursor)
+        self.load_users(self.result_list)
+
+    def load_users(self, entries):
+        # users are stored in the default database, they can't be joined
+        users = User.objects.in_bulk({entry.user_id for entry in entries})
+        for entry in entries:
+            entry.user = users.get(entry.user_id)
+
+    def first_page_url(self):
+        return self.get_query_string()
+
+    def next_page_url(self):
+        return self.get_query_string({CURSOR_VAR: self.next_cursor})
+
+
+@admin.register(AuditLogEntry)
+class AuditLogEntryAdmin(admin.ModelAdmin):
+    """
+    Admin class for the audit log.
+
+    The log is too big to count or to sort by arbitrary columns, so it is
+    paginated with a cursor, the number of entries is estimated, and it is
+    always sorted by time.
+    """
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    sortable_by = ()
+    list_filter = [
+        AuditUserFilter,
+        ActionFilter,
+        ContentTypeFilter,
+        "action_time",
+    ]
+    search_fields = ["=object_id"]
+    list_display = [
+        "action_time",
+        "user",
+        "object_link",
+        "action_flag",
+        "content_type",
+        "object_id",
+    ]
+    readonly_fields = ["user", "content_type"]
+    fields = [
+        "action_time",
+        "user",
+        "content_type",
+        "object_id",
+        "object_repr",
+        "action_flag",
+        "changes",
+    ]
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
+
+    # keep only view permission
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+    @admin.display(description=_("user"))
+    def user(self, obj):
+        if not hasattr(obj, "user"):
+            obj.user = User.objects.filter(pk=obj.user_id).first()
+        return obj.user
+
+    @admin.display(description=_("object"))
+    def object_link(self, obj):
+        if obj.is_deletion() or obj.object_id is None:
+            # deleted objects and operations over several objects have no page
+            return obj.object_repr
+
+        ct = obj.content_type
+        try:
+            url = reverse(
+                f"admin:{ct.app_label}_{ct.model}_change", args=[obj.object_id]
+            )
+        except NoReverseMatch:
+            return obj.object_repr
+        return format_html('<a href="{}">{}</a>', url, obj.object_repr)
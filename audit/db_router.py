@@ -0,0 +1,20 @@
+class AuditLogDbRouter:
+    """Stores the audit app models in the logs database, away from the audited data."""
+
+    LOG_DB = "logs"
+    APP_LABEL = "audit"
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label == self.APP_LABEL:
+            return self.LOG_DB
+        return None
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label == self.APP_LABEL:
+            return self.LOG_DB
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if app_label == self.APP_LABEL:
+            return db == self.LOG_DB
+        return None
@@ -0,0 +1,27 @@
+from django.contrib.admin.models import CHANGE
+from django.contrib.contenttypes.models import ContentType
+
+import pytest
+
+from audit.models import AuditLogEntry
+from audit.models import AuditSnapshot
+
+
+@pytest.fixture
+def audit_log_entry(regular_user, document_type) -> AuditLogEntry:
+    return AuditLogEntry.objects.create(
+        user_id=regular_user.id,
+        content_type_id=ContentType.objects.get_for_model(document_type).id,
+        object_id=str(document_type.id),
+        object_repr=str(document_type),
+        action_flag=CHANGE,
+        changes={"changed": {"fields": {"name": {"from": "Policy", "to": "Rule"}}}},
+    )
+
+
+@pytest.fixture
+def audit_snapshot(document_type) -> AuditSnapshot:
+    return AuditSnapshot.objects.create(
+        content_type_id=ContentType.objects.get_for_model(document_type).id,
+        rows={str(document_type.id): {"name": document_type.name}},
+    )
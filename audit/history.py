@@ -0,0 +1,215 @@
+"""
+Point-in-time reconstruction of audited models.
+
+The state of a model at a given time is rebuilt from the last `AuditSnapshot`
+taken before it, replaying only the `AuditLogEntry` objects stored after the
+snapshot, so the cost of a query is bounded by the snapshot interval instead of
+the size of the whole history. Most snapshots only keep the objects that
+changed since the previous one, and are applied over the last full snapshot.
+
+Entries are stored when their transaction commits, possibly after a snapshot
+taken later than their action time, so they are replayed from the highest
+entry id the snapshot saw instead of from the time it was taken.
+
+The log only keeps what the audit signals record: ignored and sensitive fields
+are not reconstructed, and the values of bulk operations that don't log them
+(`audited_bulk_create`, `audited_bulk_update`) are only known again from the
+next snapshot on.
+"""
+import datetime
+import json
+
+from django.conf import settings
+from django.contrib.admin.models import ADDITION
+from django.contrib.admin.models import CHANGE
+from django.contrib.admin.models import DELETION
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Max
+from django.db.models import Q
+from django.utils import timezone
+
+from audit.models import AuditLogEntry
+from audit.models import AuditSnapshot
+from base.audit import get_model_plan
+from base.serializers import AuditEncoder
+
+
+def take_snapshot(model, taken_at=None):
+    """
+    Store the current logged values of the objects of `model`. Only the
+    objects that changed since the previous snapshot are stored, except every
+    `AUDIT_FULL_SNAPSHOT_DAYS` days, when all of them are.
+    """
+    taken_at = taken_at or timezone.now()
+    # read before the objects: the changes missing from the snapshot are
+    # committed after them, so their entries are stored with a higher id
+    last_entry_id = AuditLogEntry.objects.aggregate(Max("id"))["id__max"]
+    plan = get_model_plan(model)
+    queryset = model._base_manager.values("pk", *plan.added_attnames)
+    # encoded as they are stored, to compare them with the snapshot values
+    rows = json.loads(
+        json.dumps(
+            {str(values.pop("pk")): values for values in queryset.iterator()},
+            cls=AuditEncoder,
+        )
+    )
+    content_type_id = ContentType.objects.get_for_model(model).id
+
+    last_full = AuditSnapshot.objects.filter(is_full=True).latest_before(
+        model, taken_at
+    )
+    full_interval = datetime.timedelta(days=settings.AUDIT_FULL_SNAPSHOT_DAYS)
+    if last_full is None or taken_at - last_full.taken_at >= full_interval:
+        return AuditSnapshot.objects.create(
+            taken_at=taken_at,
+            content_type_id=content_type_id,
+            rows=rows,
+            last_entry_id=last_entry_id,
+        )
+
+    previous_rows, _ = get_snapshot_rows(model, taken_at)
+    return AuditSnapshot.objects.create(
+        taken_at=taken_at,
+        content_type_id=content_type_id,
+        last_entry_id=last_entry_id,
+        is_full=False,
+        rows={
+            pk: values for pk, values in rows.items() if previous_rows.get(pk) != values
+        },
+        deleted_pks=[pk for pk in previous_rows if pk not in rows],
+    )
+
+
+def delete_expired_snapshots(model, now=None):
+    """
+    Delete the snapshots of `model` older than `AUDIT_SNAPSHOT_RETENTION_DAYS`,
+    except the ones the reconstructions of the retention period start from,
+    and return how many were deleted.
+    """
+    now = now or timezone.now()
+    retention = datetime.timedelta(days=settings.AUDIT_SNAPSHOT_RETENTION_DAYS)
+    deleted, _ = AuditSnapshot.objects.expired(model, now - retention).delete()
+    return deleted
+
+
+def get_snapshot_rows(model, when):
+    """
+    Return the values of the objects of `model` at its last snapshot taken
+    until `when`, by primary key, and that snapshot, or an empty dictionary
+    and None if there is no snapshot.
+    """
+    last_full = AuditSnapshot.objects.filter(is_full=True).latest_before(model, when)
+    if last_full is None:
+        return {}, None
+
+    rows = last_full.rows
+    snapshot = last_full
+    deltas = AuditSnapshot.objects.for_model(model).filter(
+        is_full=False, taken_at__gt=last_full.taken_at, taken_at__lte=when
+    )
+    for delta in deltas.order_by("taken_at").iterator():
+        rows.update(delta.rows)
+        for pk in delta.deleted_pks:
+            rows.pop(pk, None)
+        snapshot = delta
+    return rows, snapshot
+
+
+def get_rows_at(model, when, pk=None):
+    """
+    Return a dictionary with the logged values of the objects of `model` at
+    `when`, by primary key (as a string). When `pk` is given, only that object
+    is reconstructed.
+    """
+    rows, snapshot = get_snapshot_rows(model, when)
+    entries = AuditLogEntry.objects.for_model(model)
+    # without a last entry id, there was no entry when the snapshot was taken
+    if snapshot is not None and snapshot.last_entry_id is not None:
+        entries = entries.filter(id__gt=snapshot.last_entry_id)
+
+    if pk is not None:
+        pk = str(pk)
+        rows = {pk: rows[pk]} if pk in rows else {}
+        # entries of bulk operations have no object id
+        entries = entries.filter(Q(object_id=pk) | Q(object_id=None))
+
+    entries = entries.filter(action_time__lte=when).order_by("action_time", "id")
+    for entry in entries.iterator():
+        replay_entry(rows, entry)
+
+    if pk is not None:
+        rows = {key: values for key, values in rows.items() if key == pk}
+    return rows
+
+
+def get_objects_at(model, when):
+    """Return unsaved instances of `model` with their values at `when`"""
+    return [
+        build_instance(model, pk, values)
+        for pk, values in get_rows_at(model, when).items()
+    ]
+
+
+def get_object_at(model, pk, when):
+    """
+    Return an unsaved instance of `model` with the values of the object `pk`
+    at `when`, or None if it did not exist then.
+    """
+    values = get_rows_at(model, when, pk=pk).get(str(pk))
+    if values is None:
+        return None
+    return build_instance(model, str(pk), values)
+
+
+def replay_entry(rows, entry):
+    changes = entry.changes
+    if entry.object_id is not None:
+        object_ids = [entry.object_id]
+    else:
+        action = "added" if entry.action_flag == ADDITION else "changed"
+        object_ids = expand_pks(changes.get(action, {}).get("objects", {}))
+
+    for object_id in object_ids:
+        if entry.action_flag == ADDITION:
+            rows[object_id] = dict(changes["added"])
+            rows[object_id].pop("objects", None)
+        elif entry.action_flag == CHANGE:
+            fields = changes["changed"]["fields"]
+            if not isinstance(fields, dict):
+                # audited bulk updates only log the names of the changed fields
+                continue
+            values = rows.setdefault(object_id, {})
+            for attname, change in fields.items():
+                # sensitive fields are logged without their values
+                if isinstance(change, dict):
+                    values[attname] = change["to"]
+        elif entry.action_flag == DELETION:
+            rows.pop(object_id, None)
+
+
+def expand_pks(summary):
+    """Inverse of `base.managers.summarize_pks`, as strings"""
+    if "range" in summary:
+        first, last = summary["range"]
+        return [str(pk) for pk in range(first, last + 1)]
+    return [str(pk) for pk in summary.get("pks", [])]
+
+
+def build_instance(model, pk, values):
+    opts = model._meta
+    kwargs = {}
+    for name, attname in get_model_plan(model).fields:
+        if attname in values:
+            kwargs[attname] = to_python(opts.get_field(name), values[attname])
+
+    instance = model(**kwargs)
+    instance.pk = opts.pk.to_python(pk)
+    instance._state.adding = False
+    return instance
+
+
+def to_python(field, value):
+    if value is None:
+        return None
+    # files are logged with their stored name, which FileField keeps as is
+    return field.to_python(value)
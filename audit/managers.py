@@ -0,0 +1,86 @@
+import json
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import connections
+from django.db import models
+from django.db.models import Q
+
+# loose index scan over the (user_id, action_time) index: one index lookup per
+# distinct user instead of reading the whole table
+USER_IDS_SQL = """
+WITH RECURSIVE users AS (
+    (
+        SELECT user_id FROM {table}
+        WHERE user_id IS NOT NULL ORDER BY user_id LIMIT 1
+    )
+    UNION ALL
+    SELECT (
+        SELECT user_id FROM {table}
+        WHERE user_id > users.user_id ORDER BY user_id LIMIT 1
+    )
+    FROM users WHERE users.user_id IS NOT NULL
+)
+SELECT user_id FROM users WHERE user_id IS NOT NULL
+"""
+
+
+class AuditLogEntryQuerySet(models.QuerySet):
+    def for_object(self, obj):
+        """Entries of the given object, uses the (content type, object id) index"""
+        return self.filter(
+            content_type_id=ContentType.objects.get_for_model(obj).id,
+            object_id=str(obj.pk),
+        )
+
+    def for_model(self, model):
+        return self.filter(content_type_id=ContentType.objects.get_for_model(model).id)
+
+    def changed_field(self, name):
+        """Entries that changed the given field, uses the GIN index of `changes`"""
+        return self.filter(
+            # {"from", "to"} values of single objects and audited updates
+            Q(changes__contains={"changed": {"fields": {name: {}}}})
+            # values of sensitive fields
+            | Q(changes__contains={"changed": {"fields": {name: "field updated"}}})
+            # field lists of audited bulk updates
+            | Q(changes__contains={"changed": {"fields": [name]}})
+        )
+
+    def estimated_count(self):
+        """
+        Return the number of entries the query planner expects the queryset to
+        return, which does not need to read the matching rows like `count`.
+        """
+        plan = json.loads(self.order_by().explain(format="json"))
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    def user_ids(self):
+        """Return the ids of the users with entries in the log"""
+        table = connections[self.db].ops.quote_name(self.model._meta.db_table)
+        with connections[self.db].cursor() as cursor:
+            cursor.execute(USER_IDS_SQL.format(table=table))
+            return [user_id for user_id, in cursor.fetchall()]
+
+
+class AuditSnapshotQuerySet(models.QuerySet):
+    def for_model(self, model):
+        return self.filter(content_type_id=ContentType.objects.get_for_model(model).id)
+
+    def latest_before(self, model, when):
+        """Return the last snapshot of `model` taken until `when`, or None"""
+        return (
+            self.for_model(model)
+            .filter(taken_at__lte=when)
+            .order_by("-taken_at")
+            .first()
+        )
+
+    def expired(self, model, when):
+        """
+        Snapshots of `model` taken before its last full snapshot until `when`,
+        which are no longer needed to rebuild the objects from `when` on.
+        """
+        last_full = self.filter(is_full=True).latest_before(model, when)
+        if last_full is None:
+            return self.none()
+        return self.for_model(model).filter(taken_at__lt=last_full.taken_at)
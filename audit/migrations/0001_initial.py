@@ -0,0 +1,148 @@
+import django.contrib.postgres.indexes
+import django.utils.timezone
+
+from django.db import migrations
+from django.db import models
+
+import base.serializers
+
+# The table is partitioned by month of action_time, which Django can't create by
+# itself: the schema is created with SQL, and the state with the usual operations.
+# Postgres requires the partition key in the primary key of partitioned tables.
+CREATE_TABLE_SQL = """
+CREATE TABLE "audit_auditlogentry" (
+    "id" bigint GENERATED BY DEFAULT AS IDENTITY,
+    "action_time" timestamp with time zone NOT NULL,
+    "user_id" bigint NULL,
+    "content_type_id" integer NOT NULL,
+    "object_id" text NULL,
+    "object_repr" varchar(200) NOT NULL,
+    "action_flag" smallint NOT NULL CHECK ("action_flag" >= 0),
+    "changes" jsonb NOT NULL,
+    PRIMARY KEY ("id", "action_time")
+) PARTITION BY RANGE ("action_time");
+
+CREATE TABLE "audit_auditlogentry_default"
+PARTITION OF "audit_auditlogentry" DEFAULT;
+
+CREATE INDEX "audit_entry_object_idx"
+ON "audit_auditlogentry" ("content_type_id", "object_id", "action_time");
+
+CREATE INDEX "audit_entry_user_idx"
+ON "audit_auditlogentry" ("user_id", "action_time");
+
+CREATE INDEX "audit_entry_time_idx"
+ON "audit_auditlogentry" ("action_time", "id");
+
+CREATE INDEX "audit_entry_changes_idx"
+ON "audit_auditlogentry" USING gin ("changes" jsonb_path_ops);
+"""
+
+DROP_TABLE_SQL = 'DROP TABLE "audit_auditlogentry" CASCADE;'
+
+
+def create_partitions(apps, schema_editor):
+    from audit.partitions import create_partitions
+
+    create_partitions(using=schema_editor.connection.alias)
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(CREATE_TABLE_SQL, DROP_TABLE_SQL),
+                migrations.RunPython(create_partitions, migrations.RunPython.noop),
+            ],
+            state_operations=[
+                migrations.CreateModel(
+                    name="AuditLogEntry",
+                    fields=[
+                        (
+                            "id",
+                            models.BigAutoField(
+                                auto_created=True,
+                                primary_key=True,
+                                serialize=False,
+                                verbose_name="ID",
+                            ),
+                        ),
+                        (
+                            "action_time",
+                            models.DateTimeField(
+                                default=django.utils.timezone.now,
+                                editable=False,
+                                verbose_name="action time",
+                            ),
+                        ),
+                        (
+                            "user_id",
+                            models.BigIntegerField(null=True, verbose_name="user"),
+                        ),
+                        (
+                            "content_type_id",
+                            models.IntegerField(verbose_name="content type"),
+                        ),
+                        (
+                            "object_id",
+                            models.TextField(null=True, verbose_name="object id"),
+                        ),
+                        (
+                            "object_repr",
+                            models.CharField(
+                                max_length=200, verbose_name="object repr"
+                            ),
+                        ),
+                        (
+                            "action_flag",
+                            models.PositiveSmallIntegerField(
+                                choices=[
+                                    (1, "Addition"),
+                                    (2, "Change"),
+                                    (3, "Deletion"),
+                                ],
+                                verbose_name="action flag",
+                            ),
+                        ),
+                        (
+                            "changes",
+                            models.JSONField(
+                                default=dict,
+                                encoder=base.serializers.ModelEncoder,
+                                verbose_name="changes",
+                            ),
+                        ),
+                    ],
+                    options={
+                        "verbose_name": "audit log entry",
+                        "verbose_name_plural": "audit log entries",
+                        "ordering": ("-action_time", "-id"),
+                        "indexes": [
+                            models.Index(
+                                fields=["content_type_id", "object_id", "action_time"],
+                                name="audit_entry_object_idx",
+                            ),
+                            models.Index(
+                                fields=["user_id", "action_time"],
+                                name="audit_entry_user_idx",
+                            ),
+                            models.Index(
+                                fields=["action_time", "id"],
+                                name="audit_entry_time_idx",
+                            ),
+                            django.contrib.postgres.indexes.GinIndex(
+                                fields=["changes"],
+                                name="audit_entry_changes_idx",
+                                opclasses=["jsonb_path_ops"],
+                            ),
+                        ],
+                    },
+                ),
+            ],
+        ),
+    ]
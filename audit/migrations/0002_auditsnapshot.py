@@ -0,0 +1,59 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:44
+
+import django.utils.timezone
+
+from django.db import migrations
+from django.db import models
+
+import base.serializers
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("audit", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AuditSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "taken_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, verbose_name="taken at"
+                    ),
+                ),
+                ("content_type_id", models.IntegerField(verbose_name="content type")),
+                (
+                    "rows",
+                    models.JSONField(
+                        default=dict,
+                        encoder=base.serializers.ModelEncoder,
+                        verbose_name="rows",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "audit snapshot",
+                "verbose_name_plural": "audit snapshots",
+                "ordering": ("-taken_at",),
+                "get_latest_by": "taken_at",
+                "indexes": [
+                    models.Index(
+                        fields=["content_type_id", "taken_at"],
+                        name="audit_snapshot_model_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.30 on 2026-10-18 13:04
+
+from django.db import migrations
+from django.db import models
+
+import base.serializers
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("audit", "0002_auditsnapshot"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="auditsnapshot",
+            name="deleted_pks",
+            field=models.JSONField(default=list, verbose_name="deleted primary keys"),
+        ),
+        migrations.AddField(
+            model_name="auditsnapshot",
+            name="is_full",
+            field=models.BooleanField(default=True, verbose_name="is full"),
+        ),
+        migrations.AlterField(
+            model_name="auditlogentry",
+            name="changes",
+            field=models.JSONField(
+                default=dict,
+                encoder=base.serializers.AuditEncoder,
+                verbose_name="changes",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="auditsnapshot",
+            name="rows",
+            field=models.JSONField(
+                default=dict, encoder=base.serializers.AuditEncoder, verbose_name="rows"
+            ),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.30 on 2026-10-18 14:16
+
+from django.db import migrations
+from django.db import models
+
+# the existing snapshots replay the entries logged after them, as before
+SET_LAST_ENTRY_SQL = """
+UPDATE "audit_auditsnapshot" SET "last_entry_id" = (
+    SELECT MAX("id") FROM "audit_auditlogentry"
+    WHERE "action_time" <= "audit_auditsnapshot"."taken_at"
+)
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("audit", "0003_snapshot_deltas"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="auditsnapshot",
+            name="last_entry_id",
+            field=models.BigIntegerField(null=True, verbose_name="last log entry"),
+        ),
+        migrations.RunSQL(SET_LAST_ENTRY_SQL, reverse_sql=migrations.RunSQL.noop),
+    ]
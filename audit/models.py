@@ -0,0 +1,157 @@
+from django.contrib.admin.models import ACTION_FLAG_CHOICES
+from django.contrib.admin.models import ADDITION
+from django.contrib.admin.models import CHANGE
+from django.contrib.admin.models import DELETION
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.postgres.indexes import GinIndex
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from audit.managers import AuditLogEntryQuerySet
+from audit.managers import AuditSnapshotQuerySet
+from base.serializers import AuditEncoder
+
+
+class AuditLogEntry(models.Model):
+    """
+    A change made to an audited model.
+
+    Entries are stored in the logs database, in a table partitioned by month of
+    `action_time` (see `audit.partitions`). Users and content types live in the
+    default database, so they are referenced by id instead of foreign keys.
+    """
+
+    action_time = models.DateTimeField(
+        default=timezone.now,
+        editable=False,
+        verbose_name=_("action time"),
+    )
+    user_id = models.BigIntegerField(
+        null=True,
+        verbose_name=_("user"),
+    )
+    content_type_id = models.IntegerField(
+        verbose_name=_("content type"),
+    )
+    # null in the entries of operations over several objects, like in LogEntry
+    object_id = models.TextField(  # noqa: DJ001
+        null=True,
+        verbose_name=_("object id"),
+    )
+    object_repr = models.CharField(
+        max_length=200,
+        verbose_name=_("object repr"),
+    )
+    action_flag = models.PositiveSmallIntegerField(
+        choices=ACTION_FLAG_CHOICES,
+        verbose_name=_("action flag"),
+    )
+    changes = models.JSONField(
+        default=dict,
+        encoder=AuditEncoder,
+        verbose_name=_("changes"),
+    )
+
+    objects = AuditLogEntryQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = _("audit log entry")
+        verbose_name_plural = _("audit log entries")
+        ordering = ("-action_time", "-id")
+        indexes = [
+            models.Index(
+                fields=["content_type_id", "object_id", "action_time"],
+                name="audit_entry_object_idx",
+            ),
+            models.Index(
+                fields=["user_id", "action_time"],
+                name="audit_entry_user_idx",
+            ),
+            models.Index(
+                fields=["action_time", "id"],
+                name="audit_entry_time_idx",
+            ),
+            GinIndex(
+                fields=["changes"],
+                opclasses=["jsonb_path_ops"],
+                name="audit_entry_changes_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.get_action_flag_display()}: {self.object_repr}"
+
+    @property
+    def content_type(self):
+        return ContentType.objects.get_for_id(self.content_type_id)
+
+    def is_addition(self):
+        return self.action_flag == ADDITION
+
+    def is_change(self):
+        return self.action_flag == CHANGE
+
+    def is_deletion(self):
+        return self.action_flag == DELETION
+
+
+class AuditSnapshot(models.Model):
+    """
+    The state of the objects of an audited model at a given time.
+
+    Full snapshots keep every object, and the others only the objects added or
+    changed since the previous snapshot of the model and the primary keys of
+    the deleted ones. Snapshots are the starting point of the point-in-time
+    reconstructions of `audit.history`, which only need to replay the entries
+    logged after them.
+    """
+
+    taken_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name=_("taken at"),
+    )
+    content_type_id = models.IntegerField(
+        verbose_name=_("content type"),
+    )
+    is_full = models.BooleanField(
+        default=True,
+        verbose_name=_("is full"),
+    )
+    # logged values of each object, by primary key
+    rows = models.JSONField(
+        default=dict,
+        encoder=AuditEncoder,
+        verbose_name=_("rows"),
+    )
+    deleted_pks = models.JSONField(
+        default=list,
+        verbose_name=_("deleted primary keys"),
+    )
+    # highest log entry id when the snapshot was taken, the entries stored
+    # after it are replayed, whatever their action time
+    last_entry_id = models.BigIntegerField(
+        null=True,
+        verbose_name=_("last log entry"),
+    )
+
+    objects = AuditSnapshotQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = _("audit snapshot")
+        verbose_name_plural = _("audit snapshots")
+        ordering = ("-taken_at",)
+        get_latest_by = "taken_at"
+        indexes = [
+            models.Index(
+                fields=["content_type_id", "taken_at"],
+                name="audit_snapshot_model_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.content_type} @ {self.taken_at.isoformat()}"
+
+    @property
+    def content_type(self):
+        return ContentType.objects.get_for_id(self.content_type_id)
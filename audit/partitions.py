@@ -0,0 +1,53 @@
+"""
+Monthly range partitions of the audit log table.
+
+The table is partitioned by `action_time`, so the entries of old months can be
+detached or dropped without a costly DELETE, and the queries filtered by date
+only read the partitions of the requested months. A default partition stores
+the entries of the months that have no partition yet.
+"""
+import datetime
+
+from django.db import connections
+from django.utils import timezone
+
+from audit.models import AuditLogEntry
+
+PARTITION_SQL = """
+CREATE TABLE IF NOT EXISTS {partition} PARTITION OF {table}
+FOR VALUES FROM (%s) TO (%s)
+"""
+
+
+def month_start(date):
+    return datetime.datetime(date.year, date.month, 1, tzinfo=datetime.timezone.utc)
+
+
+def next_month(date):
+    return month_start(month_start(date) + datetime.timedelta(days=32))
+
+
+def get_partition_name(date):
+    return f"{AuditLogEntry._meta.db_table}_y{date.year}m{date.month:02d}"
+
+
+def create_partitions(months=3, start=None, using="logs"):
+    """
+    Create the partitions of `months` months from the month of `start` (the
+    current one by default) on, skipping those that already exist.
+    """
+    connection = connections[using]
+    quote_name = connection.ops.quote_name
+    table = quote_name(AuditLogEntry._meta.db_table)
+    date = month_start(start or timezone.now())
+    partitions = []
+    with connection.cursor() as cursor:
+        for _ in range(months):
+            partition = get_partition_name(date)
+            cursor.execute(
+                PARTITION_SQL.format(partition=quote_name(partition), table=table),
+                [date, next_month(date)],
+            )
+            partitions.append(partition)
+            date = next_month(date)
+    return partitions
@@ -0,0 +1,33 @@
+# others libraries
+from celery.utils.log import get_task_logger
+
+from audit.history import delete_expired_snapshots
+from audit.history import take_snapshot
+from audit.partitions import create_partitions
+from base.audit import audited_models
+from project.celeryconf import app
+
+logger = get_task_logger(__name__)
+
+
+@app.task
+def create_audit_log_partitions():
+    """Creates the audit log partitions of the coming months before they start"""
+    partitions = create_partitions()
+    logger.info(f"Audit log partitions: {', '.join(partitions)}")
+
+
+@app.task
+def take_audit_snapshots():
+    """
+    Snapshots every audited model, so point-in-time queries only replay the
+    log entries of one snapshot interval, and deletes the expired snapshots
+    """
+    for model in audited_models:
+        snapshot = take_snapshot(model)
+        deleted = delete_expired_snapshots(model)
+        logger.info(
+            f"Snapshot of {model._meta.label}: {len(snapshot.rows)} rows"
+            f" ({'full' if snapshot.is_full else 'changed'}),"
+            f" {deleted} expired snapshots deleted"
+        )
@@ -0,0 +1,305 @@
+import datetime
+
+from django.contrib.admin.models import ADDITION
+from django.contrib.admin.models import CHANGE
+from django.contrib.admin.models import DELETION
+from django.contrib.contenttypes.models import ContentType
+from django.db import connections
+from django.urls import reverse
+from django.utils import timezone
+
+import pytest
+
+from audit.admin import AuditLogEntryAdmin
+from audit.db_router import AuditLogDbRouter
+from audit.history import delete_expired_snapshots
+from audit.history import get_object_at
+from audit.history import get_objects_at
+from audit.history import get_rows_at
+from audit.history import take_snapshot
+from audit.models import AuditLogEntry
+from audit.models import AuditSnapshot
+from audit.partitions import create_partitions
+from audit.partitions import get_partition_name
+from audit.tasks import take_audit_snapshots
+from base.audit import audited_models
+from base.request_context import user_context
+from documents.models.document_type import DocumentType
+from documents.models.evidence import Evidence
+
+pytestmark = pytest.mark.django_db(databases=["default", "logs"])
+
+JANUARY = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def day(number):
+    return JANUARY + datetime.timedelta(days=number)
+
+
+def log(model, action_flag, changes, object_id=None, action_time=None):
+    return AuditLogEntry.objects.create(
+        action_time=action_time,
+        content_type_id=ContentType.objects.get_for_model(model).id,
+        object_id=object_id,
+        object_repr="object",
+        action_flag=action_flag,
+        changes=changes,
+    )
+
+
+@pytest.fixture
+def audit_log_entries(regular_user, superuser_user, document_type):
+    content_type_id = ContentType.objects.get_for_model(DocumentType).id
+    return AuditLogEntry.objects.bulk_create(
+        AuditLogEntry(
+            action_time=datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+            + datetime.timedelta(days=i),
+            user_id=(regular_user if i % 2 else superuser_user).id,
+            content_type_id=content_type_id,
+            object_id=str(document_type.id),
+            object_repr=str(document_type),
+            action_flag=CHANGE,
+            changes={"changed": {"fields": {"name": {"from": i, "to": i + 1}}}},
+        )
+        for i in range(5)
+    )
+
+
+def test_router():
+    router = AuditLogDbRouter()
+    assert router.db_for_read(AuditLogEntry) == "logs"
+    assert router.db_for_write(AuditLogEntry) == "logs"
+    assert router.db_for_write(AuditSnapshot) == "logs"
+    assert router.db_for_write(DocumentType) is None
+    assert router.allow_migrate("logs", "audit", "auditlogentry")
+    assert not router.allow_migrate("default", "audit", "auditlogentry")
+    assert router.allow_migrate("default", "documents", "documenttype") is None
+
+
+def test_create_partitions():
+    start = datetime.datetime(2030, 11, 15, tzinfo=datetime.timezone.utc)
+    assert create_partitions(months=3, start=start) == [
+        "audit_auditlogentry_y2030m11",
+        "audit_auditlogentry_y2030m12",
+        "audit_auditlogentry_y2031m01",
+    ]
+    # existing partitions are skipped
+    assert create_partitions(months=1, start=start) == ["audit_auditlogentry_y2030m11"]
+
+    entry = AuditLogEntry.objects.create(
+        action_time=start,
+        content_type_id=1,
+        object_repr="object",
+        action_flag=ADDITION,
+    )
+    with connections["logs"].cursor() as cursor:
+        cursor.execute(
+            "SELECT tableoid::regclass::text FROM audit_auditlogentry WHERE id = %s",
+            [entry.id],
+        )
+        assert cursor.fetchone()[0] == get_partition_name(start)
+
+
+def test_for_object(audit_log_entry, document_type):
+    assert list(AuditLogEntry.objects.for_object(document_type)) == [audit_log_entry]
+    assert not AuditLogEntry.objects.for_model(ContentType).exists()
+
+
+def test_changed_field(audit_log_entry):
+    bulk_entry = AuditLogEntry.objects.create(
+        content_type_id=audit_log_entry.content_type_id,
+        object_repr="2 document types",
+        action_flag=CHANGE,
+        changes={"changed": {"fields": ["name"], "objects": {"count": 2}}},
+    )
+    assert set(AuditLogEntry.objects.changed_field("name")) == {
+        audit_log_entry,
+        bulk_entry,
+    }
+    assert not AuditLogEntry.objects.changed_field("code").exists()
+
+
+def test_estimated_count(audit_log_entries):
+    assert isinstance(AuditLogEntry.objects.estimated_count(), int)
+
+
+def test_user_ids(audit_log_entries, regular_user, superuser_user):
+    assert sorted(AuditLogEntry.objects.user_ids()) == sorted(
+        [regular_user.id, superuser_user.id]
+    )
+
+
+def test_admin_keyset_pagination(audit_log_entries, superuser_client, monkeypatch):
+    monkeypatch.setattr(AuditLogEntryAdmin, "list_per_page", 2)
+    url = reverse("admin:audit_auditlogentry_changelist")
+
+    response = superuser_client.get(url)
+    changelist = response.context["cl"]
+    assert changelist.result_list == audit_log_entries[:2:-1]
+    assert changelist.next_cursor
+
+    response = superuser_client.get(url + changelist.next_page_url())
+    changelist = response.context["cl"]
+    assert changelist.result_list == audit_log_entries[2:0:-1]
+
+    response = superuser_client.get(url + changelist.next_page_url())
+    changelist = response.context["cl"]
+    assert changelist.result_list == audit_log_entries[:1]
+    assert changelist.next_cursor is None
+
+
+def test_admin_filters(audit_log_entries, regular_user, superuser_client):
+    url = reverse("admin:audit_auditlogentry_changelist")
+    response = superuser_client.get(url, {"user_id": regular_user.id})
+    changelist = response.context["cl"]
+    assert [entry.user for entry in changelist.result_list] == [regular_user] * 2
+
+
+def test_get_rows_at_replays_the_log():
+    log(DocumentType, ADDITION, {"added": {"name": "Policy"}}, "1", day(1))
+    log(
+        DocumentType,
+        CHANGE,
+        {"changed": {"fields": {"name": {"from": "Policy", "to": "Rule"}}}},
+        "1",
+        day(2),
+    )
+    log(DocumentType, DELETION, {"Deleted": None}, "1", day(3))
+
+    assert get_rows_at(DocumentType, day(0)) == {}
+    assert get_rows_at(DocumentType, day(1)) == {"1": {"name": "Policy"}}
+    assert get_rows_at(DocumentType, day(2)) == {"1": {"name": "Rule"}}
+    assert get_rows_at(DocumentType, day(3)) == {}
+
+
+def test_get_rows_at_starts_from_the_last_snapshot(document_type):
+    # entries logged before the snapshot are not replayed
+    log(DocumentType, ADDITION, {"added": {"name": "Wrong"}}, "0", day(1))
+    take_snapshot(DocumentType, taken_at=day(2))
+    log(
+        DocumentType,
+        CHANGE,
+        {"changed": {"fields": {"name": {"from": "Policy", "to": "Rule"}}}},
+        str(document_type.id),
+        day(3),
+    )
+
+    assert get_rows_at(DocumentType, day(1)) == {"0": {"name": "Wrong"}}
+    assert get_rows_at(DocumentType, day(2)) == {
+        str(document_type.id): {
+            "created_by_id": None,
+            "updated_by_id": None,
+            "name": document_type.name,
+        }
+    }
+    assert get_rows_at(DocumentType, day(3))[str(document_type.id)]["name"] == "Rule"
+
+
+def test_get_rows_at_replays_the_entries_stored_after_the_snapshot(document_type):
+    snapshot = take_snapshot(DocumentType, taken_at=day(2))
+    # committed after the snapshot, by a transaction that started before it
+    log(DocumentType, ADDITION, {"added": {"name": "Late"}}, "0", day(1))
+
+    assert snapshot.last_entry_id is None
+    assert get_rows_at(DocumentType, day(2))["0"] == {"name": "Late"}
+    assert get_rows_at(DocumentType, day(1)) == {"0": {"name": "Late"}}
+
+
+def test_get_rows_at_replays_bulk_operations():
+    AuditSnapshot.objects.create(
+        taken_at=day(1),
+        content_type_id=ContentType.objects.get_for_model(DocumentType).id,
+        rows={str(pk): {"name": f"Type {pk}"} for pk in range(1, 5)},
+    )
+    log(
+        DocumentType,
+        CHANGE,
+        {
+            "changed": {
+                "fields": {"name": {"to": "Renamed"}},
+                "objects": {"count": 3, "range": [1, 3]},
+            }
+        },
+        action_time=day(2),
+    )
+
+    assert get_rows_at(DocumentType, day(2)) == {
+        "1": {"name": "Renamed"},
+        "2": {"name": "Renamed"},
+        "3": {"name": "Renamed"},
+        "4": {"name": "Type 4"},
+    }
+    assert get_rows_at(DocumentType, day(2), pk=4) == {"4": {"name": "Type 4"}}
+
+
+def test_get_object_at(document_type, regular_user, django_capture_on_commit_callbacks):
+    created_at = document_type.created_at
+    with user_context(regular_user), django_capture_on_commit_callbacks(execute=True):
+        document_type.name = "Renamed"
+        document_type.save()
+
+    instance = get_object_at(DocumentType, document_type.id, timezone.now())
+    assert isinstance(instance, DocumentType)
+    assert instance.pk == document_type.pk
+    assert instance.name == "Renamed"
+    assert not instance._state.adding
+    assert get_object_at(DocumentType, document_type.id, created_at) is None
+    assert get_objects_at(DocumentType, timezone.now()) == [instance]
+
+
+def test_take_audit_snapshots(document_type):
+    take_audit_snapshots()
+    assert AuditSnapshot.objects.count() == len(audited_models)
+    snapshot = AuditSnapshot.objects.for_model(DocumentType).get()
+    assert snapshot.rows[str(document_type.id)]["name"] == document_type.name
+
+
+def test_snapshots_only_keep_the_changes(document_type, settings):
+    settings.AUDIT_FULL_SNAPSHOT_DAYS = 30
+    other_type = DocumentType.objects.create(name="Other")
+    other_pk = str(other_type.pk)
+    full = take_snapshot(DocumentType, taken_at=day(1))
+    DocumentType.objects.filter(pk=document_type.pk).update(name="Renamed")
+    other_type.delete()
+    delta = take_snapshot(DocumentType, taken_at=day(2))
+
+    assert full.is_full
+    assert set(full.rows) == {str(document_type.pk), other_pk}
+    assert not delta.is_full
+    assert list(delta.rows) == [str(document_type.pk)]
+    assert delta.deleted_pks == [other_pk]
+    assert get_rows_at(DocumentType, day(1))[other_pk]["name"] == "Other"
+    assert get_rows_at(DocumentType, day(2)) == {
+        str(document_type.pk): delta.rows[str(document_type.pk)]
+    }
+    assert get_object_at(DocumentType, document_type.pk, day(2)).name == "Renamed"
+
+    assert not take_snapshot(DocumentType, taken_at=day(3)).rows
+    assert take_snapshot(DocumentType, taken_at=day(31)).is_full
+
+
+def test_delete_expired_snapshots(document_type, settings):
+    settings.AUDIT_FULL_SNAPSHOT_DAYS = 2
+    settings.AUDIT_SNAPSHOT_RETENTION_DAYS = 3
+    snapshots = [take_snapshot(DocumentType, taken_at=day(i)) for i in range(6)]
+    assert [snapshot.is_full for snapshot in snapshots] == [True, False] * 3
+
+    # the snapshots of day 2 and 3 still rebuild the objects of day 3 and 4
+    assert delete_expired_snapshots(DocumentType, now=day(6)) == 2
+    assert (
+        list(AuditSnapshot.objects.for_model(DocumentType).order_by("taken_at"))
+        == snapshots[2:]
+    )
+
+
+def test_files_are_logged_with_their_name(
+    django_file, regular_user, settings, tmp_path, django_capture_on_commit_callbacks
+):
+    settings.MEDIA_ROOT = tmp_path
+    with user_context(regular_user), django_capture_on_commit_callbacks(execute=True):
+        evidence = Evidence.objects.create(file=django_file)
+
+    entry = AuditLogEntry.objects.for_object(evidence).get()
+    assert entry.changes["added"]["file"] == evidence.file.name
+    instance = get_object_at(Evidence, evidence.pk, timezone.now())
+    assert instance.file.name == evidence.file.name
@@ -87,7 +87,8 @@ class LogEntryAdmin(admin.ModelAdmin):
 
     @admin.display(ordering="object_repr", description=_("object"))
     def object_link(self, obj):
-        if obj.action_flag == DELETION:
+        if obj.action_flag == DELETION or obj.object_id is None:
+            # deleted objects and operations over several objects have no history
             link = obj.object_repr
         else:
             ct = obj.content_type
@@ -1,5 +1,6 @@
 from django.apps import AppConfig
 from django.contrib.admin.apps import AdminConfig
+from django.db.models.signals import m2m_changed
 from django.db.models.signals import post_delete
 from django.db.models.signals import post_save
 
@@ -8,14 +9,23 @@ class BaseConfig(AppConfig):
     name = "base"
 
     def ready(self):
-        # Register post_save and post_delete handlers
+        # Register the audited models and their post_save and post_delete handlers,
+        # and the handlers that invalidate the cached values that depend on them
         from base import signals
+        from base.audit import register_audited_model
         from base.models import BaseModel
+        from base.utils import get_our_models
         from base.utils import get_subclasses
 
+        our_models = set(get_our_models())
         for subclass in get_subclasses(BaseModel):
             if subclass._meta.abstract or subclass._meta.proxy:
                 continue
+            # only models created in our apps are audited
+            if subclass not in our_models:
+                continue
+
+            register_audited_model(subclass)
 
             post_save.connect(
                 signals.audit_log,
@@ -27,6 +37,22 @@ class BaseConfig(AppConfig):
                 sender=subclass,
                 dispatch_uid=subclass.__name__.lower() + "_post_delete",
             )
+            post_save.connect(
+                signals.bump_cache_generations,
+                sender=subclass,
+                dispatch_uid=subclass.__name__.lower() + "_post_save_cache",
+            )
+            post_delete.connect(
+                signals.bump_cache_generations,
+                sender=subclass,
+                dispatch_uid=subclass.__name__.lower() + "_post_delete_cache",
+            )
+            for field in subclass._meta.local_many_to_many:
+                m2m_changed.connect(
+                    signals.bump_m2m_cache_generations,
+                    sender=field.remote_field.through,
+                    dispatch_uid=f"{subclass.__name__.lower()}_{field.name}_m2m_cache",
+                )
 
 
 class BaseAdminConfig(AdminConfig):
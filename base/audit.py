@@ -0,0 +1,243 @@
+""" Audit log support: per-model field plans and the buffered log entry writer """
+import contextlib
+import contextvars
+import json
+import threading
+import weakref
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import DEFAULT_DB_ALIAS
+from django.db import transaction
+from django.dispatch import receiver
+
+from asgiref.sync import sync_to_async
+
+from audit.models import AuditLogEntry
+from base.serializers import AuditEncoder
+
+# AuditLogEntry fields sent to celery when log writes are offloaded
+LOG_ENTRY_FIELDS = (
+    "action_time",
+    "user_id",
+    "content_type_id",
+    "object_id",
+    "object_repr",
+    "action_flag",
+    "changes",
+)
+
+
+class ModelPlan:
+    """
+    Field information of a model, computed once and used to log its changes and
+    to serialize its instances without inspecting `_meta` on every call.
+    """
+
+    def __init__(self, model):
+        opts = model._meta
+        self.model = model
+        self.ignored_fields = frozenset(settings.LOG_IGNORE_FIELDS)
+        self.sensitive_fields = frozenset(settings.LOG_SENSITIVE_FIELDS)
+        # concrete fields, in the order Django passes them to `Model.__init__`
+        self.concrete_attnames = tuple(f.attname for f in opts.concrete_fields)
+        # (name, attname) pairs of the fields stored in the model table
+        self.fields = tuple((f.name, f.attname) for f in opts.fields)
+        self.field_names = frozenset(f.name for f in opts.fields)
+        self.m2m_fields = tuple(f.name for f in opts.many_to_many)
+        self.logged_attnames = self.get_attnames(exclude=self.ignored_fields)
+        self.added_attnames = self.get_attnames(
+            exclude=self.ignored_fields | self.sensitive_fields
+        )
+        self._cache = {}
+
+    def get_attnames(self, fields=None, exclude=None):
+        return tuple(
+            attname
+            for name, attname in self.fields
+            if (not fields or name in fields) and not (exclude and name in exclude)
+        )
+
+    def get_m2m_fields(self, fields=None, exclude=None):
+        return tuple(
+            name
+            for name in self.m2m_fields
+            if (not fields or name in fields) and not (exclude and name in exclude)
+        )
+
+    def get_field_plan(self, fields=None, exclude=None):
+        """
+        Return the attnames and many to many fields selected by the `fields` and
+        `exclude` arguments of `BaseModel.to_dict`, caching the result.
+        """
+        key = (as_hashable(fields), as_hashable(exclude))
+        try:
+            return self._cache[key]
+        except KeyError:
+            fields = frozenset(fields) if fields else None
+            exclude = frozenset(exclude) if exclude else None
+            plan = self._cache[key] = (
+                self.get_attnames(fields, exclude),
+                self.get_m2m_fields(fields, exclude),
+            )
+            return plan
+
+
+def as_hashable(value):
+    if value is None or isinstance(value, frozenset | tuple):
+        return value
+    return tuple(value)
+
+
+# plans of the models whose changes are logged, filled by `BaseConfig.ready()`
+audited_models = {}
+
+_model_plans = {}
+
+
+def get_model_plan(model):
+    try:
+        return _model_plans[model]
+    except KeyError:
+        plan = _model_plans[model] = ModelPlan(model)
+        return plan
+
+
+def register_audited_model(model):
+    audited_models[model] = get_model_plan(model)
+
+
+@receiver(setting_changed)
+def reset_model_plans(setting, **kwargs):
+    if setting not in ("LOG_IGNORE_FIELDS", "LOG_SENSITIVE_FIELDS"):
+        return
+    _model_plans.clear()
+    for model in audited_models:
+        audited_models[model] = get_model_plan(model)
+
+
+class PendingLogEntries:
+    """
+    Log entries waiting for the transaction that created them to be committed.
+
+    Instances are registered as `on_commit` callbacks, so Django discards them,
+    along with their entries, when the transaction or savepoint is rolled back.
+    The writer only keeps weak references to them, so they go away with the
+    callbacks once the transaction ends.
+    """
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.entries = []
+
+    def __call__(self):
+        self.writer.write(self.entries)
+
+
+class AuditLogWriter:
+    """
+    Collects the log entries of a transaction (or of a whole request, when used
+    with `buffer`) and stores them with a single `bulk_create`.
+
+    Entries are stored in the logs database, but they are kept until the
+    transaction of the audited database (`using`) is committed.
+    """
+
+    def __init__(self):
+        # entries waiting for the end of the `buffer` block, if there is one
+        self.buffered_entries = contextvars.ContextVar(
+            "audit_log_buffered_entries", default=None
+        )
+        # entries waiting for a commit, by database and savepoints; connections
+        # belong to a thread, and so do their transactions
+        self.pending_entries = threading.local()
+
+    def add(self, entry, using=DEFAULT_DB_ALIAS):
+        connection = transaction.get_connection(using)
+        if connection.in_atomic_block:
+            self.get_pending_entries(connection).entries.append(entry)
+        else:
+            self.write([entry])
+
+    def get_pending_entries(self, connection):
+        """
+        Return the entries of the current transaction or savepoint, registering
+        a single `on_commit` callback to write them when they are created.
+        """
+        pending_entries = getattr(self.pending_entries, connection.alias, None)
+        if pending_entries is None:
+            pending_entries = weakref.WeakValueDictionary()
+            setattr(self.pending_entries, connection.alias, pending_entries)
+
+        key = tuple(connection.savepoint_ids)
+        pending = pending_entries.get(key)
+        if pending is None:
+            pending = pending_entries[key] = PendingLogEntries(self)
+            transaction.on_commit(pending, using=connection.alias)
+        return pending
+
+    @contextlib.contextmanager
+    def buffer(self):
+        """
+        Delay the writing of committed entries until the block exits, so all the
+        entries created while handling a request are stored at once.
+        """
+        if self.buffered_entries.get() is not None:
+            # already buffering, the outermost block will write the entries
+            yield
+            return
+
+        entries = []
+        token = self.buffered_entries.set(entries)
+        try:
+            yield
+        finally:
+            self.buffered_entries.reset(token)
+            self.write(entries)
+
+    @contextlib.asynccontextmanager
+    async def abuffer(self):
+        """
+        Async version of `buffer`, for async views. The entries of the sync code
+        they run with `sync_to_async` are also buffered, as it runs in a copy of
+        the context that shares the list of entries.
+        """
+        if self.buffered_entries.get() is not None:
+            yield
+            return
+
+        entries = []
+        token = self.buffered_entries.set(entries)
+        try:
+            yield
+        finally:
+            self.buffered_entries.reset(token)
+            await self.awrite(entries)
+
+    def write(self, entries):
+        if not entries:
+            return
+
+        buffered_entries = self.buffered_entries.get()
+        if buffered_entries is not None:
+            buffered_entries.extend(entries)
+        elif settings.LOG_ASYNC_WRITES:
+            from base.tasks import write_log_entries
+
+            write_log_entries.delay([serialize_log_entry(e) for e in entries])
+        else:
+            AuditLogEntry.objects.bulk_create(entries)
+
+    async def awrite(self, entries):
+        if entries:
+            await sync_to_async(self.write)(entries)
+
+
+def serialize_log_entry(entry):
+    data = {field: getattr(entry, field) for field in LOG_ENTRY_FIELDS}
+    data["action_time"] = entry.action_time.isoformat()
+    data["changes"] = json.loads(json.dumps(entry.changes, cls=AuditEncoder))
+    return data
+
+
+audit_log_writer = AuditLogWriter()
@@ -0,0 +1,273 @@
+"""
+Two-tier cache: a small in-process LRU in front of a shared cache.
+
+Hot tiny keys, like the `Parameter` values, are read on most requests, and
+each read is a round trip to redis. `TwoTierCache` keeps the values of the
+keys starting with one of `LOCAL_KEY_PREFIXES` in a bounded LRU of the
+process for at most `LOCAL_TIMEOUT` seconds, and sends every other operation
+to the remote cache, a `django_redis` cache by default.
+
+Writes to local keys store a new random generation stamp in the remote cache,
+except `add`, which fills a missing key after a miss.
+Every process reads the stamp at most once every `GENERATION_CHECK_INTERVAL`
+seconds and drops its local values when the stamp changed, so a value written
+by one worker is read by the others after that interval at most. Writes are
+expected to be rare for local keys: any of them invalidates all the local
+values of every process.
+
+The methods of the remote backend that aren't part of the django cache api
+(`client`, `lock`, `ttl`, ...) are available on the two-tier cache, but the
+ones that write don't invalidate the local values.
+"""
+import collections
+import pickle
+import re
+import secrets
+import threading
+import time
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.base import BaseCache
+from django.utils.module_loading import import_string
+
+GENERATION_KEY = "two-tier-cache-generation"
+KEY_PREFIX_RE = re.compile(r"[-:]")
+
+MISSING = object()
+
+
+def get_key_prefix(key):
+    """Return the part of the key before the first `-` or `:`"""
+    return KEY_PREFIX_RE.split(str(key), maxsplit=1)[0]
+
+
+class TwoTierCache(BaseCache):
+    """
+    Cache backend with an in-process LRU in front of another backend.
+
+    OPTIONS:
+        REMOTE_BACKEND: the backend of the shared cache, receives the
+            LOCATION and the REMOTE_OPTIONS as its OPTIONS.
+        LOCAL_KEY_PREFIXES: the keys stored in the process, all of them when
+            it is None.
+        LOCAL_MAX_ENTRIES: the size of the LRU.
+        LOCAL_TIMEOUT: seconds a value is kept in the process.
+        GENERATION_CHECK_INTERVAL: seconds between reads of the generation.
+    """
+
+    def __init__(self, server, params):
+        params = dict(params)
+        options = dict(params.pop("OPTIONS", None) or {})
+        remote_backend = options.pop("REMOTE_BACKEND", "django_redis.cache.RedisCache")
+        remote_options = options.pop("REMOTE_OPTIONS", {})
+        prefixes = options.pop("LOCAL_KEY_PREFIXES", None)
+        self.local_key_prefixes = tuple(prefixes) if prefixes is not None else None
+        self.local_max_entries = int(options.pop("LOCAL_MAX_ENTRIES", 1000))
+        self.local_timeout = float(options.pop("LOCAL_TIMEOUT", 5))
+        self.generation_check_interval = float(
+            options.pop("GENERATION_CHECK_INTERVAL", 1)
+        )
+        super().__init__({**params, "OPTIONS": options})
+
+        self.remote = import_string(remote_backend)(
+            server, {**params, "OPTIONS": remote_options}
+        )
+        # key -> (expires at, generation, pickled value)
+        self._local = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = None
+        self._generation_checked_at = None
+        self._stats = collections.defaultdict(collections.Counter)
+
+    def __getattr__(self, name):
+        # django_redis extensions, like `client` or `lock`
+        if name == "remote":
+            raise AttributeError(name)
+        return getattr(self.remote, name)
+
+    def is_local(self, key):
+        if self.local_key_prefixes is None:
+            return True
+        return str(key).startswith(self.local_key_prefixes)
+
+    def get_local_key(self, key, version):
+        return (key, self.remote.version if version is None else version)
+
+    def get_generation(self):
+        """
+        Return the generation stamp, read from the remote cache when it was
+        last read more than `GENERATION_CHECK_INTERVAL` seconds ago.
+        """
+        now = time.monotonic()
+        checked_at = self._generation_checked_at
+        if checked_at is not None and now - checked_at < self.generation_check_interval:
+            return self._generation
+
+        generation = self.remote.get(GENERATION_KEY)
+        with self._lock:
+            if generation != self._generation:
+                self._local.clear()
+            self._generation = generation
+            self._generation_checked_at = now
+        return generation
+
+    def bump_generation(self):
+        """Invalidate the local values of every process"""
+        generation = secrets.token_hex(8)
+        self.remote.set(GENERATION_KEY, generation, timeout=None)
+        with self._lock:
+            self._local.clear()
+            self._generation = generation
+            self._generation_checked_at = time.monotonic()
+
+    def count(self, key, result):
+        with self._lock:
+            self._stats[get_key_prefix(key)][result] += 1
+
+    def get_stats(self):
+        """Return the local hits, remote hits and misses of this process by prefix"""
+        with self._lock:
+            stats = {prefix: dict(counter) for prefix, counter in self._stats.items()}
+        for counter in stats.values():
+            hits = counter.get("local_hits", 0) + counter.get("remote_hits", 0)
+            reads = hits + counter.get("misses", 0)
+            counter["hit_rate"] = round(hits / reads, 3) if reads else None
+        return stats
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats.clear()
+
+    def get_local(self, local_key, generation):
+        with self._lock:
+            entry = self._local.get(local_key)
+            if entry is None:
+                return MISSING
+            expires_at, entry_generation, pickled = entry
+            if expires_at <= time.monotonic() or entry_generation != generation:
+                del self._local[local_key]
+                return MISSING
+            self._local.move_to_end(local_key)
+        return pickle.loads(pickled)  # noqa: S301
+
+    def set_local(self, local_key, generation, value):
+        pickled = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        expires_at = time.monotonic() + self.local_timeout
+        with self._lock:
+            # the generation changed while the value was read from the remote cache
+            if generation != self._generation:
+                return
+            self._local[local_key] = (expires_at, generation, pickled)
+            self._local.move_to_end(local_key)
+            while len(self._local) > self.local_max_entries:
+                self._local.popitem(last=False)
+
+    def get(self, key, default=None, version=None):
+        if not self.is_local(key):
+            value = self.remote.get(key, MISSING, version=version)
+            self.count(key, "misses" if value is MISSING else "remote_hits")
+            return default if value is MISSING else value
+
+        generation = self.get_generation()
+        local_key = self.get_local_key(key, version)
+        value = self.get_local(local_key, generation)
+        if value is not MISSING:
+            self.count(key, "local_hits")
+            return value
+
+        value = self.remote.get(key, MISSING, version=version)
+        if value is MISSING:
+            self.count(key, "misses")
+            return default
+        self.count(key, "remote_hits")
+        self.set_local(local_key, generation, value)
+        return value
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        generation = self.get_generation() if any(map(self.is_local, keys)) else None
+        values = {}
+        remote_keys = []
+        for key in keys:
+            value = MISSING
+            if self.is_local(key):
+                value = self.get_local(self.get_local_key(key, version), generation)
+            if value is MISSING:
+                remote_keys.append(key)
+            else:
+                self.count(key, "local_hits")
+                values[key] = value
+
+        remote_values = self.remote.get_many(remote_keys, version=version)
+        for key in remote_keys:
+            if key not in remote_values:
+                self.count(key, "misses")
+                continue
+            self.count(key, "remote_hits")
+            values[key] = remote_values[key]
+            if self.is_local(key):
+                self.set_local(
+                    self.get_local_key(key, version), generation, values[key]
+                )
+        return values
+
+    def has_key(self, key, version=None):
+        if self.is_local(key):
+            local_key = self.get_local_key(key, version)
+            if self.get_local(local_key, self.get_generation()) is not MISSING:
+                return True
+        return self.remote.has_key(key, version=version)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):  # noqa: A003
+        result = self.remote.set(key, value, timeout=timeout, version=version)
+        if self.is_local(key):
+            self.bump_generation()
+        return result
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        """
+        Fill the key when it is missing, without invalidating the local values:
+        the other processes can only keep an older value of a missing key for
+        `LOCAL_TIMEOUT` seconds, when it expired in the remote cache.
+        """
+        added = self.remote.add(key, value, timeout=timeout, version=version)
+        if added and self.is_local(key):
+            self.set_local(self.get_local_key(key, version), self._generation, value)
+        return added
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        failed_keys = self.remote.set_many(data, timeout=timeout, version=version)
+        if any(map(self.is_local, data)):
+            self.bump_generation()
+        return failed_keys
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.remote.touch(key, timeout=timeout, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        value = self.remote.incr(key, delta=delta, version=version)
+        if self.is_local(key):
+            self.bump_generation()
+        return value
+
+    def decr(self, key, delta=1, version=None):
+        return self.incr(key, -delta, version=version)
+
+    def delete(self, key, version=None):
+        deleted = self.remote.delete(key, version=version)
+        if self.is_local(key):
+            self.bump_generation()
+        return deleted
+
+    def delete_many(self, keys, version=None):
+        keys = list(keys)
+        self.remote.delete_many(keys, version=version)
+        if any(map(self.is_local, keys)):
+            self.bump_generation()
+
+    def clear(self):
+        self.remote.clear()
+        self.bump_generation()
+
+    def close(self, **kwargs):
+        self.remote.close(**kwargs)
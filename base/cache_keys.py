@@ -0,0 +1,171 @@
+"""
+Cache keys that change when the models they depend on change.
+
+A cached value declares its dependencies: models, as classes or labels like
+"documents.Evidence", and model instances. Every dependency has a generation
+stamp in the default cache, and the key of the value embeds the stamps of
+its dependencies, so changing one of them makes the value unreachable and it
+is computed again with a new key, without guessing timeouts.
+
+Models must be listed in the `FRAGMENT_CACHE_DEPENDENCIES` setting to be
+dependencies. The post_save, post_delete and m2m_changed handlers of our
+models, connected in `BaseConfig.ready()`, store new stamps for the model and
+the instance that changed when the model is listed, the changes of the other
+models don't touch the cache. Changes that don't send signals, like
+`QuerySet.update()` or `bulk_create()`, must call `bump_generations()`
+themselves.
+
+Unreachable values and the stamps are removed after `FRAGMENT_CACHE_TIMEOUT`
+seconds, or before that by the cache when it is full. A missing stamp is
+stored again with a new value, so the values that embed the old one are never
+reached again.
+"""
+import functools
+import hashlib
+import secrets
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.db import models
+from django.db import transaction
+from django.dispatch import receiver
+from django.utils import timezone
+from django.utils import translation
+
+GENERATION_KEY_PREFIX = "generation"
+FRAGMENT_KEY_PREFIX = "fragment"
+
+MISSING = object()
+
+
+def get_model(dependency):
+    if isinstance(dependency, str):
+        return apps.get_model(dependency)
+    if isinstance(dependency, models.Model):
+        return type(dependency)
+    if isinstance(dependency, type) and issubclass(dependency, models.Model):
+        return dependency
+    msg = f"{dependency!r} is not a model, a model label or a model instance"
+    raise TypeError(msg)
+
+
+def get_label(model):
+    return model._meta.concrete_model._meta.label_lower
+
+
+@functools.cache
+def get_dependency_labels():
+    """Return the labels of the models listed in FRAGMENT_CACHE_DEPENDENCIES"""
+    return frozenset(
+        get_label(get_model(label)) for label in settings.FRAGMENT_CACHE_DEPENDENCIES
+    )
+
+
+@receiver(setting_changed)
+def reset_dependency_labels(setting, **kwargs):
+    if setting == "FRAGMENT_CACHE_DEPENDENCIES":
+        get_dependency_labels.cache_clear()
+
+
+def is_dependency(model):
+    """Return if cached values may depend on the model or its instances"""
+    return get_label(model) in get_dependency_labels()
+
+
+def get_generation_key(dependency):
+    """
+    Return the key of the generation of a model, or of a model instance.
+    Proxy models share the generation of their concrete model.
+    """
+    label = get_label(get_model(dependency))
+    if label not in get_dependency_labels():
+        msg = (
+            f"{label} is not in FRAGMENT_CACHE_DEPENDENCIES, its changes wouldn't "
+            "invalidate the cached values"
+        )
+        raise ImproperlyConfigured(msg)
+    if isinstance(dependency, models.Model):
+        return f"{GENERATION_KEY_PREFIX}-{label}-{dependency.pk}"
+    return f"{GENERATION_KEY_PREFIX}-{label}"
+
+
+def new_generation():
+    return secrets.token_hex(8)
+
+
+def get_generations(dependencies):
+    """Return the generation stamps of the dependencies by generation key"""
+    keys = [get_generation_key(dependency) for dependency in dependencies]
+    generations = cache.get_many(keys)
+    missing_keys = [key for key in keys if key not in generations]
+    if missing_keys:
+        for key in missing_keys:
+            # another process may store it first, keep the stored one
+            cache.add(key, new_generation(), timeout=settings.FRAGMENT_CACHE_TIMEOUT)
+        generations.update(cache.get_many(missing_keys))
+    return {key: generations.get(key) for key in keys}
+
+
+def bump_generations(instances=(), model_classes=()):
+    """
+    Invalidate the values that depend on the instances or the models, ignoring
+    the models that aren't dependencies.
+    """
+    keys = {
+        get_generation_key(model) for model in model_classes if is_dependency(model)
+    }
+    for instance in instances:
+        if is_dependency(type(instance)):
+            keys.add(get_generation_key(instance))
+            keys.add(get_generation_key(type(instance)))
+    if keys:
+        cache.set_many(
+            {key: new_generation() for key in keys},
+            timeout=settings.FRAGMENT_CACHE_TIMEOUT,
+        )
+
+
+def bump_generations_on_commit(instances=(), model_classes=(), using=None):
+    """
+    Invalidate the values now, for the rest of the transaction, and again
+    after the commit, since other requests may store values computed with the
+    data before the commit while the transaction runs.
+    """
+    bump_generations(instances, model_classes)
+    transaction.on_commit(
+        lambda: bump_generations(instances, model_classes), using=using
+    )
+
+
+def make_key(name, dependencies, vary_on=()):
+    """Return the key of the value called `name` with the current dependencies"""
+    generations = get_generations(dependencies)
+    parts = [f"{key}={generation}" for key, generation in generations.items()]
+    parts.extend(vary_on)
+    digest = hashlib.md5(
+        ":".join(map(str, parts)).encode(), usedforsecurity=False
+    ).hexdigest()
+    return f"{FRAGMENT_KEY_PREFIX}-{name}-{digest}"
+
+
+def get_or_compute(name, dependencies, compute, vary_on=(), timeout=None):
+    """
+    Return the value called `name` from the cache, or compute it with the
+    `compute` callable and store it until one of the dependencies changes.
+    """
+    key = make_key(name, dependencies, vary_on)
+    value = cache.get(key, MISSING)
+    if value is MISSING:
+        value = compute()
+        if timeout is None:
+            timeout = settings.FRAGMENT_CACHE_TIMEOUT
+        cache.set(key, value, timeout=timeout)
+    return value
+
+
+def get_template_vary_on():
+    """Return what rendered templates depend on besides the context"""
+    return [translation.get_language(), timezone.get_current_timezone_name()]
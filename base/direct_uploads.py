@@ -0,0 +1,270 @@
+"""
+Direct uploads: the browser uploads large files to the storage in parts,
+without sending them through a django worker.
+
+1. `start_upload()` creates a multipart upload for a new name under
+   `DIRECT_UPLOADS_DIR` and returns an url to upload each part to, and a
+   signed token of the upload, so the browser can't complete any other.
+2. The browser uploads the parts in parallel, and keeps the ETag header of
+   every response.
+3. `complete_upload()` receives the token of the upload, joins the parts and
+   returns a signed token that the forms receive instead of the file (see
+   `base.forms.DirectUploadField`).
+
+With the S3 media storage the parts are uploaded with presigned urls straight
+to the bucket. With any other storage, like the local one, `DirectUploadPartView`
+receives the parts and stores them in a temporary directory until the upload is
+completed, when they are saved in the storage like any other file.
+
+Saving a model with a file still under `DIRECT_UPLOADS_DIR` doesn't read it,
+`store_direct_upload()` moves it to its final name from a celery task, after
+the model is saved.
+"""
+import hashlib
+import math
+import os
+import posixpath
+import re
+import shutil
+import tempfile
+import uuid
+
+from django.conf import settings
+from django.core import signing
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.urls import reverse
+
+DIRECT_UPLOADS_DIR = "uploads"
+# S3 limits
+MIN_PART_SIZE = 5 * 2**20
+MAX_PARTS = 10_000
+
+TOKEN_SALT = "base.direct_uploads"  # noqa: S105
+UPLOAD_TOKEN_SALT = "base.direct_uploads.upload"  # noqa: S105
+PART_TOKEN_SALT = "base.direct_uploads.part"  # noqa: S105
+
+
+class DirectUploadError(Exception):
+    pass
+
+
+def get_part_size(size):
+    part_size = max(settings.DIRECT_UPLOAD_PART_SIZE, MIN_PART_SIZE)
+    return max(part_size, math.ceil(size / MAX_PARTS))
+
+
+def is_pending_upload(field_file):
+    """Return if the file was uploaded directly and wasn't moved yet"""
+    return bool(
+        field_file
+        and field_file._committed
+        and field_file.name.startswith(f"{DIRECT_UPLOADS_DIR}/")
+    )
+
+
+class S3DirectUploadBackend:
+    """Multipart uploads to the bucket of a S3 storage, with presigned urls"""
+
+    def __init__(self, storage):
+        self.storage = storage
+        self.client = storage.connection.meta.client
+
+    def get_key(self, name):
+        return self.storage._normalize_name(name)
+
+    def create(self, name, content_type):
+        response = self.client.create_multipart_upload(
+            Bucket=self.storage.bucket_name,
+            Key=self.get_key(name),
+            ContentType=content_type,
+            ACL=self.storage.default_acl,
+        )
+        return response["UploadId"]
+
+    def get_part_url(self, name, upload_id, part_number):
+        return self.client.generate_presigned_url(
+            "upload_part",
+            Params={
+                "Bucket": self.storage.bucket_name,
+                "Key": self.get_key(name),
+                "UploadId": upload_id,
+                "PartNumber": part_number,
+            },
+            ExpiresIn=settings.DIRECT_UPLOAD_URL_EXPIRATION,
+        )
+
+    def complete(self, name, upload_id, parts):
+        self.client.complete_multipart_upload(
+            Bucket=self.storage.bucket_name,
+            Key=self.get_key(name),
+            UploadId=upload_id,
+            MultipartUpload={
+                "Parts": [
+                    {"ETag": etag, "PartNumber": part_number}
+                    for part_number, etag in parts
+                ]
+            },
+        )
+        return name
+
+    def abort(self, name, upload_id):
+        self.client.abort_multipart_upload(
+            Bucket=self.storage.bucket_name,
+            Key=self.get_key(name),
+            UploadId=upload_id,
+        )
+
+
+class FileSystemDirectUploadBackend:
+    """
+    Stand-in of the S3 multipart uploads for other storages: the parts are
+    stored in a temporary directory, and joined and saved in the storage.
+    """
+
+    def __init__(self, storage):
+        self.storage = storage
+
+    def get_upload_dir(self, upload_id):
+        if not re.fullmatch(r"[0-9a-f]{32}", upload_id):
+            msg = "Invalid upload"
+            raise DirectUploadError(msg)
+
+        temp_dir = settings.FILE_UPLOAD_TEMP_DIR or tempfile.gettempdir()
+        return os.path.join(temp_dir, "direct-uploads", upload_id)
+
+    def get_part_path(self, upload_id, part_number):
+        return os.path.join(self.get_upload_dir(upload_id), f"{part_number:05}")
+
+    def create(self, name, content_type):
+        upload_id = uuid.uuid4().hex
+        os.makedirs(self.get_upload_dir(upload_id))
+        return upload_id
+
+    def get_part_url(self, name, upload_id, part_number):
+        token = signing.dumps([upload_id, part_number], salt=PART_TOKEN_SALT)
+        return reverse("direct-upload-part", args=(token,))
+
+    def save_part(self, upload_id, part_number, chunks):
+        """Store the part and return its ETag, the MD5 of its content like S3"""
+        if not os.path.isdir(self.get_upload_dir(upload_id)):
+            msg = "The upload doesn't exist"
+            raise DirectUploadError(msg)
+
+        md5 = hashlib.md5(usedforsecurity=False)
+        with open(self.get_part_path(upload_id, part_number), "wb") as part_file:
+            for chunk in chunks:
+                md5.update(chunk)
+                part_file.write(chunk)
+        return f'"{md5.hexdigest()}"'
+
+    def complete(self, name, upload_id, parts):
+        upload_dir = self.get_upload_dir(upload_id)
+        path = os.path.join(upload_dir, "file")
+        with open(path, "wb") as joined_file:
+            for part_number, _etag in parts:
+                part_path = self.get_part_path(upload_id, part_number)
+                try:
+                    with open(part_path, "rb") as part_file:
+                        shutil.copyfileobj(part_file, joined_file, 2**20)
+                except FileNotFoundError as error:
+                    msg = f"Part {part_number} was not uploaded"
+                    raise DirectUploadError(msg) from error
+
+        try:
+            with open(path, "rb") as joined_file:
+                return self.storage.save(name, File(joined_file))
+        finally:
+            shutil.rmtree(upload_dir)
+
+    def abort(self, name, upload_id):
+        shutil.rmtree(self.get_upload_dir(upload_id), ignore_errors=True)
+
+
+def get_backend(storage=default_storage):
+    if hasattr(storage, "bucket_name"):
+        return S3DirectUploadBackend(storage)
+    return FileSystemDirectUploadBackend(storage)
+
+
+def start_upload(file_name, size, content_type):
+    """
+    Create a multipart upload and return its id, name, part size and the
+    urls to upload its parts to.
+    """
+    file_name = posixpath.basename(file_name.replace("\\", "/"))
+    if not file_name or size > settings.DIRECT_UPLOAD_MAX_SIZE:
+        msg = "Invalid file"
+        raise DirectUploadError(msg)
+
+    backend = get_backend()
+    name = default_storage.generate_filename(
+        f"{DIRECT_UPLOADS_DIR}/{uuid.uuid4()}/{file_name}"
+    )
+    upload_id = backend.create(name, content_type)
+    part_size = get_part_size(size)
+    part_count = max(1, math.ceil(size / part_size))
+    return {
+        "upload": signing.dumps([upload_id, name], salt=UPLOAD_TOKEN_SALT),
+        "part_size": part_size,
+        "part_urls": [
+            backend.get_part_url(name, upload_id, part_number)
+            for part_number in range(1, part_count + 1)
+        ],
+    }
+
+
+def complete_upload(upload, parts):
+    """
+    Join the parts, pairs of part number and ETag, of the upload with the
+    signed token `upload`, and return the signed token of the uploaded file.
+    """
+    try:
+        upload_id, name = signing.loads(
+            upload,
+            salt=UPLOAD_TOKEN_SALT,
+            max_age=settings.DIRECT_UPLOAD_URL_EXPIRATION,
+        )
+    except signing.BadSignature as error:
+        msg = "Invalid upload"
+        raise DirectUploadError(msg) from error
+
+    if not parts:
+        msg = "The upload has no parts"
+        raise DirectUploadError(msg)
+
+    parts = sorted((int(part_number), etag) for part_number, etag in parts)
+    stored_name = get_backend().complete(name, upload_id, parts)
+    return signing.dumps(stored_name, salt=TOKEN_SALT)
+
+
+def load_upload_token(token):
+    """Return the name of the uploaded file, raises BadSignature if invalid"""
+    return signing.loads(
+        token, salt=TOKEN_SALT, max_age=settings.DIRECT_UPLOAD_URL_EXPIRATION
+    )
+
+
+def load_part_token(token):
+    return signing.loads(
+        token, salt=PART_TOKEN_SALT, max_age=settings.DIRECT_UPLOAD_URL_EXPIRATION
+    )
+
+
+def store_direct_upload(instance, field_name="file"):
+    """
+    Move the directly uploaded file of the instance to the name its field
+    gives it, and save it.
+    """
+    field_file = getattr(instance, field_name)
+    if not is_pending_upload(field_file):
+        return
+
+    upload_name = field_file.name
+    storage = field_file.storage
+    with storage.open(upload_name) as uploaded_file:
+        field_file.save(
+            posixpath.basename(upload_name), File(uploaded_file), save=False
+        )
+    instance.save(update_fields=[field_name])
+    storage.delete(upload_name)
@@ -0,0 +1,83 @@
+"""
+File downloads, served after the view checks the permissions of the user.
+
+- Remote storages redirect to the url of the file. The presigned urls of the
+  S3 media storage are cached for most of the time they are valid, so
+  downloading a file again doesn't sign a new url.
+- The local storage lets nginx send the file with the `X-Accel-Redirect`
+  header when `DOWNLOADS_X_ACCEL_REDIRECT` is enabled, as the media location
+  of `docker/nginx` is internal. Without nginx, django sends the file.
+
+Links to the files point to the download views, so pages that list many files,
+like the evidence tables, don't sign any url to render them.
+"""
+import hashlib
+import mimetypes
+import os
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import FileSystemStorage
+from django.http import FileResponse
+from django.http import HttpResponse
+from django.http import HttpResponseRedirect
+from django.utils.http import content_disposition_header
+
+DOWNLOAD_URL_CACHE_PREFIX = "download-url-"
+# presigned urls are valid for at least this many seconds when they are served
+MIN_URL_VALIDITY = 5 * 60
+
+
+def get_stored_name(field_file):
+    resolve_name = getattr(field_file.storage, "resolve_name", None)
+    return resolve_name(field_file.name) if resolve_name else field_file.name
+
+
+def is_signed(storage):
+    return bool(getattr(storage, "querystring_auth", False))
+
+
+def get_url_cache_timeout(storage):
+    expiration = getattr(storage, "querystring_expire", 0)
+    return max(expiration - MIN_URL_VALIDITY, 0)
+
+
+def get_download_url(field_file):
+    """
+    Return the url of the file in the storage. The presigned urls are cached
+    by stored file, so the files stored by content share them.
+    """
+    storage = field_file.storage
+    timeout = get_url_cache_timeout(storage) if is_signed(storage) else 0
+    if not timeout:
+        return field_file.url
+
+    stored_name = get_stored_name(field_file)
+    key_hash = hashlib.md5(stored_name.encode(), usedforsecurity=False).hexdigest()
+    cache_key = f"{DOWNLOAD_URL_CACHE_PREFIX}{key_hash}"
+    url = cache.get(cache_key)
+    if url is None:
+        url = field_file.url
+        cache.set(cache_key, url, timeout)
+    return url
+
+
+def serve_file(field_file, as_attachment=False):
+    """Return the response that sends the file"""
+    storage = field_file.storage
+    if not isinstance(storage, FileSystemStorage):
+        return HttpResponseRedirect(get_download_url(field_file))
+
+    file_name = os.path.basename(field_file.name)
+    if settings.DOWNLOADS_X_ACCEL_REDIRECT:
+        content_type, _encoding = mimetypes.guess_type(file_name)
+        response = HttpResponse(content_type=content_type or "application/octet-stream")
+        response["X-Accel-Redirect"] = storage.url(field_file.name)
+        response["Content-Disposition"] = content_disposition_header(
+            as_attachment, file_name
+        )
+        return response
+
+    return FileResponse(
+        field_file.open("rb"), as_attachment=as_attachment, filename=file_name
+    )
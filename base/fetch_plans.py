@@ -0,0 +1,468 @@
+"""
+Fetch plans: the relations and fields each view and template pair reads.
+
+While recording (in tests, or in development with the `RECORD_FETCH_PLANS`
+environment variable), the objects a view renders are tagged with their path
+from the view object or list, and every relation accessed on a tagged object
+is recorded with its path: forward and one-to-one relations as `select`
+paths, and evaluated many-to-many and reverse relations as `prefetch` paths.
+The fields read from tagged objects are recorded as `fields` paths.
+
+The plans are stored in `settings.FETCH_PLANS_FILE`, and `BaseListView` and
+`BaseDetailView` apply the plan of their template to their queryset with
+`select_related` and `Prefetch` objects (themselves with `select_related`),
+so templates don't run a query for every listed object, and with `only()`, so
+the related objects and the rows of the lists only load the fields the
+template reads.
+
+The related descriptors, the fields and `QuerySet` are only patched while a
+`recording()` block runs, nothing changes when plans are just applied.
+"""
+import contextlib
+import contextvars
+import functools
+import json
+import threading
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Model
+from django.db.models import Prefetch
+from django.db.models import QuerySet
+from django.db.models.fields.related_descriptors import ForwardManyToOneDescriptor
+from django.db.models.fields.related_descriptors import ReverseManyToOneDescriptor
+from django.db.models.fields.related_descriptors import ReverseOneToOneDescriptor
+from django.db.models.query_utils import DeferredAttribute
+
+SELECT = "select"
+PREFETCH = "prefetch"
+FIELDS = "fields"
+
+PATH_ATTRIBUTE = "_fetch_plan_path"
+# values of the fields of a tagged object that weren't read yet
+UNREAD_ATTRIBUTE = "_fetch_plan_unread"
+
+_recorder = contextvars.ContextVar("fetch_plan_recorder", default=None)
+
+
+def join_path(base, name):
+    return f"{base}__{name}" if base else name
+
+
+def tag(obj, path):
+    """
+    Tag the object with its path, and set aside the values of its fields, so
+    reading them goes through `DeferredAttribute` and is recorded.
+    """
+    if not isinstance(obj, Model):
+        return
+    setattr(obj, PATH_ATTRIBUTE, path)
+    recorder = _recorder.get()
+    data = obj.__dict__
+    if recorder is None or UNREAD_ATTRIBUTE in data:
+        return
+    pk_attname = obj._meta.pk.attname
+    data[UNREAD_ATTRIBUTE] = {
+        field.attname: data.pop(field.attname)
+        for field in obj._meta.concrete_fields
+        if field.attname in data and field.attname != pk_attname
+    }
+    recorder.tagged.append(obj)
+
+
+def untag(obj):
+    """Put back the values of the fields that weren't read"""
+    obj.__dict__.update(obj.__dict__.pop(UNREAD_ATTRIBUTE, {}))
+
+
+class FetchPlanRecorder:
+    def __init__(self):
+        # relation paths and their kind, by plan key
+        self.plans = {}
+        # paths of the fields read, by plan key
+        self.fields = {}
+        self.key = None
+        # objects with fields set aside, until the recording stops
+        self.tagged = []
+
+    def start(self, key, objects):
+        """Record the relations accessed from `objects` in the plan `key`"""
+        self.key = key
+        self.plans.setdefault(key, {})
+        self.fields.setdefault(key, set())
+        for obj in objects:
+            tag(obj, "")
+
+    def add(self, path, kind):
+        plan = self.plans.get(self.key)
+        if plan is not None and plan.get(path) != PREFETCH:
+            plan[path] = kind
+
+    def add_field(self, path):
+        fields = self.fields.get(self.key)
+        if fields is not None:
+            fields.add(path)
+
+    def stop(self):
+        for obj in self.tagged:
+            untag(obj)
+        self.tagged = []
+
+    def get_plans(self):
+        return {
+            key: {
+                SELECT: sorted(path for path, kind in paths.items() if kind == SELECT),
+                PREFETCH: sorted(
+                    path for path, kind in paths.items() if kind == PREFETCH
+                ),
+                FIELDS: sorted(self.fields[key]),
+            }
+            for key, paths in sorted(self.plans.items())
+            if paths or self.fields[key]
+        }
+
+
+def get_single_related_name(descriptor):
+    if isinstance(descriptor, ReverseOneToOneDescriptor):
+        return descriptor.related.get_accessor_name()
+    return descriptor.field.name
+
+
+def get_many_related_name(descriptor):
+    if getattr(descriptor, "reverse", True):
+        return descriptor.rel.get_accessor_name()
+    return descriptor.field.name
+
+
+def patch(owner, name, make_replacement):
+    """Replace the attribute of the class, and return a function restoring it"""
+    original = owner.__dict__[name]
+    setattr(owner, name, make_replacement(original))
+    return functools.partial(setattr, owner, name, original)
+
+
+def patch_single_related_descriptor(descriptor_class):
+    def make_get(original_get):
+        def get(self, instance, cls=None):
+            recorder = _recorder.get()
+            path = getattr(instance, PATH_ATTRIBUTE, None)
+            if recorder is None or path is None:
+                return original_get(self, instance, cls)
+
+            path = join_path(path, get_single_related_name(self))
+            recorder.add(path, SELECT)
+            value = original_get(self, instance, cls)
+            tag(value, path)
+            return value
+
+        return get
+
+    return patch(descriptor_class, "__get__", make_get)
+
+
+def patch_many_related_descriptor(descriptor_class):
+    def make_get(original_get):
+        def get(self, instance, cls=None):
+            manager = original_get(self, instance, cls)
+            path = getattr(instance, PATH_ATTRIBUTE, None)
+            if _recorder.get() is None or path is None:
+                return manager
+
+            path = join_path(path, get_many_related_name(self))
+            get_queryset = manager.get_queryset
+
+            def get_tagged_queryset():
+                # recorded only if the queryset itself is evaluated, not a clone
+                queryset = get_queryset()
+                queryset.__dict__[PATH_ATTRIBUTE] = path
+                return queryset
+
+            manager.get_queryset = get_tagged_queryset
+            return manager
+
+        return get
+
+    return patch(descriptor_class, "__get__", make_get)
+
+
+def patch_deferred_attribute():
+    def make_get(original_get):
+        def get(self, instance, cls=None):
+            unread = instance.__dict__.get(UNREAD_ATTRIBUTE) if instance else None
+            if not unread or self.field.attname not in unread:
+                return original_get(self, instance, cls)
+
+            recorder = _recorder.get()
+            if recorder is not None:
+                path = getattr(instance, PATH_ATTRIBUTE)
+                recorder.add_field(join_path(path, self.field.name))
+            value = unread.pop(self.field.attname)
+            instance.__dict__[self.field.attname] = value
+            return value
+
+        return get
+
+    return patch(DeferredAttribute, "__get__", make_get)
+
+
+def patch_queryset():
+    def make_fetch_all(original_fetch_all):
+        def _fetch_all(self):
+            original_fetch_all(self)
+            path = self.__dict__.get(PATH_ATTRIBUTE)
+            recorder = _recorder.get()
+            if recorder is not None and path is not None:
+                recorder.add(path, PREFETCH)
+                for obj in self._result_cache:
+                    tag(obj, path)
+
+        return _fetch_all
+
+    return patch(QuerySet, "_fetch_all", make_fetch_all)
+
+
+# the functions restoring the patched classes, while a recording runs
+_restore_functions = []
+_recordings = 0
+_patch_lock = threading.Lock()
+
+
+def install():
+    """Patch the classes to record the accesses, when no recording runs yet"""
+    global _recordings  # noqa: PLW0603
+    with _patch_lock:
+        _recordings += 1
+        if _recordings == 1:
+            _restore_functions.extend(
+                [
+                    patch_single_related_descriptor(ForwardManyToOneDescriptor),
+                    patch_single_related_descriptor(ReverseOneToOneDescriptor),
+                    patch_many_related_descriptor(ReverseManyToOneDescriptor),
+                    patch_deferred_attribute(),
+                    patch_queryset(),
+                ]
+            )
+
+
+def uninstall():
+    """Restore the patched classes when the last recording ends"""
+    global _recordings  # noqa: PLW0603
+    with _patch_lock:
+        _recordings -= 1
+        if _recordings == 0:
+            while _restore_functions:
+                _restore_functions.pop()()
+
+
+@contextlib.contextmanager
+def recording(recorder=None):
+    """
+    Record the relations and fields read from the objects passed to
+    `FetchPlanRecorder.start` while the block runs.
+    """
+    recorder = recorder or FetchPlanRecorder()
+    install()
+    token = _recorder.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _recorder.reset(token)
+        recorder.stop()
+        uninstall()
+
+
+def get_recorder():
+    return _recorder.get()
+
+
+@functools.cache
+def load_fetch_plans():
+    try:
+        with open(settings.FETCH_PLANS_FILE) as plans_file:
+            return json.load(plans_file)
+    except FileNotFoundError:
+        return {}
+
+
+def save_fetch_plans(plans):
+    with open(settings.FETCH_PLANS_FILE, "w") as plans_file:
+        json.dump(plans, plans_file, indent=2, sort_keys=True)
+        plans_file.write("\n")
+    load_fetch_plans.cache_clear()
+
+
+def get_relation(model, name):
+    """Return the relation of `model` accessed with the attribute `name`"""
+    for field in model._meta.get_fields():
+        if not field.is_relation:
+            continue
+        if field.auto_created and not field.concrete:
+            if field.get_accessor_name() == name:
+                return field
+        elif field.name == name:
+            return field
+    raise FieldDoesNotExist(name)
+
+
+def resolve_path(model, path):
+    """Return the relations of the path, or None if it no longer exists"""
+    relations = []
+    for name in path.split("__"):
+        try:
+            relation = get_relation(model, name)
+        except FieldDoesNotExist:
+            return None
+        relations.append(relation)
+        model = relation.related_model
+    return relations
+
+
+def is_valid_path(model, path, kind):
+    relations = resolve_path(model, path)
+    if not relations:
+        return False
+    last = relations[-1]
+    if kind == SELECT:
+        return last.many_to_one or last.one_to_one
+    return last.one_to_many or last.many_to_many
+
+
+def get_prefetch_lookup(lookup):
+    return lookup.prefetch_to if isinstance(lookup, Prefetch) else lookup
+
+
+def get_field_names(model, names):
+    """Return the names of the concrete fields of the model among `names`"""
+    concrete_names = {field.name for field in model._meta.concrete_fields}
+    return [name for name in names if name in concrete_names]
+
+
+def get_only_fields(model, fields, path, selects, join_field=None):
+    """
+    Return the fields that the queryset of the objects at `path`, of `model`,
+    loads with `only()`: the fields read from them and from their `selects`,
+    the relations to select and the `join_field` of a prefetch. Return None
+    when none of them was read, as the plan may be older than the fields.
+    """
+    select_paths = {select: join_path(path, select) for select in selects}
+    if path not in fields and not any(p in fields for p in select_paths.values()):
+        return None
+
+    names = [join_field] if join_field else []
+    names.extend(get_field_names(model, fields.get(path, ())))
+    for select, select_path in select_paths.items():
+        select_model = resolve_path(model, select)[-1].related_model
+        names.append(select)
+        names.extend(
+            join_path(select, name)
+            for name in get_field_names(select_model, fields.get(select_path, ()))
+        )
+    return names
+
+
+def get_read_fields(plan):
+    """Return the names of the fields read, by the path of their objects"""
+    fields = {}
+    for field_path in plan.get(FIELDS, ()):
+        path, _, name = field_path.rpartition("__")
+        fields.setdefault(path, []).append(name)
+    return fields
+
+
+def get_selects(kinds):
+    """Return the paths to select, by the prefetch path they go through"""
+    # "" for the paths selected by the queryset itself
+    selects = {"": []}
+    for path in sorted(kinds):
+        names = path.split("__")
+        prefix = next(
+            (
+                "__".join(names[:i])
+                for i in range(len(names) - 1, 0, -1)
+                if kinds.get("__".join(names[:i])) == PREFETCH
+            ),
+            "",
+        )
+        if kinds[path] == PREFETCH:
+            selects.setdefault(path, [])
+        elif prefix:
+            selects.setdefault(prefix, []).append(path[len(prefix) + 2 :])
+        else:
+            selects[""].append(path)
+    return selects
+
+
+def get_select_related_paths(select_related, prefix=""):
+    """Return the paths of the nested `select_related` dict of a query"""
+    paths = []
+    for name, nested in select_related.items():
+        path = join_path(prefix, name)
+        paths.append(path)
+        paths.extend(get_select_related_paths(nested, path))
+    return paths
+
+
+def apply_fetch_plan(queryset, plan, only_root=True):
+    """
+    Return the queryset fetching the relations of the plan: the select paths
+    that don't go through a prefetched relation are selected, and the others
+    are selected by the queryset of the prefetch they go through.
+
+    The related objects only load the fields read from them, and so do the
+    objects of the queryset, unless `only_root` is False: the object of a
+    detail view and its selected relations are used by the view before its
+    template, so they load all their fields.
+    """
+    if not plan:
+        return queryset
+
+    model = queryset.model
+    kinds = {path: SELECT for path in plan.get(SELECT, ())}
+    kinds.update({path: PREFETCH for path in plan.get(PREFETCH, ())})
+    kinds = {
+        path: kind for path, kind in kinds.items() if is_valid_path(model, path, kind)
+    }
+    fields = get_read_fields(plan)
+    selects = get_selects(kinds)
+
+    root_selects = selects.pop("")
+    if root_selects:
+        queryset = queryset.select_related(*root_selects)
+    # the fields the view defers itself are left as they are, and so are the
+    # fields of all the relations when the view selects them all
+    select_related = queryset.query.select_related
+    if (
+        only_root
+        and queryset.query.deferred_loading == (frozenset(), True)
+        and select_related is not True
+    ):
+        root_selects = get_select_related_paths(select_related or {})
+        only_fields = get_only_fields(model, fields, "", root_selects)
+        if only_fields is not None:
+            queryset = queryset.only(*only_fields)
+
+    existing = {
+        get_prefetch_lookup(lookup) for lookup in queryset._prefetch_related_lookups
+    }
+    prefetches = []
+    for path, related_selects in sorted(selects.items()):
+        if any(
+            lookup.split("__")[: path.count("__") + 1] == path.split("__")
+            for lookup in existing
+        ):
+            # already prefetched by the view, or through the view lookups
+            continue
+        relation = resolve_path(model, path)[-1]
+        related_model = relation.related_model
+        related_queryset = related_model._default_manager.all()
+        if related_selects:
+            related_queryset = related_queryset.select_related(*related_selects)
+        # the prefetch matches the related objects by their foreign key
+        join_field = relation.field.name if relation.one_to_many else None
+        only_fields = get_only_fields(
+            related_model, fields, path, related_selects, join_field
+        )
+        if only_fields is not None:
+            related_queryset = related_queryset.only(*only_fields)
+        prefetches.append(Prefetch(path, queryset=related_queryset))
+    return queryset.prefetch_related(*prefetches)
@@ -9,8 +9,6 @@ from django.core.files import File
 
 import pytest
 
-from base.middleware import RequestMiddleware
-
 if TYPE_CHECKING:
     from collections.abc import Generator
 
@@ -26,39 +24,33 @@ MODEL_FIXTURE_CUSTOM_NAMES = {
 
 
 @pytest.fixture
-def superuser_client(db, superuser_user) -> Generator[Client, None, None]:
+def superuser_client(db, superuser_user) -> Client:
     """A Django test client logged in as an admin user."""
     from django.test.client import Client
 
     client = Client()
     client.force_login(superuser_user)
-    yield client
-    if hasattr(RequestMiddleware.thread_local, "user"):
-        del RequestMiddleware.thread_local.user
+    return client
 
 
 @pytest.fixture
-def staff_client(db, staff_user) -> Generator[Client, None, None]:
+def staff_client(db, staff_user) -> Client:
     """A Django test client logged in as an admin user."""
     from django.test.client import Client
 
     client = Client()
     client.force_login(staff_user)
-    yield client
-    if hasattr(RequestMiddleware.thread_local, "user"):
-        del RequestMiddleware.thread_local.user
+    return client
 
 
 @pytest.fixture
-def regular_user_client(db, regular_user) -> Generator[Client, None, None]:
+def regular_user_client(db, regular_user) -> Client:
     """A Django test client logged in as an admin user."""
     from django.test.client import Client
 
     client = Client()
     client.force_login(regular_user)
-    yield client
-    if hasattr(RequestMiddleware.thread_local, "user"):
-        del RequestMiddleware.thread_local.user
+    return client
 
 
 @pytest.fixture
@@ -75,3 +67,26 @@ def django_file(settings) -> Generator[File, None, None]:
 
     with open(final_path, "rb") as file:
         yield File(file, name=filename)
+
+
+@pytest.fixture
+def increment_counter(db):
+    from base.models import IncrementCounter
+
+    return IncrementCounter.objects.create(key="documents.documentversion.version:0")
+
+
+@pytest.fixture
+def integrity_check(db):
+    from base.models import IntegrityCheck
+
+    return IntegrityCheck.objects.create()
+
+
+@pytest.fixture
+def stored_blob(db):
+    from base.models import StoredBlob
+
+    return StoredBlob.objects.create(
+        digest="0" * 64, name=f"blobs/00/{'0' * 64}.pdf", size=0
+    )
@@ -1,9 +1,15 @@
 from __future__ import annotations
 
 from django import forms
+from django.core import signing
+from django.core.exceptions import ValidationError
 from django.forms import Form
 from django.forms import HiddenInput
 from django.forms import ModelForm
+from django.urls import reverse
+from django.utils.translation import gettext_lazy as _
+
+from base.direct_uploads import load_upload_token
 
 forms.fields.Field.is_checkbox = lambda self: isinstance(
     self.widget,
@@ -16,7 +22,7 @@ forms.fields.Field.is_file_input = lambda self: isinstance(self.widget, forms.Fi
 class BaseFormMixin:
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        for _, field in self.fields.items():
+        for field in self.fields.values():
             widget = field.widget
             if "class" not in widget.attrs:
                 widget.attrs["class"] = ""
@@ -59,3 +65,63 @@ class BaseForm(BaseFormMixin, Form):
 
 class BaseModelForm(BaseFormMixin, ModelForm):
     pass
+
+
+class DirectUploadField(forms.CharField):
+    """
+    Hidden field with the signed token of a file uploaded directly to the
+    storage, cleaned to the name of the uploaded file.
+
+    `file_field` is the name of the file input the browser uploads, it gets
+    the `data-direct-upload` attribute in `DirectUploadFormMixin`.
+    """
+
+    widget = HiddenInput
+
+    default_error_messages = {
+        "invalid": _("The uploaded file expired, please upload it again."),
+    }
+
+    def __init__(self, file_field, **kwargs):
+        self.file_field = file_field
+        kwargs.setdefault("required", False)
+        super().__init__(**kwargs)
+
+    def to_python(self, value):
+        value = super().to_python(value)
+        if value in self.empty_values:
+            return None
+        try:
+            return load_upload_token(value)
+        except signing.BadSignature as error:
+            raise ValidationError(
+                self.error_messages["invalid"], code="invalid"
+            ) from error
+
+
+class DirectUploadFormMixin:
+    """
+    Mixin for forms with `DirectUploadField`s. The file inputs are uploaded
+    in parts by the browser and cleaned to the name of the uploaded file when
+    they are empty.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for name, field in self.fields.items():
+            if isinstance(field, DirectUploadField):
+                file_widget = self.fields[field.file_field].widget
+                file_widget.attrs["data-direct-upload"] = self[name].auto_id
+                file_widget.attrs["data-direct-upload-url"] = reverse(
+                    "direct-upload-start"
+                )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        for name, field in self.fields.items():
+            if not isinstance(field, DirectUploadField):
+                continue
+            upload_name = cleaned_data.get(name)
+            if upload_name and not cleaned_data.get(field.file_field):
+                cleaned_data[field.file_field] = upload_name
+        return cleaned_data
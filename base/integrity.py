@@ -0,0 +1,218 @@
+"""
+Integrity verification of the stored files.
+
+`verify_files()` hashes the files of every model with `FileShasumMixin` and
+compares them with their recorded `shasum`, recording the differences, the
+drift, in an `IntegrityCheck`:
+
+- The files are read in large buffers and hashed by a bounded pool of
+  threads, as reading and hashing release the GIL. Files of the S3 storage are
+  streamed instead of being downloaded to a temporary file first.
+- A stored file shared by many rows, like the blobs of the content addressed
+  storage, is only hashed once per run.
+- Rows are verified in primary key order and in batches, and the check saves
+  the last verified primary key of every model after each batch, so an
+  interrupted or time limited check resumes where it stopped.
+"""
+import datetime
+import hashlib
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+from django.apps import apps
+from django.db.models import FileField
+from django.utils import timezone
+
+from base.models import IntegrityCheck
+from base.models.file_shasum_mixin import FileShasumMixin
+
+# 16 times the chunks of django files; larger reads don't pay off once the
+# buffer doesn't fit in the CPU caches
+BUFFER_SIZE = 2**20
+BATCH_SIZE = 500
+
+
+def get_verified_fields():
+    """Return the models that keep the SHA-256 of their file, and the field"""
+    for model in apps.get_models():
+        if issubclass(model, FileShasumMixin):
+            field = model._meta.get_field("file")
+            if isinstance(field, FileField):
+                yield model, field
+
+
+def get_stored_name(storage, name):
+    """Return the name of the stored file, the blob of content addressed names"""
+    resolve_name = getattr(storage, "resolve_name", None)
+    return resolve_name(name) if resolve_name else name
+
+
+def open_stream(storage, name):
+    """Open the stored file, streaming the body of the S3 objects"""
+    bucket = getattr(storage, "bucket", None)
+    if bucket is None:
+        return storage.open(name, "rb")
+
+    stored_name = get_stored_name(storage, name)
+    return bucket.Object(storage._normalize_name(stored_name)).get()["Body"]
+
+
+_buffers = threading.local()
+
+
+def get_buffer(buffer_size):
+    """Return the read buffer of the thread, reused for all its files"""
+    buffer = getattr(_buffers, "buffer", None)
+    if buffer is None or len(buffer) != buffer_size:
+        buffer = _buffers.buffer = bytearray(buffer_size)
+    return buffer
+
+
+def hash_stored_file(storage, name, buffer_size=BUFFER_SIZE):
+    """Return the SHA-256 and size of the stored file"""
+    sha256 = hashlib.sha256()
+    size = 0
+    with open_stream(storage, name) as stream:
+        raw_file = getattr(stream, "file", stream)
+        readinto = getattr(raw_file, "readinto", None)
+        if readinto is None:
+            while chunk := stream.read(buffer_size):
+                sha256.update(chunk)
+                size += len(chunk)
+        else:
+            # read straight into the buffer, without a new bytes per read
+            buffer = get_buffer(buffer_size)
+            view = memoryview(buffer)
+            while read := readinto(buffer):
+                sha256.update(view[:read])
+                size += read
+    return sha256.hexdigest(), size
+
+
+def hash_or_error(storage, name, buffer_size):
+    try:
+        return hash_stored_file(storage, name, buffer_size), None
+    except FileNotFoundError:
+        return None, "missing"
+    except Exception as error:  # noqa: BLE001
+        # like the errors of the S3 client, that don't share a base class
+        return None, f"unreadable: {error}"
+
+
+def get_current_check(restart=False):
+    """Return the unfinished check to resume, or a new one"""
+    check = None if restart else IntegrityCheck.objects.filter(finished_at=None).first()
+    return check or IntegrityCheck.objects.create()
+
+
+class BatchVerifier:
+    """Verifies batches of rows of a check with the pool of threads"""
+
+    def __init__(self, check, pool, buffer_size):
+        self.check = check
+        self.pool = pool
+        self.buffer_size = buffer_size
+        # the hashes of the stored files verified by this run, by stored name
+        self.hashes = {}
+
+    def hash_files(self, storage, names):
+        def hash_file(name):
+            return hash_or_error(storage, name, self.buffer_size)
+
+        # a name of each stored file that wasn't hashed yet
+        pending = {}
+        for name in names:
+            stored_name = get_stored_name(storage, name)
+            if stored_name not in self.hashes:
+                pending.setdefault(stored_name, name)
+
+        results = self.pool.map(hash_file, pending.values())
+        for stored_name, (result, error) in zip(pending, results, strict=True):
+            self.hashes[stored_name] = (result, error)
+            if result is not None:
+                self.check.verified_bytes += result[1]
+
+    def verify(self, model, field, rows):
+        self.hash_files(field.storage, [name for _pk, name, _shasum in rows])
+        for pk, name, shasum in rows:
+            result, error = self.hashes[get_stored_name(field.storage, name)]
+            if result is not None and result[0] == shasum:
+                self.check.verified_files += 1
+                continue
+            self.check.drift.append(
+                {
+                    "model": model._meta.label,
+                    "pk": pk,
+                    "name": name,
+                    "expected": shasum,
+                    "actual": result[0] if result else None,
+                    "problem": error or "mismatch",
+                }
+            )
+        self.check.checkpoints[model._meta.label] = rows[-1][0]
+
+
+def verify_files(  # noqa: PLR0913
+    check=None,
+    workers=4,
+    buffer_size=BUFFER_SIZE,
+    batch_size=BATCH_SIZE,
+    time_limit=None,
+    restart=False,
+):
+    """
+    Verify the stored files, resuming the unfinished check unless `restart`,
+    and return the check. It stays unfinished when it takes more than
+    `time_limit` seconds, to be resumed later.
+    """
+    check = check or get_current_check(restart=restart)
+    run_start = start = time.monotonic()
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        verifier = BatchVerifier(check, pool, buffer_size)
+        for model, field in get_verified_fields():
+            label = model._meta.label
+            # rows without shasum are direct uploads still being stored
+            queryset = (
+                model._base_manager.exclude(**{field.name: ""})
+                .exclude(**{field.name: None})
+                .exclude(shasum="")
+                .filter(pk__gt=check.checkpoints.get(label, 0))
+                .order_by("pk")
+                .values_list("pk", field.name, "shasum")
+            )
+            batch = []
+            for row in queryset.iterator(chunk_size=batch_size):
+                batch.append(row)
+                if len(batch) < batch_size:
+                    continue
+                verifier.verify(model, field, batch)
+                batch = []
+                save_progress(check, start)
+                start = time.monotonic()
+                if time_limit and time.monotonic() - run_start >= time_limit:
+                    return check
+
+            if batch:
+                verifier.verify(model, field, batch)
+            save_progress(check, start)
+            start = time.monotonic()
+
+    check.finished_at = timezone.now()
+    check.save(update_fields=["finished_at"])
+    return check
+
+
+def save_progress(check, start):
+    check.duration += datetime.timedelta(seconds=time.monotonic() - start)
+    check.save(
+        update_fields=[
+            "duration",
+            "checkpoints",
+            "verified_files",
+            "verified_bytes",
+            "drift",
+        ]
+    )
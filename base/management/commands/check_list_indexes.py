@@ -0,0 +1,183 @@
+import json
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.exceptions import FieldDoesNotExist
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from django.db import connections
+from django.db import models
+from django.db import transaction
+from django.test import RequestFactory
+from django.urls import URLPattern
+from django.urls import URLResolver
+from django.urls import get_resolver
+from django.utils import timezone
+
+from base.views.generic.list import BaseListView
+
+TEXT_LOOKUPS = {
+    "iexact",
+    "contains",
+    "icontains",
+    "startswith",
+    "istartswith",
+    "endswith",
+    "iendswith",
+    "regex",
+    "iregex",
+}
+
+
+def get_list_views(patterns=None):
+    """Yield the url names and classes of the BaseListView views"""
+    if patterns is None:
+        patterns = get_resolver().url_patterns
+
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from get_list_views(pattern.url_patterns)
+        elif isinstance(pattern, URLPattern):
+            view_class = getattr(pattern.callback, "view_class", None)
+            if view_class and issubclass(view_class, BaseListView):
+                yield pattern.name, view_class
+
+
+def get_field(model, path):
+    """Return the field at the end of a lookup path"""
+    field = None
+    for name in path.split("__"):
+        field = model._meta.get_field(name)
+        if field.is_relation:
+            model = field.related_model
+    return field.target_field if field.many_to_one else field
+
+
+def get_sample_value(queryset, path, lookup):
+    """Return a value to filter `path` by, taken from the database if possible"""
+    if lookup == "isnull":
+        return True
+
+    value = (
+        queryset.model._default_manager.exclude(**{f"{path}__isnull": True})
+        .values_list(path, flat=True)
+        .first()
+    )
+    if value is None:
+        field = get_field(queryset.model, path)
+        if isinstance(field, models.BooleanField):
+            value = True
+        elif isinstance(field, models.DateTimeField):
+            value = timezone.now()
+        elif isinstance(field, models.DateField):
+            value = timezone.localdate()
+        elif isinstance(field, models.IntegerField | models.AutoField):
+            value = 1
+        else:
+            value = "a"
+
+    if lookup in TEXT_LOOKUPS:
+        return str(value)
+    if lookup == "in":
+        return [value]
+    if lookup == "range":
+        return (value, value)
+    return value
+
+
+def explain(queryset):
+    """
+    Return the plan of the queryset, with sequential scans and sorts disabled
+    so the planner only chooses them when there is no index to use instead,
+    whatever the size of the tables.
+    """
+    connection = connections[queryset.db]
+    with transaction.atomic(using=queryset.db):
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute("SET LOCAL enable_sort = off")
+        return json.loads(queryset.explain(format="json"))[0]["Plan"]
+
+
+def get_plan_nodes(plan):
+    yield plan
+    for subplan in plan.get("Plans", []):
+        yield from get_plan_nodes(subplan)
+
+
+def get_sequential_scans(plan):
+    return [
+        f"sequential scan on {node['Relation Name']}"
+        + (f" ({node['Filter']})" if "Filter" in node else "")
+        for node in get_plan_nodes(plan)
+        if node["Node Type"] == "Seq Scan"
+    ]
+
+
+def get_sorts(plan):
+    return [
+        f"sort by {', '.join(node['Sort Key'])}"
+        for node in get_plan_nodes(plan)
+        if node["Node Type"] in ("Sort", "Incremental Sort")
+    ]
+
+
+class Command(BaseCommand):
+    help = (  # noqa: A003
+        "Reports the filters and orderings declared on the list views that are"
+        " not supported by an index, explaining representative queries."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--fail",
+            action="store_true",
+            help="Exit with an error status when there are unindexed lookups",
+        )
+
+    def handle(self, *args, **options):
+        request = RequestFactory().get("/")
+        request.user = AnonymousUser()
+        problems = 0
+
+        seen = set()
+        for name, view_class in get_list_views():
+            if view_class in seen:
+                continue
+            seen.add(view_class)
+
+            view = view_class()
+            view.setup(request)
+            # the relations fetched for display don't change the lookups
+            queryset = view.get_queryset().select_related(None).order_by()
+            results = self.check_view(view_class, queryset)
+            for lookup, issues in results:
+                if issues:
+                    problems += 1
+                    for issue in issues:
+                        self.stdout.write(f"{name}: {lookup}: {issue}")
+                elif options["verbosity"] > 1:
+                    self.stdout.write(f"{name}: {lookup}: ok")
+
+        if problems:
+            msg = f"{problems} unindexed lookups found"
+            if options["fail"]:
+                raise CommandError(msg)
+            self.stderr.write(msg)
+
+    def check_view(self, view_class, queryset):
+        results = []
+        for path, lookups in view_class.filterset.items():
+            for lookup in lookups:
+                try:
+                    get_field(queryset.model, path)
+                except FieldDoesNotExist:
+                    results.append((f"filter {path}", ["unknown field"]))
+                    continue
+                value = get_sample_value(queryset, path, lookup)
+                plan = explain(queryset.filter(**{f"{path}__{lookup}": value}))
+                results.append((f"filter {path}__{lookup}", get_sequential_scans(plan)))
+
+        for field in view_class.orderable_fields:
+            plan = explain(queryset.order_by(field)[: view_class.paginate_by])
+            results.append((f"order by {field}", get_sorts(plan)))
+        return results
@@ -0,0 +1,45 @@
+import datetime
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+from base.storage import ContentAddressedStorageMixin
+from base.storage import collect_blobs
+
+
+class Command(BaseCommand):
+    help = (  # noqa: A003
+        "Count the references to the blobs of the content addressed storage and "
+        "delete the ones that no file uses."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--grace-hours",
+            type=float,
+            default=24,
+            help="Keep the blobs uploaded in the last hours (default: 24).",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only list the blobs that would be deleted.",
+        )
+
+    def handle(self, *args, **options):
+        if not isinstance(default_storage, ContentAddressedStorageMixin):
+            msg = "The default storage is not content addressed."
+            raise CommandError(msg)
+
+        blobs = collect_blobs(
+            default_storage,
+            grace_period=datetime.timedelta(hours=options["grace_hours"]),
+            dry_run=options["dry_run"],
+        )
+        for blob in blobs:
+            self.stdout.write(blob.name)
+
+        action = "would be deleted" if options["dry_run"] else "deleted"
+        size = sum(blob.size for blob in blobs)
+        self.stdout.write(f"{len(blobs)} blobs {action}, {size} bytes")
@@ -0,0 +1,65 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from base.integrity import BUFFER_SIZE
+from base.integrity import verify_files
+
+
+class Command(BaseCommand):
+    help = (  # noqa: A003
+        "Verify the stored evidence and document version files against their "
+        "recorded SHA-256, resuming the unfinished check, and report the drift."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=settings.INTEGRITY_CHECK_WORKERS,
+            help="Number of files hashed at the same time.",
+        )
+        parser.add_argument(
+            "--buffer-mb",
+            type=int,
+            default=BUFFER_SIZE // 2**20,
+            help="Size of the reads, in megabytes.",
+        )
+        parser.add_argument(
+            "--time-limit",
+            type=float,
+            help="Stop after these seconds, to resume the check later.",
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Start a new check instead of resuming the unfinished one.",
+        )
+        parser.add_argument(
+            "--report",
+            help="Write the drift to this JSON file.",
+        )
+
+    def handle(self, *args, **options):
+        check = verify_files(
+            workers=options["workers"],
+            buffer_size=options["buffer_mb"] * 2**20,
+            time_limit=options["time_limit"],
+            restart=options["restart"],
+        )
+
+        for drift in check.drift:
+            self.stdout.write(
+                f"{drift['model']} {drift['pk']} {drift['name']}: {drift['problem']}"
+            )
+        if options["report"]:
+            with open(options["report"], "w") as report:
+                json.dump(check.drift, report, indent=2)
+
+        state = "finished" if check.finished_at else "unfinished, run it again"
+        self.stdout.write(
+            f"{check.verified_files} files verified, {len(check.drift)} drifted, "
+            f"{check.verified_bytes / 2**30:.2f} GB at "
+            f"{check.gigabytes_per_minute:.2f} GB/min ({state})"
+        )
@@ -1,15 +1,305 @@
 """ This document defines the Base Manager and BaseQuerySet classes"""
-import json
 
+from django.contrib.admin.models import ADDITION
+from django.contrib.admin.models import CHANGE
+from django.contrib.contenttypes.models import ContentType
 from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
 from django.db import models
+from django.db import transaction
 from django.db.models import Count
+from django.db.models import Prefetch
+from django.db.models import sql
+from django.db.models.sql.constants import NO_RESULTS
+from django.utils import timezone
+from django.utils.encoding import force_str
+
+from audit.models import AuditLogEntry
+from base.audit import audit_log_writer
+from base.audit import audited_models
+from base.audit import get_model_plan
+from base.serializers import JSON_CHUNK_SIZE
+from base.serializers import iter_json_array
 
 
 class BaseQuerySet(models.query.QuerySet):
     def to_json(self):
-        return json.dumps(list(self.values()), cls=DjangoJSONEncoder)
+        return "".join(self.iter_json())
+
+    def iter_json(self, chunk_size=JSON_CHUNK_SIZE):
+        """
+        Yield the values of the objects as a JSON array in chunks, reading them
+        with a server side cursor, to stream big querysets.
+        """
+        values = self.values().iterator(chunk_size=chunk_size)
+        return iter_json_array(values, cls=DjangoJSONEncoder, chunk_size=chunk_size)
 
     def find_duplicates(self, *fields):
         duplicates = self.values(*fields).annotate(Count("id"))
         return duplicates.order_by().filter(id__count__gt=1)
+
+    # audited bulk operations
+    def audited_update(self, user=None, **kwargs):
+        """
+        Updates all the objects of the queryset with a single query, like
+        `update`, but also logs the operation with one AuditLogEntry containing the
+        updated objects and the new values.
+
+        `user` defaults to the user performing the current request.
+        """
+        if self.query.is_sliced:
+            msg = "Cannot update a query once a slice has been taken."
+            raise TypeError(msg)
+        user = self._get_audit_user(user)
+        kwargs = {**self._get_update_audit_fields(user), **kwargs}
+
+        with transaction.atomic(using=self.db):
+            pks = self._update_returning_pks(kwargs)
+            self._log_bulk_operation(
+                user,
+                CHANGE,
+                pks,
+                {"fields": self._get_changed_fields_message(kwargs)},
+            )
+        return len(pks)
+
+    def audited_bulk_create(self, objs, user=None, **kwargs):
+        """
+        Creates the given objects with `bulk_create` and logs the operation with
+        one AuditLogEntry containing the created objects. With `ignore_conflicts`
+        the database doesn't return their primary keys, and nothing is logged.
+        """
+        user = self._get_audit_user(user)
+        objs = list(objs)
+        audit_fields = {
+            **self._get_update_audit_fields(user),
+            **self._get_audit_user_fields(user, "created_by"),
+        }
+        for obj in objs:
+            for name, value in audit_fields.items():
+                if getattr(obj, name) is None:
+                    setattr(obj, name, value)
+
+        with transaction.atomic(using=self.db):
+            objs = self.bulk_create(objs, **kwargs)
+            # the objects ignored as conflicts don't get a primary key
+            pks = [obj.pk for obj in objs if obj.pk is not None]
+            self._log_bulk_operation(user, ADDITION, pks, {})
+        return objs
+
+    def audited_bulk_update(self, objs, fields, user=None, **kwargs):
+        """
+        Updates the given fields of the objects with `bulk_update` and logs the
+        operation with one AuditLogEntry containing the updated objects and fields.
+        """
+        user = self._get_audit_user(user)
+        objs = list(objs)
+        audit_fields = self._get_update_audit_fields(user)
+        for obj in objs:
+            for name, value in audit_fields.items():
+                setattr(obj, name, value)
+        fields = [*fields, *(name for name in audit_fields if name not in fields)]
+
+        with transaction.atomic(using=self.db):
+            updated = self.bulk_update(objs, fields, **kwargs)
+            self._log_bulk_operation(
+                user,
+                CHANGE,
+                [obj.pk for obj in objs],
+                {"fields": self._get_attnames(fields)},
+            )
+        return updated
+
+    def _update_returning_pks(self, values):
+        """
+        Run the `UPDATE` of `update` with a `RETURNING` clause, and return the
+        primary keys of the updated objects.
+        """
+        query = self.query.chain(sql.UpdateQuery)
+        query.add_update_values(values)
+        query.annotations = {}
+        update_sql, params = query.get_compiler(self.db).as_sql()
+        connection = connections[self.db]
+        pk_column = connection.ops.quote_name(self.model._meta.pk.column)
+        with connection.cursor() as cursor:
+            cursor.execute(f"{update_sql} RETURNING {pk_column}", params)
+            pks = [pk for pk, in cursor.fetchall()]
+        # the fields of the parents of multi-table inheritance models
+        for related_query in query.get_related_updates():
+            related_query.get_compiler(self.db).execute_sql(NO_RESULTS)
+        return pks
+
+    def _get_audit_user(self, user):
+        if user is not None:
+            return user
+
+        from base.signals import get_user
+
+        return get_user()
+
+    def _get_audit_user_fields(self, user, *names):
+        if not user or user.is_anonymous:
+            return {}
+        field_names = get_model_plan(self.model).field_names
+        return {name: user for name in names if name in field_names}
+
+    def _get_update_audit_fields(self, user):
+        fields = self._get_audit_user_fields(user, "updated_by")
+        if "updated_at" in get_model_plan(self.model).field_names:
+            fields["updated_at"] = timezone.now()
+        return fields
+
+    def _get_attnames(self, names):
+        attnames = dict(get_model_plan(self.model).fields)
+        return [attnames.get(name, name) for name in names]
+
+    def _get_changed_fields_message(self, values):
+        plan = get_model_plan(self.model)
+        attnames = dict(plan.fields)
+        fields = {}
+        for name, value in values.items():
+            if name in plan.ignored_fields:
+                continue
+            if name in plan.sensitive_fields:
+                fields[attnames.get(name, name)] = "field updated"
+                continue
+            fields[attnames.get(name, name)] = {"to": get_loggable_value(value)}
+        return fields
+
+    def _log_bulk_operation(self, user, action, pks, message):
+        """
+        Logs an operation over several objects of the queryset model with a
+        single AuditLogEntry, summarizing the affected primary keys.
+        """
+        if not pks or not user or not user.id or self.model not in audited_models:
+            return
+
+        opts = self.model._meta
+        action_name = "added" if action == ADDITION else "changed"
+        message = {action_name: {**message, "objects": summarize_pks(pks)}}
+        audit_log_writer.add(
+            AuditLogEntry(
+                action_time=timezone.now(),
+                user_id=user.id,
+                content_type_id=ContentType.objects.get_for_model(self.model).id,
+                object_id=None,
+                object_repr=f"{len(pks)} {opts.verbose_name_plural}"[:200],
+                action_flag=action,
+                changes=message,
+            ),
+            using=self.db,
+        )
+
+
+class VersionableQuerySet(BaseQuerySet):
+    """Queryset of the models with `VersionableMixin`"""
+
+    def with_version_summary(self):
+        """
+        Prefetch the versions used by the properties of `VersionableMixin`, so
+        they don't run queries for every object of the list.
+        """
+        versions = self.get_versions_manager()
+        latest_updated = versions.select_related("updated_by").order_by("-updated_at")
+        return self.select_related("updated_by").prefetch_related(
+            Prefetch(
+                "versions",
+                queryset=versions.order_by("-version")[:1],
+                to_attr="_prefetched_last_version",
+            ),
+            Prefetch(
+                "versions",
+                queryset=latest_updated[:1],
+                to_attr="_prefetched_latest_updated_version",
+            ),
+        )
+
+    def get_versions_manager(self):
+        return self.model._meta.get_field("versions").related_model._default_manager
+
+
+class IncrementCounterQuerySet(models.QuerySet):
+    def reserve(self, key, count):
+        """
+        Add `count` to the counter `key`, creating it for new groups, and return
+        its new value, in a single query that locks the counter until the end of
+        the transaction.
+        """
+        connection = connections[self.db]
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        with connection.cursor() as cursor:
+            # when two transactions create the counter at the same time, the
+            # second one waits for the first and adds its count to it
+            cursor.execute(
+                f"INSERT INTO {table} AS counter (key, value)"  # noqa: S608
+                " VALUES (%s, %s) ON CONFLICT (key)"
+                " DO UPDATE SET value = counter.value + EXCLUDED.value"
+                " RETURNING value",
+                [key, count],
+            )
+            return cursor.fetchone()[0]
+
+    def release(self, key, value, last_value_queryset):
+        """
+        Move the counter `key` back to the last number used, selected by
+        `last_value_queryset`, when `value` is the last number it reserved.
+        """
+        connection = connections[self.db]
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        last_sql, last_params = last_value_queryset.query.get_compiler(
+            connection=connection
+        ).as_sql()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {table} SET value = COALESCE(({last_sql}), 0)"  # noqa: S608
+                " WHERE key = %s AND value = %s",
+                [*last_params, key, value],
+            )
+
+
+def get_loggable_value(value):
+    if isinstance(value, models.Model):
+        return value.pk
+    if hasattr(value, "resolve_expression"):
+        # expressions like F("field") + 1 are logged as their representation
+        return force_str(value)
+    return value
+
+
+def summarize_pks(pks):
+    """
+    Returns a compact representation of a list of primary keys: a range when
+    they are consecutive integers, the sorted list otherwise.
+    """
+    pks = sorted(pks)
+    first, last = pks[0], pks[-1]
+    if (
+        isinstance(first, int)
+        and isinstance(last, int)
+        and len(pks) > 2  # noqa: PLR2004
+        and last - first + 1 == len(set(pks)) == len(pks)
+    ):
+        return {"count": len(pks), "range": [first, last]}
+    return {"count": len(pks), "pks": pks}
+
+
+class StoredBlobQuerySet(models.QuerySet):
+    def add_reference(self, digest, name, size):
+        """
+        Count a new reference to the blob, registering it when it is new, in
+        a single query that locks it until the end of the transaction, so the
+        garbage collection doesn't delete it meanwhile.
+        """
+        connection = connections[self.db]
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {table} AS blob"  # noqa: S608
+                " (digest, name, size, reference_count, last_referenced_at)"
+                " VALUES (%s, %s, %s, 1, %s) ON CONFLICT (name) DO UPDATE SET"
+                " reference_count = blob.reference_count + 1,"
+                " last_referenced_at = EXCLUDED.last_referenced_at"
+                " RETURNING reference_count",
+                [digest, name, size, timezone.now()],
+            )
+            return cursor.fetchone()[0]
@@ -1,12 +1,32 @@
 # standard library
 import logging
-import threading
+import random
+
+from http import HTTPStatus
+from importlib import import_module
 
 # django
-from django.http import HttpResponse
-from django.http import HttpResponseServerError
+from django.conf import settings
+from django.contrib.auth import get_user
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import JsonResponse
 from django.utils.deprecation import MiddlewareMixin
 
+# others libraries
+from asgiref.sync import iscoroutinefunction
+from asgiref.sync import markcoroutinefunction
+
+from base.audit import audit_log_writer
+from base.fetch_plans import load_fetch_plans
+from base.fetch_plans import recording
+from base.fetch_plans import save_fetch_plans
+from base.query_budget import arecord_queries
+from base.query_budget import check_query_budget
+from base.query_budget import get_report
+from base.query_budget import record_queries
+from base.readiness import get_readiness
+from base.request_context import user_context
+
 logger = logging.getLogger(__name__)
 health_logger = logging.getLogger(__name__ + ".ReadinessCheckMiddleware")
 
@@ -15,47 +35,150 @@ class RequestMiddleware:
     """
     Middleware that stores the user that made a request. This is used when logging
     object creations/updates/deletions to obtain the user performing such action.
+
+    The user is kept in a context variable, so it is also available to async views
+    and to the sync code they run with `sync_to_async`.
     """
 
-    thread_local = threading.local()
+    sync_capable = True
+    async_capable = True
 
     def __init__(self, get_response):
         self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
 
     def __call__(self, request):
-        # Save the user that makes the request
-        self.thread_local.user = request.user
-        return self.get_response(request)
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        # Store all the log entries created by the request at once
+        with user_context(request.user), audit_log_writer.buffer():
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        with user_context(request.user):
+            async with audit_log_writer.abuffer():
+                return await self.get_response(request)
 
 
 class ReadinessCheckMiddleware(MiddlewareMixin):
     """
     Middleware that allows to run readiness checks before any database access is
-    performed.
+    performed. The result of the checks is cached, see `base.readiness`.
     """
 
     def process_request(self, request):
         if request.method == "GET" and request.path == "/_ready/":
-            return self.perform_readiness_check()
+            return self.perform_readiness_check(request)
         return self.get_response(request)
 
-    def perform_readiness_check(self):
+    def perform_readiness_check(self, request):
+        readiness = get_readiness()
+        failed = [
+            name for name, check in readiness["checks"].items() if not check["ok"]
+        ]
+        if failed:
+            health_logger.error("Readiness check failed: %s", ", ".join(failed))
+        if not settings.DEBUG and not self.is_authenticated(request):
+            # the details of the checks, like the connections, are not public
+            readiness = {"ready": readiness["ready"], "failed": failed}
+
+        if readiness["ready"]:
+            return JsonResponse(readiness)
+        return JsonResponse(readiness, status=HTTPStatus.SERVICE_UNAVAILABLE)
+
+    def is_authenticated(self, request):
+        """
+        Return whether the request comes from a logged in user. The session and
+        authentication middlewares don't run before this one, so the session is
+        only loaded for the requests with a session cookie, unlike the probes.
+        """
+        session_key = request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+        if not session_key:
+            return False
+        engine = import_module(settings.SESSION_ENGINE)
+        request.session = engine.SessionStore(session_key)
         try:
-            return self.check_connections()
-        except Exception as e:
-            health_logger.exception("Failure connecting to database", exc_info=e)
-            return HttpResponseServerError(
-                "Failure connecting to the DB", content_type="text/plain"
-            )
-
-    def check_connections(self):
-        from django.db import connections
-
-        for name in connections:
-            cursor = connections[name].cursor()
-            cursor.execute("SELECT 1;")
-            if cursor.fetchone() is None:
-                return HttpResponseServerError(
-                    "Got invalid response from DB", content_type="text/plain"
-                )
-        return HttpResponse()
+            return get_user(request).is_authenticated
+        except Exception:  # noqa: BLE001
+            # the database or the cache of the sessions may be what is failing
+            return False
+
+
+class FetchPlanRecordMiddleware:
+    """
+    Development middleware that records the relations accessed by the views
+    and adds them to the fetch plans file.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with recording() as recorder:
+            response = self.get_response(request)
+
+        recorded_plans = recorder.get_plans()
+        if recorded_plans:
+            plans = load_fetch_plans()
+            for key, recorded_plan in recorded_plans.items():
+                plan = plans.get(key, {})
+                plans[key] = {
+                    kind: sorted(set(plan.get(kind, [])) | set(paths))
+                    for kind, paths in recorded_plan.items()
+                }
+            save_fetch_plans(plans)
+        return response
+
+
+class QueryBudgetMiddleware:
+    """
+    Middleware that records the queries of a sample of the requests, stores
+    them in `request.query_stats` and logs the requests whose view exceeds its
+    query budget, see `base.query_budget`.
+
+    It is async capable, so async requests aren't switched to a thread here.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.QUERY_BUDGET_SAMPLE_RATE:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        if not self.is_sampled():
+            return self.get_response(request)
+
+        with record_queries() as stats:
+            response = self.get_response(request)
+        self.check_query_budget(request, stats)
+        return response
+
+    async def __acall__(self, request):
+        if not self.is_sampled():
+            return await self.get_response(request)
+
+        async with arecord_queries() as stats:
+            response = await self.get_response(request)
+        self.check_query_budget(request, stats)
+        return response
+
+    def is_sampled(self):
+        return random.random() < settings.QUERY_BUDGET_SAMPLE_RATE  # noqa: S311
+
+    def check_query_budget(self, request, stats):
+        request.query_stats = stats
+        resolver_match = request.resolver_match
+        if resolver_match is not None:
+            problems = check_query_budget(resolver_match, stats)
+            if problems:
+                logger.warning(get_report(resolver_match.view_name, stats, problems))
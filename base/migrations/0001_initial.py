@@ -0,0 +1,37 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:47
+
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="IncrementCounter",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "key",
+                    models.CharField(max_length=255, unique=True, verbose_name="key"),
+                ),
+                ("value", models.BigIntegerField(default=0, verbose_name="value")),
+            ],
+            options={
+                "verbose_name": "increment counter",
+                "verbose_name_plural": "increment counters",
+            },
+        ),
+    ]
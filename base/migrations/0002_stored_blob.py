@@ -0,0 +1,53 @@
+# Generated by Django 4.2.30 on 2026-10-18 12:07
+
+import django.utils.timezone
+
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("base", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StoredBlob",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "digest",
+                    models.CharField(max_length=64, unique=True, verbose_name="digest"),
+                ),
+                ("name", models.CharField(max_length=255, verbose_name="name")),
+                ("size", models.BigIntegerField(verbose_name="size")),
+                (
+                    "reference_count",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="reference count"
+                    ),
+                ),
+                (
+                    "last_referenced_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now,
+                        verbose_name="last referenced at",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "stored blob",
+                "verbose_name_plural": "stored blobs",
+            },
+        ),
+    ]
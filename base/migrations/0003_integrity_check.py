@@ -0,0 +1,70 @@
+# Generated by Django 4.2.30 on 2026-10-18 12:45
+
+import datetime
+
+import django.utils.timezone
+
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("base", "0002_stored_blob"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IntegrityCheck",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "started_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, verbose_name="started at"
+                    ),
+                ),
+                (
+                    "finished_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="finished at"
+                    ),
+                ),
+                (
+                    "duration",
+                    models.DurationField(
+                        default=datetime.timedelta, verbose_name="duration"
+                    ),
+                ),
+                (
+                    "checkpoints",
+                    models.JSONField(default=dict, verbose_name="checkpoints"),
+                ),
+                (
+                    "verified_files",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="verified files"
+                    ),
+                ),
+                (
+                    "verified_bytes",
+                    models.BigIntegerField(default=0, verbose_name="verified bytes"),
+                ),
+                ("drift", models.JSONField(default=list, verbose_name="drift")),
+            ],
+            options={
+                "verbose_name": "integrity check",
+                "verbose_name_plural": "integrity checks",
+                "ordering": ("-started_at",),
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.30 on 2026-10-18 13:15
+
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("base", "0003_integrity_check"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="storedblob",
+            name="digest",
+            field=models.CharField(db_index=True, max_length=64, verbose_name="digest"),
+        ),
+        migrations.AlterField(
+            model_name="storedblob",
+            name="name",
+            field=models.CharField(max_length=255, unique=True, verbose_name="name"),
+        ),
+    ]
@@ -0,0 +1,52 @@
+from django.db import migrations
+from django.db.models import Max
+
+# (model, incremented field, field of the group) of the IncrementFieldModelBase
+# subclasses, the counters are keyed like `_get_increment_key`
+INCREMENTED_FIELDS = (
+    ("documents.DocumentVersion", "version", "document_id"),
+    ("processes.ProcessVersion", "version", "process_id"),
+    ("processes.ProcessActivity", "order", "process_version_id"),
+)
+
+
+def seed_increment_counters(apps, schema_editor):
+    """Start the counter of every group from the last number it used"""
+    IncrementCounter = apps.get_model("base", "IncrementCounter")
+    db_alias = schema_editor.connection.alias
+    counters = dict(
+        IncrementCounter.objects.using(db_alias).values_list("key", "value")
+    )
+
+    for label, field, scope_field in INCREMENTED_FIELDS:
+        model = apps.get_model(label)
+        last_values = (
+            model._base_manager.using(db_alias)
+            .exclude(**{field: None})
+            .values_list(scope_field)
+            .annotate(last=Max(field))
+            .order_by()
+        )
+        for scope, last in last_values:
+            key = f"{model._meta.label_lower}.{field}:{scope}"
+            counters[key] = max(counters.get(key, 0), last)
+
+    IncrementCounter.objects.using(db_alias).bulk_create(
+        [IncrementCounter(key=key, value=value) for key, value in counters.items()],
+        update_conflicts=True,
+        unique_fields=["key"],
+        update_fields=["value"],
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("base", "0004_stored_blob_name_key"),
+        ("documents", "0014_alter_documenttype_options"),
+        ("processes", "0012_processversion_email_to_notify_completion"),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_increment_counters, migrations.RunPython.noop),
+    ]
@@ -1,15 +1,14 @@
-import json
-
-from django.conf import settings
 from django.contrib.admin.models import ADDITION
 from django.contrib.admin.models import CHANGE
 from django.contrib.admin.models import DELETION
-from django.contrib.admin.models import LogEntry
 from django.contrib.contenttypes.models import ContentType
+from django.utils import timezone
 from django.utils.encoding import force_str
 
+from audit.models import AuditLogEntry
+
 # base
-from base.serializers import ModelEncoder
+from base.audit import audit_log_writer
 
 
 class AuditMixin:
@@ -22,19 +21,22 @@ class AuditMixin:
         if not user or not user.id:
             return
 
-        LogEntry.objects.create(
-            user_id=user.id,
-            content_type_id=ContentType.objects.get_for_model(self).id,
-            object_id=self.id,
-            object_repr=force_str(self)[:200],
-            action_flag=action,
-            change_message=json.dumps(message, cls=ModelEncoder),
+        # entries are written in bulk once the current transaction is committed
+        audit_log_writer.add(
+            AuditLogEntry(
+                action_time=timezone.now(),
+                user_id=user.id,
+                content_type_id=ContentType.objects.get_for_model(self).id,
+                object_id=str(self.id),
+                object_repr=force_str(self)[:200],
+                action_flag=action,
+                changes=message,
+            ),
+            using=self._state.db,
         )
 
         # reset original dictionary as model has permanently changed
-        self.original_dict = self.to_dict(
-            exclude=settings.LOG_IGNORE_FIELDS, include_m2m=False
-        )
+        self.reset_original_dict()
 
     def _save_addition(self, user, message):
         self._save_log(user, message, ADDITION)
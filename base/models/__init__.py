@@ -1,4 +1,13 @@
 from .base_model import BaseModel
+from .increment_counter import IncrementCounter
+from .integrity_check import IntegrityCheck
 from .orderable_model import OrderableModel
+from .stored_blob import StoredBlob
 
-__all__ = ["BaseModel", "OrderableModel"]
+__all__ = [
+    "BaseModel",
+    "IncrementCounter",
+    "IntegrityCheck",
+    "OrderableModel",
+    "StoredBlob",
+]
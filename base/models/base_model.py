@@ -2,9 +2,12 @@ import json
 
 from django.conf import settings
 from django.db import models
+from django.db.models import DEFERRED
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+from base.audit import get_model_plan
+from base.managers import BaseQuerySet
 from base.mixins import AuditMixin
 from base.serializers import ModelEncoder
 from base.utils import build_absolute_url_wo_req
@@ -43,29 +46,70 @@ class BaseModel(AuditMixin, models.Model):
         null=True,
     )
 
-    # field used to store a dictionary with the instance original fields
-    original_dict = None
+    objects = BaseQuerySet.as_manager()
 
     class Meta:
         abstract = True
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.original_dict = self.to_dict(
-            exclude=settings.LOG_IGNORE_FIELDS,
-            include_m2m=False,
-        )
+        # Keep the values the instance was created with, the dictionary used to
+        # log changes is only built from them when the instance is saved.
+        # Instances loaded from the database receive every field as a positional
+        # argument, so no copy is required for them.
+        if kwargs or len(args) != len(self._meta.concrete_fields):
+            self._original_state = self.__dict__.copy()
+        else:
+            self._original_state = args
+        self._original_dict = None
+
+    @property
+    def original_dict(self):
+        """
+        Dictionary with the values of the instance fields when it was loaded or
+        last logged, used to detect which fields changed.
+        """
+        if self._original_dict is None:
+            self._original_dict = self._get_original_dict()
+        return self._original_dict
+
+    @original_dict.setter
+    def original_dict(self, value):
+        self._original_dict = value
+
+    def _get_original_dict(self):
+        plan = get_model_plan(self.__class__)
+        state = self._original_state
+        if not isinstance(state, dict):
+            state = {
+                attname: value
+                for attname, value in zip(plan.concrete_attnames, state, strict=True)
+                if value is not DEFERRED
+            }
+        return {attname: state.get(attname) for attname in plan.logged_attnames}
+
+    def reset_original_dict(self):
+        """Take the current values as the original ones"""
+        self._original_state = self.__dict__.copy()
+        self._original_dict = None
 
     def _save_addition(self, user, message):
         if user and not user.is_anonymous:
-            self.update(created_by=user, updated_by=user, skip_save=True)
+            self._update_audit_fields(created_by=user, updated_by=user)
         return super()._save_addition(user, message)
 
     def _save_edition(self, user, message):
         if user and not user.is_anonymous:
-            self.update(updated_by=user, skip_save=True)
+            self._update_audit_fields(updated_by=user)
         return super()._save_edition(user, message)
 
+    def _update_audit_fields(self, **kwargs):
+        # stored without logging them, they are part of the change being logged
+        kwargs["updated_at"] = timezone.now()
+        for name, value in kwargs.items():
+            setattr(self, name, value)
+        self.__class__._base_manager.filter(pk=self.pk).update(**kwargs)
+
     # public methods
     def update(self, skip_save=False, **kwargs):
         """
@@ -76,15 +120,23 @@ class BaseModel(AuditMixin, models.Model):
         To store values into the database, this method uses the `save` method
         with the `update_fields` parameter, but if you want to skip the save
         method, you can pass the parameter `skip_save=True` when calling update
-        (useful when you want to avoid calling save signals).
+        (useful when you want to avoid calling save signals). The change is
+        still logged with `audited_update`, which, unlike `save`, also sets
+        `updated_by` to the user performing the current request.
         """
         kwargs["updated_at"] = timezone.now()
+        if skip_save and "updated_by" not in kwargs:
+            from base.signals import get_user
+
+            user = get_user()
+            if user and not user.is_anonymous:
+                kwargs["updated_by"] = user
 
         for kw in kwargs:
             self.__setattr__(kw, kwargs[kw])
 
         if skip_save:
-            self.__class__.objects.filter(pk=self.pk).update(**kwargs)
+            self.__class__.objects.filter(pk=self.pk).audited_update(**kwargs)
         else:
             self.save(update_fields=kwargs.keys())
 
@@ -99,30 +151,23 @@ class BaseModel(AuditMixin, models.Model):
         fields will be excluded from the returned dict, even if they are listed
         in the ``fields`` argument.
         """
-
-        opts = self._meta
-        data = {}
-        for f in opts.fields + opts.many_to_many:
-            if fields and f.name not in fields:
-                continue
-            if exclude and f.name in exclude:
-                continue
-            if isinstance(f, models.fields.related.ForeignKey):
-                data[f.attname] = self.__dict__.get(f.attname)
-            elif isinstance(f, models.fields.related.ManyToManyField):
-                if include_m2m:
-                    # If the object doesn't have a primary key yet, just use an
-                    # emptylist for its m2m fields. Calling f.value_from_object
-                    # will raise an exception.
-                    if self.pk is None:
-                        data[f.name] = []
-                    else:
-                        # MultipleChoiceWidget needs a list of pks, not objects
-                        data[f.name + "_ids"] = list(
-                            getattr(self, f.attname).values_list("pk", flat=True),
-                        )
-            else:
-                data[f.name] = self.__dict__.get(f.name)
+        attnames, m2m_fields = get_model_plan(self.__class__).get_field_plan(
+            fields, exclude
+        )
+        state = self.__dict__
+        data = {attname: state.get(attname) for attname in attnames}
+        if include_m2m:
+            for name in m2m_fields:
+                # If the object doesn't have a primary key yet, just use an
+                # emptylist for its m2m fields. Calling f.value_from_object
+                # will raise an exception.
+                if self.pk is None:
+                    data[name] = []
+                else:
+                    # MultipleChoiceWidget needs a list of pks, not objects
+                    data[name + "_ids"] = list(
+                        getattr(self, name).values_list("pk", flat=True),
+                    )
         return data
 
     def to_json(self, fields=None, exclude=None, **kargs):
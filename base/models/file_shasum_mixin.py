@@ -0,0 +1,75 @@
+import hashlib
+
+from django.db import transaction
+
+from base.direct_uploads import is_pending_upload
+
+
+def get_file_shasum(field_file):
+    """
+    Return the SHA-256 of the file, the one computed by the upload handlers
+    when it was just uploaded, the one in its name when it is stored by
+    content, or reading it from the storage otherwise.
+    """
+    get_name_digest = getattr(field_file.storage, "get_name_digest", None)
+    if field_file._committed and get_name_digest:
+        shasum = get_name_digest(field_file.name)
+        if shasum:
+            return shasum
+    if not field_file._committed:
+        shasum = getattr(field_file.file, "sha256", None)
+        if shasum:
+            return shasum
+
+    sha256 = hashlib.sha256()
+    for chunk in field_file.chunks():
+        sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+class FileShasumMixin:
+    """
+    Mixin for models that keep the SHA-256 of their `file` in `shasum`.
+
+    `_set_shasum()` is only called when the saved fields include one of
+    `shasum_fields`, and it should only hash the file when
+    `file_has_changed()`, as reading it means downloading it from the storage.
+    Files uploaded directly to the storage are hashed by a celery task, after
+    they are moved to their final name.
+    """
+
+    shasum_fields = ("file",)
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        pending_upload = is_pending_upload(self.file)
+        if update_fields is None or set(update_fields) & set(self.shasum_fields):
+            if pending_upload:
+                self.shasum = ""
+            else:
+                self._set_shasum()
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "shasum"}
+        super().save(*args, **kwargs)
+        self._hashed_file_name = self.file.name
+
+        if pending_upload:
+            from base.tasks import store_direct_upload
+
+            label, pk = self._meta.label, self.pk
+            transaction.on_commit(lambda: store_direct_upload.delay(label, pk))
+
+    def _set_shasum(self):
+        raise NotImplementedError
+
+    def file_has_changed(self):
+        """Return if the file is not the one `shasum` was computed from"""
+        if not self.file._committed or not self.shasum:
+            return True
+        try:
+            hashed_file_name = self._hashed_file_name
+        except AttributeError:
+            # the name the instance was loaded or created with
+            original_file = self.original_dict.get("file")
+            hashed_file_name = getattr(original_file, "name", original_file)
+        return self.file.name != hashed_file_name
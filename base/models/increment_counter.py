@@ -0,0 +1,30 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from base.managers import IncrementCounterQuerySet
+
+
+class IncrementCounter(models.Model):
+    """
+    The last value assigned by `IncrementFieldModelBase` to the objects that
+    are numbered together, like the versions of a document.
+    """
+
+    key = models.CharField(
+        max_length=255,
+        unique=True,
+        verbose_name=_("key"),
+    )
+    value = models.BigIntegerField(
+        default=0,
+        verbose_name=_("value"),
+    )
+
+    objects = IncrementCounterQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = _("increment counter")
+        verbose_name_plural = _("increment counters")
+
+    def __str__(self):
+        return f"{self.key}: {self.value}"
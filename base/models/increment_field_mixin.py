@@ -1,7 +1,23 @@
 from django.db import models
+from django.db import router
+
+from base.models.increment_counter import IncrementCounter
 
 
 class IncrementFieldModelBase(models.Model):
+    """
+    Numbers new objects consecutively (1, 2, 3...) among the objects of
+    `_get_increment_queryset`, like the versions of a document.
+
+    The last number of each group is kept in an `IncrementCounter` row, which is
+    incremented atomically, so concurrent inserts never get the same number.
+    Deleting the object with the last number of its group frees the number,
+    like the versions numbered with the maximum did, but the numbers of other
+    deleted objects, and of objects deleted with `QuerySet.delete()`, are not
+    reused. Objects saved with an explicit number must reserve it first, see
+    `assign_increments`.
+    """
+
     class Meta:
         abstract = True
 
@@ -10,13 +26,66 @@ class IncrementFieldModelBase(models.Model):
             self._auto_increment_field(self._get_field_to_increment())
         super().save(*args, **kwargs)
 
+    def delete(self, *args, **kwargs):
+        field = self._get_field_to_increment()
+        value = getattr(self, field)
+        result = super().delete(*args, **kwargs)
+        if value is not None:
+            using = router.db_for_write(self.__class__, instance=self)
+            IncrementCounter.objects.using(using).release(
+                self._get_increment_key(field), value, self._get_last_value_queryset()
+            )
+        return result
+
     def _auto_increment_field(self, field: str) -> None:
-        last = (
+        (value,) = self.reserve_increments(1)
+        setattr(self, field, value)
+
+    def reserve_increments(self, count: int) -> range:
+        """Reserve `count` consecutive numbers for objects of this group"""
+        field = self._get_field_to_increment()
+        using = router.db_for_write(self.__class__, instance=self)
+        last = IncrementCounter.objects.using(using).reserve(
+            self._get_increment_key(field), count
+        )
+        return range(last - count + 1, last + 1)
+
+    def _get_last_value_queryset(self):
+        field = self._get_field_to_increment()
+        return (
             self._get_increment_queryset()
-            .aggregate(models.Max(field))
-            .get(f"{field}__max")
+            .exclude(**{field: None})
+            .order_by(f"-{field}")
+            .values(field)[:1]
         )
-        setattr(self, field, last + 1 if last is not None else 1)
+
+    @classmethod
+    def assign_increments(cls, objs):
+        """
+        Number unsaved objects before a `bulk_create`, reserving the numbers of
+        each group with a single query.
+        """
+        groups = {}
+        for obj in objs:
+            groups.setdefault(obj._get_increment_scope(), []).append(obj)
+
+        for group in groups.values():
+            field = group[0]._get_field_to_increment()
+            values = group[0].reserve_increments(len(group))
+            for obj, value in zip(group, values, strict=True):
+                setattr(obj, field, value)
+        return objs
+
+    def _get_increment_key(self, field: str) -> str:
+        return f"{self._meta.label_lower}.{field}:{self._get_increment_scope()}"
+
+    def _get_increment_scope(self) -> str:
+        """
+        Identify the group of objects numbered together, like the id of their
+        parent, the same for all the objects of `_get_increment_queryset`.
+        """
+        msg = f"You must define {self.__class__.__name__}._get_increment_scope()"
+        raise NotImplementedError(msg)
 
     def _get_increment_queryset(self) -> type[models.QuerySet]:
         msg = f"You must define {self.__class__.__name__}._get_increment_queryset()"
@@ -0,0 +1,56 @@
+import datetime
+
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+
+class IntegrityCheck(models.Model):
+    """
+    A verification of the stored files against their recorded SHA-256, with
+    the last verified primary key of every model to resume it. See
+    `base.integrity`.
+    """
+
+    started_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name=_("started at"),
+    )
+    finished_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name=_("finished at"),
+    )
+    duration = models.DurationField(
+        default=datetime.timedelta,
+        verbose_name=_("duration"),
+    )
+    checkpoints = models.JSONField(
+        default=dict,
+        verbose_name=_("checkpoints"),
+    )
+    verified_files = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("verified files"),
+    )
+    verified_bytes = models.BigIntegerField(
+        default=0,
+        verbose_name=_("verified bytes"),
+    )
+    drift = models.JSONField(
+        default=list,
+        verbose_name=_("drift"),
+    )
+
+    class Meta:
+        verbose_name = _("integrity check")
+        verbose_name_plural = _("integrity checks")
+        ordering = ("-started_at",)
+
+    def __str__(self):
+        return f"{self._meta.verbose_name} {self.started_at:%Y-%m-%d %H:%M}"
+
+    @property
+    def gigabytes_per_minute(self):
+        minutes = self.duration.total_seconds() / 60
+        return self.verified_bytes / 2**30 / minutes if minutes else 0.0
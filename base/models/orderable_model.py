@@ -1,11 +1,40 @@
+from django.contrib.admin.models import CHANGE
+from django.db import connections
 from django.db import models
+from django.db import router
+from django.db import transaction
+from django.db.models import F
+from django.db.models import Max
+from django.db.models import Min
+from django.db.models import Window
+from django.db.models.functions import RowNumber
 from django.utils.translation import gettext_lazy as _
 
 from base.models import BaseModel
 
+# renumbers the objects in a single statement, keeping their current order
+RENUMBER_SQL = """
+UPDATE {table} SET {column} = ordered.position * %s
+FROM ({ordered}) AS ordered
+WHERE {table}.{pk} = ordered.ordered_pk AND {table}.{column} <> ordered.position * %s
+RETURNING {table}.{pk}
+"""
+
 
 class OrderableModel(BaseModel):
-    display_order = models.PositiveSmallIntegerField(
+    """
+    Model with a customizable order.
+
+    Objects are numbered with gaps of `display_order_step`, so moving an object
+    between two others usually updates only that object. When there is no room
+    left, the objects after it are shifted, and `reorder_display_order` restores
+    the gaps of all the objects with a single query.
+    """
+
+    display_order_step = 1024
+    max_display_order = 2_147_483_647
+
+    display_order = models.PositiveIntegerField(
         _("display order"),
         default=0,
     )
@@ -16,25 +45,129 @@ class OrderableModel(BaseModel):
 
     def save(self, *args, **kwargs):
         if self.pk is None:
-            self._set_display_order()
-        super().save(*args, **kwargs)
+            with transaction.atomic(using=router.db_for_write(self.__class__)):
+                self._set_display_order()
+                super().save(*args, **kwargs)
+        else:
+            super().save(*args, **kwargs)
 
     def _set_display_order(self):
         """
-        When adding a new object, set display_order field
-        counting all objects plus 1
+        When adding a new object, place it after the last object. The ordering
+        is locked until the object is stored, so concurrent inserts don't get
+        the same value.
         """
-        obj_count = self.__class__.objects.count()
-        self.display_order = obj_count + 1
+        self.lock_display_order()
+        last = self.get_ordering_queryset().aggregate(Max("display_order"))
+        self.display_order = (last["display_order__max"] or 0) + self.display_order_step
+
+    @classmethod
+    def get_ordering_queryset(cls):
+        """Return the objects ordered together"""
+        return cls._default_manager.all()
+
+    @classmethod
+    def lock_display_order(cls):
+        """Lock the ordering until the end of the current transaction"""
+        connection = connections[router.db_for_write(cls)]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_advisory_xact_lock(hashtext(%s))", [cls._meta.db_table]
+            )
 
     @classmethod
     def reorder_display_order(cls):
         """
-        Take all objects and change order value
+        Renumber the objects with a single query, keeping their order and
+        leaving a gap of `display_order_step` between them.
+        """
+        queryset = cls.get_ordering_queryset()
+        connection = connections[queryset.db]
+        quote_name = connection.ops.quote_name
+        ordered = queryset.order_by().values(
+            ordered_pk=F("pk"),
+            position=Window(
+                RowNumber(), order_by=(F("display_order").asc(), F("pk").asc())
+            ),
+        )
+        ordered_sql, ordered_params = ordered.query.sql_with_params()
+        sql = RENUMBER_SQL.format(
+            table=quote_name(cls._meta.db_table),
+            column=quote_name(cls._meta.get_field("display_order").column),
+            pk=quote_name(cls._meta.pk.column),
+            ordered=ordered_sql,
+        )
+        step = cls.display_order_step
+
+        with transaction.atomic(using=queryset.db):
+            cls.lock_display_order()
+            with connection.cursor() as cursor:
+                cursor.execute(sql, [step, *ordered_params, step])
+                pks = [pk for pk, in cursor.fetchall()]
+            queryset._log_bulk_operation(
+                queryset._get_audit_user(None),
+                CHANGE,
+                pks,
+                {"fields": ["display_order"]},
+            )
+        return len(pks)
+
+    @classmethod
+    def move(cls, obj, before=None, after=None):
+        """
+        Place `obj` right before or right after another object, or at the end
+        when neither is given.
+        """
+        queryset = cls.get_ordering_queryset()
+        with transaction.atomic(using=queryset.db):
+            cls.lock_display_order()
+            previous, following = cls._get_move_bounds(obj, before, after)
+            if following is None and previous + cls.display_order_step > (
+                cls.max_display_order
+            ):
+                cls.reorder_display_order()
+                previous, following = cls._get_move_bounds(obj, before, after)
+
+            if following is None:
+                display_order = previous + cls.display_order_step
+            else:
+                if following - previous < 2:  # noqa: PLR2004
+                    if following <= previous:
+                        # objects with the same order, renumber all of them
+                        cls.reorder_display_order()
+                    else:
+                        # no room left, make room by shifting the following ones
+                        queryset.filter(display_order__gte=following).exclude(
+                            pk=obj.pk
+                        ).audited_update(
+                            display_order=F("display_order") + cls.display_order_step
+                        )
+                    previous, following = cls._get_move_bounds(obj, before, after)
+                display_order = previous + (following - previous) // 2
+
+            queryset.filter(pk=obj.pk).audited_update(display_order=display_order)
+        obj.display_order = display_order
+        return obj
+
+    @classmethod
+    def _get_move_bounds(cls, obj, before, after):
+        """
+        Return the display orders between which `obj` must be placed, the second
+        one is None when it goes last.
         """
-        objects = cls.objects.all()
-        order = 0
-        for obj in objects:
-            obj.display_order = order
-            obj.save()
-            order += 1
+        others = cls.get_ordering_queryset().exclude(pk=obj.pk)
+        if before is not None:
+            following = others.values_list("display_order", flat=True).get(pk=before.pk)
+            previous = others.filter(display_order__lt=following).aggregate(
+                value=Max("display_order")
+            )["value"]
+            return previous or 0, following
+
+        if after is not None:
+            previous = others.values_list("display_order", flat=True).get(pk=after.pk)
+        else:
+            previous = others.aggregate(value=Max("display_order"))["value"] or 0
+        following = others.filter(display_order__gt=previous).aggregate(
+            value=Min("display_order")
+        )["value"]
+        return previous, following
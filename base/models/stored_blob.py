@@ -0,0 +1,44 @@
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from base.managers import StoredBlobQuerySet
+
+
+class StoredBlob(models.Model):
+    """
+    A file of the content addressed storage, shared by every file field with
+    the same content and extension. See `base.storage`.
+    """
+
+    digest = models.CharField(
+        max_length=64,
+        db_index=True,
+        verbose_name=_("digest"),
+    )
+    # the digest and the extension, the same content may have several
+    name = models.CharField(
+        max_length=255,
+        unique=True,
+        verbose_name=_("name"),
+    )
+    size = models.BigIntegerField(
+        verbose_name=_("size"),
+    )
+    reference_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("reference count"),
+    )
+    last_referenced_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name=_("last referenced at"),
+    )
+
+    objects = StoredBlobQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = _("stored blob")
+        verbose_name_plural = _("stored blobs")
+
+    def __str__(self):
+        return self.name
@@ -8,6 +8,14 @@ from users.models.user import User
 
 
 class VersionableMixin:
+    """
+    Mixin for models with a `versions` relation.
+
+    Its properties run queries on every call, use the `with_version_summary`
+    method of `VersionableQuerySet` to prefetch what they need for a list of
+    objects.
+    """
+
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         super().__init__(*args, **kwargs)
         if not hasattr(self, "versions"):
@@ -16,18 +24,39 @@ class VersionableMixin:
 
     @property
     def last_version(self) -> type[models.Model] | None:
-        return self.versions.order_by("-version").first()
+        return self.get_summary_version(
+            "_prefetched_last_version", self.versions.order_by("-version")
+        )
 
     @property
     def latest_update(self) -> datetime.datetime:
-        if not self.versions.exists():
+        version = self.latest_updated_version
+        if version is None:
             return self.updated_at
-        return max(self.updated_at, self.versions.latest("updated_at").updated_at)
+        return max(self.updated_at, version.updated_at)
 
     @property
     def latest_updator(self) -> User:
-        if not self.versions.exists():
+        version = self.latest_updated_version
+        if version is None:
             return self.updated_by
-        return max(
-            self, self.versions.latest("updated_at"), key=lambda x: x.updated_at
-        ).updated_by
+        return max(self, version, key=lambda x: x.updated_at).updated_by
+
+    @property
+    def latest_updated_version(self) -> type[models.Model] | None:
+        return self.get_summary_version(
+            "_prefetched_latest_updated_version",
+            self.versions.order_by("-updated_at"),
+        )
+
+    def get_summary_version(
+        self, attr: str, queryset: models.QuerySet
+    ) -> type[models.Model] | None:
+        """
+        Return the version prefetched by `with_version_summary` as `attr`, or
+        the first version of `queryset` when it was not prefetched.
+        """
+        versions = self.__dict__.get(attr)
+        if versions is None:
+            return queryset.first()
+        return versions[0] if versions else None
@@ -0,0 +1,250 @@
+"""
+Keyset (cursor) pagination.
+
+Instead of skipping `OFFSET` rows, every page is read right after (or before)
+the ordering values of the last (or first) object of the page the user comes
+from, so deep pages cost the same as the first one and the total number of
+objects is never needed to render them.
+"""
+import base64
+import binascii
+import contextlib
+import datetime
+import json
+
+from collections.abc import Sequence
+
+from django.core.exceptions import FieldError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import F
+from django.db.models import OrderBy
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+NEXT = "n"
+PREVIOUS = "p"
+
+ESTIMATED_COUNT_SQL = "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass"
+
+
+class InvalidCursorError(Exception):
+    pass
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    def default(self, o):
+        # keep the microseconds, DjangoJSONEncoder rounds them to milliseconds
+        if isinstance(o, datetime.datetime | datetime.time):
+            return o.isoformat()
+        return super().default(o)
+
+
+def encode_cursor(direction, values):
+    data = json.dumps([direction, values], cls=CursorEncoder)
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor, length):
+    try:
+        data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        direction, values = json.loads(data)
+    except (binascii.Error, TypeError, ValueError) as error:
+        raise InvalidCursorError from error
+
+    if direction not in (NEXT, PREVIOUS) or not isinstance(values, list):
+        raise InvalidCursorError
+    if len(values) != length:
+        # the ordering changed since the cursor was generated
+        raise InvalidCursorError
+    return direction, values
+
+
+class KeysetPaginator:
+    """
+    Paginate a queryset seeking on its ordering fields and the primary key.
+
+    The ordering is taken from the queryset (or the model `Meta.ordering`) and
+    the primary key is appended to it to make it unique. Ordering by a relation
+    orders by its id, not by the ordering of the related model.
+
+    When `estimate_count_threshold` is given, `count` of unfiltered querysets
+    reads the planner estimate of the number of rows of the table, and only
+    counts them when the estimate is below the threshold.
+    """
+
+    def __init__(self, object_list, per_page, estimate_count_threshold=None):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.estimate_count_threshold = estimate_count_threshold
+        self.count_is_estimated = False
+        self.fields = self.get_ordering_fields(object_list)
+
+    def get_ordering_fields(self, queryset):
+        """Return (name, descending) tuples of the ordering, ending on the pk"""
+        query = queryset.query
+        ordering = query.order_by
+        if not ordering and query.default_ordering:
+            ordering = queryset.model._meta.ordering
+
+        fields = []
+        for order in ordering:
+            if isinstance(order, OrderBy) and isinstance(order.expression, F):
+                fields.append((order.expression.name, order.descending))
+            elif isinstance(order, str) and order != "?":
+                fields.append((order.lstrip("-"), order.startswith("-")))
+            else:
+                msg = f"Cannot paginate with a cursor ordering by {order!r}"
+                raise FieldError(msg)
+
+        pk_names = {"pk", queryset.model._meta.pk.name}
+        if not any(name in pk_names for name, _descending in fields):
+            fields.append(("pk", False))
+        return fields
+
+    def get_ordered_queryset(self, reverse=False):
+        """
+        Return the queryset ordered by annotations with the ordering values,
+        so the cursor values can be read from the objects themselves.
+        """
+        annotations = {
+            f"_keyset_{i}": F(name) for i, (name, _) in enumerate(self.fields)
+        }
+        ordering = [
+            f"-{alias}" if descending != reverse else alias
+            for alias, (_name, descending) in zip(annotations, self.fields, strict=True)
+        ]
+        return self.object_list.annotate(**annotations).order_by(*ordering)
+
+    def get_seek_filter(self, values, reverse=False):
+        """
+        Return a filter of the objects that come after `values` in the
+        ordering, or before them when `reverse` is True.
+
+        Postgres sorts null values as if they were bigger than any other value.
+        """
+        seek = Q(pk__in=[])
+        equal = Q()
+        for i, ((_name, descending), value) in enumerate(
+            zip(self.fields, values, strict=True)
+        ):
+            alias = f"_keyset_{i}"
+            if descending != reverse:
+                if value is None:
+                    after = Q(**{f"{alias}__isnull": False})
+                else:
+                    after = Q(**{f"{alias}__lt": value})
+            elif value is None:
+                after = Q(pk__in=[])
+            else:
+                after = Q(**{f"{alias}__gt": value}) | Q(**{f"{alias}__isnull": True})
+
+            seek |= equal & after
+            if value is None:
+                equal &= Q(**{f"{alias}__isnull": True})
+            else:
+                equal &= Q(**{alias: value})
+        return seek
+
+    def get_cursor_values(self, obj):
+        aliases = [f"_keyset_{i}" for i in range(len(self.fields))]
+        if isinstance(obj, dict):
+            # values() querysets
+            return [obj[alias] for alias in aliases]
+        return [getattr(obj, alias) for alias in aliases]
+
+    def page(self, cursor=None):
+        """
+        Return the page after or before the given cursor, invalid cursors
+        return the first page.
+        """
+        direction = values = None
+        if cursor:
+            with contextlib.suppress(InvalidCursorError):
+                direction, values = decode_cursor(cursor, len(self.fields))
+
+        if direction == PREVIOUS:
+            queryset = self.get_ordered_queryset(reverse=True)
+            queryset = queryset.filter(self.get_seek_filter(values, reverse=True))
+            objects = list(queryset[: self.per_page + 1])
+            if len(objects) <= self.per_page:
+                # reached the beginning, the first page may have more objects
+                return self.page()
+            objects = objects[: self.per_page][::-1]
+            return KeysetPage(objects, self, has_previous=True, has_next=True)
+
+        queryset = self.get_ordered_queryset()
+        if direction == NEXT:
+            queryset = queryset.filter(self.get_seek_filter(values))
+        objects = list(queryset[: self.per_page + 1])
+        return KeysetPage(
+            objects[: self.per_page],
+            self,
+            has_previous=direction == NEXT,
+            has_next=len(objects) > self.per_page,
+        )
+
+    @cached_property
+    def count(self):
+        if self.estimate_count_threshold is not None:
+            estimate = self.get_estimated_count()
+            if estimate is not None and estimate >= self.estimate_count_threshold:
+                self.count_is_estimated = True
+                return estimate
+        return self.object_list.count()
+
+    def get_estimated_count(self):
+        """
+        Return the number of rows of the table according to `pg_class`, or
+        None when the queryset is filtered or the table was never analyzed.
+        """
+        queryset = self.object_list
+        if queryset.query.where or queryset.query.is_sliced:
+            return None
+
+        with connections[queryset.db].cursor() as cursor:
+            cursor.execute(ESTIMATED_COUNT_SQL, [queryset.model._meta.db_table])
+            row = cursor.fetchone()
+        if row is None or row[0] < 0:
+            return None
+        return row[0]
+
+
+class KeysetPage(Sequence):
+    def __init__(self, object_list, paginator, has_previous, has_next):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_previous = has_previous
+        self._has_next = has_next
+
+    def __repr__(self):
+        return f"<Page of {len(self)} objects>"
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self.has_previous() or self.has_next()
+
+    @property
+    def next_cursor(self):
+        if not self.has_next():
+            return None
+        values = self.paginator.get_cursor_values(self.object_list[-1])
+        return encode_cursor(NEXT, values)
+
+    @property
+    def previous_cursor(self):
+        if not self.has_previous():
+            return None
+        values = self.paginator.get_cursor_values(self.object_list[0])
+        return encode_cursor(PREVIOUS, values)
@@ -0,0 +1,177 @@
+"""
+Query budgets: the number of queries and the database time a view may use.
+
+Views declare their budget with the `query_budget` (number of queries) and
+`query_time_budget` (milliseconds) attributes. Views that don't declare a
+number of queries use the one learned for their url name from the url sweep
+test, stored in `settings.QUERY_BUDGETS_FILE`.
+
+`QueryBudgetMiddleware` records the queries of the requests (all of them in
+tests, a sample of them with `QUERY_BUDGET_SAMPLE_RATE` in production): how
+many, their total time, and how many times each statement was repeated, as
+repeated statements with different parameters usually come from a relation
+read once for every object of a list.
+"""
+import contextlib
+import contextvars
+import functools
+import json
+import re
+import time
+
+from collections import Counter
+
+from django.conf import settings
+from django.db import connections
+
+from asgiref.sync import sync_to_async
+
+IN_LIST_RE = re.compile(r"IN \((?:%s, )*%s\)")
+NUMBER_RE = re.compile(r"\b\d+\b")
+SPACES_RE = re.compile(r"\s+")
+# savepoints and transactions are repeated by design
+IGNORED_STATEMENTS_RE = re.compile(r"^(SAVEPOINT|RELEASE SAVEPOINT|ROLLBACK|COMMIT)\b")
+
+MAX_REPORTED_DUPLICATES = 5
+
+# stats of the queries of the current request, also seen by the sync code an
+# async view runs with `sync_to_async`, as it runs in a copy of the context
+_query_stats = contextvars.ContextVar("query_stats", default=None)
+
+
+def get_fingerprint(sql):
+    """Return the statement without its parameters, numbers and IN lists"""
+    sql = SPACES_RE.sub(" ", sql.strip())
+    sql = IN_LIST_RE.sub("IN (...)", sql)
+    return NUMBER_RE.sub("?", sql)
+
+
+class QueryStats:
+    """Queries executed while recording"""
+
+    def __init__(self):
+        self.count = 0
+        self.time = 0.0
+        self.fingerprints = Counter()
+
+    def __call__(self, execute, sql, params, many, context):  # noqa: PLR0913
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.time += time.perf_counter() - start
+            self.count += 1
+            if not IGNORED_STATEMENTS_RE.match(sql):
+                self.fingerprints[get_fingerprint(sql)] += 1
+
+    @property
+    def time_ms(self):
+        return self.time * 1000
+
+    def get_duplicates(self):
+        """Return the statements executed more than once, and how many times"""
+        return [
+            (fingerprint, count)
+            for fingerprint, count in self.fingerprints.most_common()
+            if count > 1
+        ]
+
+
+def record_query(execute, sql, params, many, context):
+    """Execute wrapper adding the query to the stats of the current context"""
+    stats = _query_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    return stats(execute, sql, params, many, context)
+
+
+def install_query_recorder():
+    """
+    Add `record_query` to the connections of the thread. It is added first,
+    as `execute_wrapper()` blocks remove the last wrapper when they exit.
+    """
+    for connection in connections.all():
+        if record_query not in connection.execute_wrappers:
+            connection.execute_wrappers.insert(0, record_query)
+
+
+@contextlib.contextmanager
+def record_queries():
+    """Record the queries run in the current context, on every database"""
+    install_query_recorder()
+    stats = QueryStats()
+    token = _query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _query_stats.reset(token)
+
+
+@contextlib.asynccontextmanager
+async def arecord_queries():
+    """
+    Async version of `record_queries`, for async views: their queries run in
+    the thread of `sync_to_async`, whose connections get the recorder.
+    """
+    await sync_to_async(install_query_recorder)()
+    stats = QueryStats()
+    token = _query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _query_stats.reset(token)
+
+
+@functools.cache
+def load_query_budgets():
+    try:
+        with open(settings.QUERY_BUDGETS_FILE) as budgets_file:
+            return json.load(budgets_file)
+    except FileNotFoundError:
+        return {}
+
+
+def save_query_budgets(budgets):
+    with open(settings.QUERY_BUDGETS_FILE, "w") as budgets_file:
+        json.dump(budgets, budgets_file, indent=2, sort_keys=True)
+        budgets_file.write("\n")
+    load_query_budgets.cache_clear()
+
+
+def get_view_class(resolver_match):
+    func = resolver_match.func
+    return getattr(func, "view_class", None) or getattr(func, "model_admin", None)
+
+
+def get_query_budget(resolver_match):
+    """
+    Return the maximum number of queries and of milliseconds of database
+    time of the view, each of them None when there is no limit.
+    """
+    view_class = get_view_class(resolver_match)
+    max_queries = getattr(view_class, "query_budget", None)
+    max_time = getattr(view_class, "query_time_budget", None)
+    if max_queries is None:
+        max_queries = load_query_budgets().get(resolver_match.view_name)
+    return max_queries, max_time
+
+
+def check_query_budget(resolver_match, stats):
+    """Return the ways the queries recorded in `stats` exceed the view budget"""
+    max_queries, max_time = get_query_budget(resolver_match)
+    problems = []
+    if max_queries is not None and stats.count > max_queries:
+        problems.append(f"{stats.count} queries, the budget is {max_queries}")
+    if max_time is not None and stats.time_ms > max_time:
+        problems.append(
+            f"{stats.time_ms:.0f}ms of database time, the budget is {max_time}ms"
+        )
+    return problems
+
+
+def get_report(name, stats, problems):
+    """Return a description of the exceeded budget and the repeated statements"""
+    lines = [f"{name}: {', '.join(problems)}"]
+    for fingerprint, count in stats.get_duplicates()[:MAX_REPORTED_DUPLICATES]:
+        lines.append(f"    {count}x {fingerprint}")
+    return "\n".join(lines)
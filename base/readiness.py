@@ -0,0 +1,180 @@
+"""
+Readiness checks of the services the site depends on.
+
+The cache and the celery broker are checked in parallel while the databases
+are checked with the connections of the request thread, which the requests
+reuse, each check within `READINESS_CHECK_TIMEOUT` seconds. The result is stored
+in the default cache for `READINESS_CACHE_TTL` seconds, so the probes of several
+orchestrator nodes hitting every worker check the services once per period.
+
+Every check reports its latency, and the connections in use when the service
+exposes them: the connections to the database in `pg_stat_activity`, and the
+connections of the redis connection pool of the cache.
+"""
+import functools
+import logging
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.db import transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY = "readiness-check"
+CACHE_PING_KEY = "readiness-check-ping"
+
+POSTGRES_CONNECTIONS_SQL = (
+    "SELECT count(*), current_setting('max_connections')::int "
+    "FROM pg_stat_activity WHERE datname = current_database()"
+)
+
+
+class CheckFailedError(Exception):
+    pass
+
+
+def check_database(alias, timeout):
+    """
+    Run a query on the database, with the connection of the current thread, so
+    it is reused by the following requests instead of opening a new one.
+    """
+    connection = connections[alias]
+    with transaction.atomic(using=alias), connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            # only for this transaction, the connection keeps its own timeout
+            cursor.execute(f"SET LOCAL statement_timeout = {int(timeout * 1000)}")
+        cursor.execute("SELECT 1")
+        if cursor.fetchone() is None:
+            msg = "Got invalid response from DB"
+            raise CheckFailedError(msg)
+
+        if connection.vendor != "postgresql":
+            return {}
+        cursor.execute(POSTGRES_CONNECTIONS_SQL)
+        used, maximum = cursor.fetchone()
+        return {"connections": used, "max_connections": maximum}
+
+
+def get_cache_pool_usage():
+    """Return the connections of the pool of django_redis caches"""
+    try:
+        pool = cache.client.get_client(write=True).connection_pool
+    except AttributeError:
+        # not a django_redis cache
+        return {}
+    return {
+        "connections": getattr(pool, "_created_connections", None),
+        "in_use": len(getattr(pool, "_in_use_connections", ())),
+        "max_connections": getattr(pool, "max_connections", None),
+    }
+
+
+def check_cache():
+    cache.set(CACHE_PING_KEY, 1, timeout=60)
+    if cache.get(CACHE_PING_KEY) != 1:
+        msg = "The cache didn't return the stored value"
+        raise CheckFailedError(msg)
+    return get_cache_pool_usage()
+
+
+def check_broker(timeout):
+    from project.celeryconf import app
+
+    with app.connection_for_write() as connection:
+        connection.ensure_connection(max_retries=1, timeout=timeout)
+    return {}
+
+
+def get_checks():
+    """
+    Return the checks of the services by name, with whether the site is not
+    ready when they fail. The site works without the broker, it only delays
+    background tasks.
+    """
+    checks = {"cache": (check_cache, True)}
+    if settings.CELERY_BROKER_URL and not settings.CELERY_TASK_ALWAYS_EAGER:
+        checks["celery_broker"] = (
+            functools.partial(check_broker, settings.READINESS_CHECK_TIMEOUT),
+            False,
+        )
+    return checks
+
+
+def run_check(check):
+    start = time.perf_counter()
+    details = check()
+    latency = (time.perf_counter() - start) * 1000
+    return {"ok": True, "latency_ms": round(latency, 1), **details}
+
+
+def get_error_result(name, error):
+    logger.exception("Readiness check %s failed", name, exc_info=error)
+    # details of other errors, like hosts, are only logged
+    message = str(error) if isinstance(error, CheckFailedError) else None
+    return {"ok": False, "error": message or type(error).__name__}
+
+
+def run_checks(timeout):
+    """
+    Run the checks of the services in parallel, and the ones of the databases
+    meanwhile, waiting at most `timeout` seconds for them. Checks that time out
+    keep running in the background until they finish.
+    """
+    checks = get_checks()
+    executor = ThreadPoolExecutor(max_workers=len(checks), thread_name_prefix="ready")
+    futures = {
+        name: executor.submit(run_check, check) for name, (check, _) in checks.items()
+    }
+    deadline = time.monotonic() + timeout
+
+    results = {}
+    for alias in connections:
+        name = f"database:{alias}"
+        try:
+            results[name] = run_check(functools.partial(check_database, alias, timeout))
+        except Exception as error:  # noqa: BLE001
+            results[name] = get_error_result(name, error)
+
+    for name, future in futures.items():
+        try:
+            results[name] = future.result(timeout=max(0, deadline - time.monotonic()))
+        except TimeoutError:
+            logger.warning("Readiness check %s timed out", name)
+            results[name] = {"ok": False, "error": f"timed out after {timeout}s"}
+        except Exception as error:  # noqa: BLE001
+            results[name] = get_error_result(name, error)
+    executor.shutdown(wait=False, cancel_futures=True)
+
+    ready = all(
+        result["ok"]
+        for name, result in results.items()
+        if name not in checks or checks[name][1]
+    )
+    return {"ready": ready, "checks": results}
+
+
+def get_readiness():
+    """
+    Return the result of the checks, from the cache when they ran less than
+    `READINESS_CACHE_TTL` seconds ago in any worker.
+    """
+    try:
+        readiness = cache.get(CACHE_KEY)
+    except Exception as error:  # noqa: BLE001
+        # each cache backend raises its own errors, the check of the cache reports it
+        logger.warning("Could not read the readiness cache: %s", error)
+        readiness = None
+
+    if readiness is None:
+        readiness = run_checks(settings.READINESS_CHECK_TIMEOUT)
+        readiness["checked_at"] = timezone.now().isoformat()
+        try:
+            cache.set(CACHE_KEY, readiness, timeout=settings.READINESS_CACHE_TTL)
+        except Exception as error:  # noqa: BLE001
+            logger.warning("Could not store the readiness check: %s", error)
+    return readiness
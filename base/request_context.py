@@ -0,0 +1,26 @@
+"""
+Context of the request being handled.
+
+It is stored in context variables instead of thread locals so it follows the
+request through async views, and through the threads `sync_to_async` runs
+sync code in, which get a copy of the context of the caller.
+"""
+import contextlib
+import contextvars
+
+_user = contextvars.ContextVar("request_user", default=None)
+
+
+def get_current_user():
+    """Return the user of the request being handled, None outside requests"""
+    return _user.get()
+
+
+@contextlib.contextmanager
+def user_context(user):
+    """Set the user that performs the changes made within the block"""
+    token = _user.set(user)
+    try:
+        yield
+    finally:
+        _user.reset(token)
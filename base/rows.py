@@ -0,0 +1,133 @@
+"""
+Lightweight rows for lists.
+
+A `RowProjection` reads only the columns a table shows with a single
+`values()` query, computing display values like labels in the database, and
+builds `Row` objects with `__slots__` from them instead of model instances.
+
+Column names with `__` build nested rows, so `updated_by__get_label` is read
+in templates as `row.updated_by.get_label`, like on a model instance. Nested
+rows with no values are None, like an empty relation.
+"""
+from django.db.models import F
+from django.urls import reverse
+
+# a primary key that is replaced in reversed urls to build the url templates
+URL_PK_PLACEHOLDER = 2_147_483_647
+
+
+class Row:
+    """Object with the values of a row of a list"""
+
+    __slots__ = ()
+    str_attribute = None
+
+    def __init__(self, **values):
+        for name, value in values.items():
+            setattr(self, name, value)
+
+    def __str__(self):
+        if self.str_attribute is None:
+            return super().__str__()
+        return str(getattr(self, self.str_attribute))
+
+    def __repr__(self):
+        values = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"<{self.__class__.__name__} {values}>"
+
+    def __eq__(self, other):
+        if not isinstance(other, Row):
+            return NotImplemented
+        return all(
+            getattr(self, name) == getattr(other, name, None) for name in self.__slots__
+        )
+
+    __hash__ = None
+
+
+def get_url_template(url_name):
+    """Return the url of `url_name` with a placeholder for the primary key"""
+    url = reverse(url_name, args=(URL_PK_PLACEHOLDER,))
+    return (
+        url.replace("{", "{{").replace("}", "}}").replace(str(URL_PK_PLACEHOLDER), "{}")
+    )
+
+
+class RowProjection:
+    def __init__(self, model, columns, str_column=None, url_name=None):
+        """
+        `columns` maps the attribute paths of the rows to lookup paths or
+        expressions. The rows also have the `pk` and `id` of the objects, and
+        a `get_absolute_url` built from `url_name` when given.
+        """
+        self.columns = {
+            name: F(value) if isinstance(value, str) else value
+            for name, value in columns.items()
+        }
+        self.aliases = {name: f"_row_{i}" for i, name in enumerate(self.columns)}
+        self.url_template = get_url_template(url_name) if url_name else None
+
+        attributes = ["pk", "id"]
+        if self.url_template is not None:
+            attributes.append("get_absolute_url")
+        self.tree = self.get_tree(self.columns)
+        self.row_class = self.get_row_class(
+            f"{model.__name__}Row", self.tree, attributes, str_column
+        )
+
+    def get_tree(self, names):
+        """Group the attribute paths by their first component"""
+        tree = {}
+        for name in names:
+            head, _, rest = name.partition("__")
+            if rest:
+                tree.setdefault(head, []).append(rest)
+            else:
+                tree[head] = None
+        return {
+            head: None if rest is None else self.get_tree(rest)
+            for head, rest in tree.items()
+        }
+
+    def get_row_class(self, name, tree, attributes=(), str_column=None):
+        slots = (*attributes, *tree)
+        namespace = {"__slots__": slots, "str_attribute": str_column}
+        row_class = type(name, (Row,), namespace)
+        # classes of the nested rows, by attribute
+        row_class.nested = {
+            head: self.get_row_class(f"{name}_{head}", subtree)
+            for head, subtree in tree.items()
+            if subtree is not None
+        }
+        return row_class
+
+    def get_queryset(self, queryset):
+        """Return a values() queryset with the columns of the rows"""
+        return queryset.prefetch_related(None).values(
+            "pk",
+            **{self.aliases[name]: value for name, value in self.columns.items()},
+        )
+
+    def build(self, row_class, tree, values, prefix=""):
+        attributes = {}
+        for head, subtree in tree.items():
+            if subtree is None:
+                attributes[head] = values[self.aliases[prefix + head]]
+            else:
+                nested = self.build(
+                    row_class.nested[head], subtree, values, f"{prefix}{head}__"
+                )
+                attributes[head] = nested
+        if prefix and all(value is None for value in attributes.values()):
+            return None
+        return row_class(**attributes)
+
+    def get_row(self, values):
+        row = self.build(self.row_class, self.tree, values)
+        row.pk = row.id = values["pk"]
+        if self.url_template is not None:
+            row.get_absolute_url = self.url_template.format(row.pk)
+        return row
+
+    def get_rows(self, values_list):
+        return [self.get_row(values) for values in values_list]
@@ -5,6 +5,7 @@ All apps should use the BaseModel as parent for all models
 
 import datetime
 import decimal
+import functools
 import uuid
 
 from json import JSONEncoder
@@ -18,29 +19,93 @@ from django.utils.encoding import force_str
 from django.utils.functional import Promise
 from django.utils.timezone import is_aware
 
+# size of the chunks of the encoded arrays, in items
+JSON_CHUNK_SIZE = 1000
 
-class ModelEncoder(DjangoJSONEncoder):
-    def default(self, obj):
-        from base.models import BaseModel
 
-        if isinstance(obj, FieldFile):
-            return obj.url if obj else None
+class DispatchEncoderMixin:
+    """
+    Encode values with the method registered for their type in the table
+    returned by `get_type_encoders` (tuples of a type and the name of the
+    method that encodes it), found once per type and cached instead of
+    checking every type for every value. Values of types with no method use
+    `encode_other`.
 
-        if isinstance(obj, UploadedFile):
-            return f"<Unsaved file: {obj.name}>"
+    Types are read from `__class__`, like `isinstance`, so proxies like lazy
+    objects use the method of the type they wrap.
+    """
 
-        if isinstance(obj, BaseModel):
-            return obj.to_dict()
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # names of the methods that encode each type, filled as they are found
+        cls.dispatch_cache = {}
 
-        if isinstance(obj, decimal.Decimal):
-            return str(obj)
+    def get_type_encoders(self):
+        raise NotImplementedError
 
-        if isinstance(obj, Promise):
-            return force_str(obj)
+    def get_type_encoder(self, cls):
+        for encoded_type, method_name in self.get_type_encoders():
+            if issubclass(cls, encoded_type):
+                return method_name
+        return "encode_other"
+
+    def default(self, obj):
+        cls = obj.__class__
+        try:
+            method_name = self.dispatch_cache[cls]
+        except KeyError:
+            method_name = self.dispatch_cache[cls] = self.get_type_encoder(cls)
+        return getattr(self, method_name)(obj)
 
+    def encode_other(self, obj):
         return super().default(obj)
 
 
+@functools.cache
+def get_model_encoders():
+    # imported here as the models module imports this one
+    from base.models import BaseModel
+
+    return (
+        (FieldFile, "encode_file"),
+        (UploadedFile, "encode_uploaded_file"),
+        (BaseModel, "encode_model"),
+        (decimal.Decimal, "encode_str"),
+        (uuid.UUID, "encode_str"),
+        (Promise, "encode_promise"),
+    )
+
+
+class ModelEncoder(DispatchEncoderMixin, DjangoJSONEncoder):
+    def get_type_encoders(self):
+        return get_model_encoders()
+
+    def encode_file(self, obj):
+        return obj.url if obj else None
+
+    def encode_uploaded_file(self, obj):
+        return f"<Unsaved file: {obj.name}>"
+
+    def encode_model(self, obj):
+        return obj.to_dict()
+
+    def encode_str(self, obj):
+        return str(obj)
+
+    def encode_promise(self, obj):
+        return force_str(obj)
+
+
+class AuditEncoder(ModelEncoder):
+    """
+    ModelEncoder for the audit log, which keeps the stored name of the files
+    instead of their url, as the url depends on the storage and may expire.
+    """
+
+    def encode_file(self, obj):
+        return obj.name if obj else None
+
+
 class StringFallbackJSONEncoder(JSONEncoder):
     """JSON Serializer that falls back to force_str."""
 
@@ -66,8 +131,9 @@ class StringFallbackJSONEncoder(JSONEncoder):
             cls = list if isinstance(obj, list | tuple) else dict
             try:
                 return cls(obj)
-            except ValueError:
-                return self.process_other(obj)
+            except (TypeError, ValueError):
+                # not a mapping after all, use its string representation
+                pass
         try:
             return force_str(obj)
         except DjangoUnicodeDecodeError:
@@ -94,3 +160,26 @@ class StringFallbackJSONEncoder(JSONEncoder):
 
     def process_datetime(self, obj):
         return obj.isoformat(timespec="milliseconds")
+
+
+def iter_json_array(items, cls=ModelEncoder, chunk_size=JSON_CHUNK_SIZE):
+    """
+    Yield a JSON array with the items in chunks of `chunk_size` items, so big
+    arrays are never held in memory as a single string. Each item is encoded
+    with `encode`, which uses the C accelerated encoder, unlike `iterencode`.
+    """
+    encoder = cls()
+    encode = encoder.encode
+    item_separator = encoder.item_separator
+    yield "["
+    chunk = []
+    separator = ""
+    for item in items:
+        chunk.append(encode(item))
+        if len(chunk) == chunk_size:
+            yield separator + item_separator.join(chunk)
+            separator = item_separator
+            chunk = []
+    if chunk:
+        yield separator + item_separator.join(chunk)
+    yield "]"
@@ -1,8 +1,8 @@
-from django.conf import settings
-
 # base imports
-from base.middleware import RequestMiddleware
-from base.utils import get_our_models
+from base.audit import audited_models
+from base.cache_keys import bump_generations_on_commit
+from base.cache_keys import is_dependency
+from base.request_context import get_current_user
 
 
 class NotExists:
@@ -18,28 +18,26 @@ def audit_log(sender, instance, created, raw, update_fields=None, **kwargs):
     our apps is created or updated.
     """
     # only listening models created in our apps
-    if sender not in get_our_models():
+    plan = audited_models.get(sender)
+    if plan is None:
         return
 
-    sensitive_fields = settings.LOG_SENSITIVE_FIELDS
-    ignored_fields = settings.LOG_IGNORE_FIELDS
+    sensitive_fields = plan.sensitive_fields
     user = get_user()
 
     if raw:
         return
 
+    state = instance.__dict__
     if created:
         message = {
-            "added": instance.to_dict(
-                exclude=ignored_fields + sensitive_fields,
-                include_m2m=False,
-            ),
+            "added": {attname: state.get(attname) for attname in plan.added_attnames},
         }
         instance._save_addition(user, message)
     else:
         changed_field_labels = {}
         original_dict = instance.original_dict
-        actual_dict = instance.to_dict(exclude=ignored_fields, include_m2m=False)
+        actual_dict = {attname: state.get(attname) for attname in plan.logged_attnames}
         keys_to_check = update_fields if update_fields else original_dict.keys()
 
         for key in keys_to_check:
@@ -62,12 +60,36 @@ def audit_delete_log(sender, instance, **kwargs):
     our apps is deleted.
     """
     # only listening models created in our apps
-    if sender not in get_our_models():
+    if sender not in audited_models:
         return
     user = get_user()
     instance._save_deletion(user)
 
 
 def get_user():
-    thread_local = RequestMiddleware.thread_local
-    return thread_local.user if hasattr(thread_local, "user") else None
+    return get_current_user()
+
+
+def bump_cache_generations(sender, instance, using, **kwargs):
+    """
+    Post save and post delete signal that invalidates the cached values that
+    depend on the instance or its model.
+    """
+    if not is_dependency(sender):
+        return
+    bump_generations_on_commit(instances=[instance], using=using)
+
+
+def bump_m2m_cache_generations(sender, instance, action, model, **kwargs):
+    """
+    M2m changed signal that invalidates the cached values that depend on the
+    instances on both sides of the relation.
+    """
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not (is_dependency(type(instance)) or is_dependency(model)):
+        return
+    related = [model(pk=pk) for pk in kwargs["pk_set"] or ()]
+    bump_generations_on_commit(
+        instances=[instance, *related], model_classes=[model], using=kwargs["using"]
+    )
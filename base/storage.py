@@ -0,0 +1,189 @@
+"""
+Content addressed media storage.
+
+Files are stored once per content, in a blob named after their SHA-256, so the
+same document uploaded as the evidence of many process instances only uses the
+space of one file, and uploading it again only checks that the blob exists.
+
+The file fields get a name like `blobs/ab/<digest>/<file name>` that keeps the
+name of the uploaded file, and the storage reads it from the blob
+`blobs/ab/<digest>.<extension>`, the extension giving its type to the servers
+that send it. Names that aren't content addressed, like the ones of the files
+stored before, are read as usual.
+
+Every blob has a `StoredBlob`, by blob name, with its number of references,
+incremented on each upload. Deleting a file field value doesn't delete the blob, the
+`collect_blobs` command counts the references again and deletes the blobs
+that aren't referenced by any file field.
+"""
+import datetime
+import hashlib
+import logging
+import os
+import posixpath
+import re
+
+from collections import Counter
+
+from django.apps import apps
+from django.core.files.storage import FileSystemStorage
+from django.db import models
+from django.db import transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+BLOBS_DIR = "blobs"
+CONTENT_NAME_RE = re.compile(
+    rf"^{BLOBS_DIR}/[0-9a-f]{{2}}/(?P<digest>[0-9a-f]{{64}})/(?P<file_name>[^/]+)$"
+)
+
+
+def get_content_digest(content):
+    """Return the SHA-256 of the file, computed while it was uploaded if possible"""
+    digest = getattr(content, "sha256", None)
+    if digest:
+        return digest
+
+    sha256 = hashlib.sha256()
+    for chunk in content.chunks():
+        sha256.update(chunk)
+    content.seek(0)
+    return sha256.hexdigest()
+
+
+def get_blob_name(digest, file_name):
+    extension = os.path.splitext(file_name)[1].lower()
+    return f"{BLOBS_DIR}/{digest[:2]}/{digest}{extension}"
+
+
+class ContentAddressedStorageMixin:
+    """Storage mixin that stores the files in blobs named after their content"""
+
+    def get_name_digest(self, name):
+        """Return the digest of a content addressed name, None for other names"""
+        match = CONTENT_NAME_RE.match(name or "")
+        return match["digest"] if match else None
+
+    def resolve_name(self, name):
+        """Return the name of the stored file"""
+        match = CONTENT_NAME_RE.match(name or "")
+        if match is None:
+            return name
+        return get_blob_name(match["digest"], match["file_name"])
+
+    def get_available_name(self, name, max_length=None):
+        # content addressed names don't need to be unique
+        if self.get_name_digest(name):
+            return name
+        return super().get_available_name(name, max_length=max_length)
+
+    def _save(self, name, content):
+        from base.models import StoredBlob
+
+        digest = get_content_digest(content)
+        file_name = posixpath.basename(name)
+        blob_name = get_blob_name(digest, file_name)
+
+        # the reference locks the blob until the file field is saved
+        with transaction.atomic():
+            StoredBlob.objects.add_reference(digest, blob_name, content.size)
+            if super().exists(blob_name):
+                logger.info("Reusing the stored blob %s", blob_name)
+            else:
+                stored_name = super()._save(blob_name, content)
+                if stored_name != blob_name:
+                    # stored by another upload meanwhile
+                    super().delete(stored_name)
+        return f"{BLOBS_DIR}/{digest[:2]}/{digest}/{file_name}"
+
+    def _open(self, name, mode="rb"):
+        return super()._open(self.resolve_name(name), mode)
+
+    def exists(self, name):
+        return super().exists(self.resolve_name(name))
+
+    def delete(self, name):
+        # blobs are shared, they are deleted by the garbage collection
+        if not self.get_name_digest(name):
+            super().delete(name)
+
+    def delete_blob(self, blob_name):
+        super().delete(blob_name)
+
+    def size(self, name):
+        return super().size(self.resolve_name(name))
+
+    def url(self, name, *args, **kwargs):
+        return super().url(self.resolve_name(name), *args, **kwargs)
+
+    def path(self, name):
+        return super().path(self.resolve_name(name))
+
+    def get_modified_time(self, name):
+        return super().get_modified_time(self.resolve_name(name))
+
+
+class ContentAddressedFileSystemStorage(
+    ContentAddressedStorageMixin, FileSystemStorage
+):
+    pass
+
+
+def get_content_addressed_fields():
+    for model in apps.get_models():
+        for field in model._meta.concrete_fields:
+            if isinstance(field, models.FileField) and isinstance(
+                field.storage, ContentAddressedStorageMixin
+            ):
+                yield model, field
+
+
+def count_references():
+    """Return the number of file field values that use each blob, by blob name"""
+    references = Counter()
+    for model, field in get_content_addressed_fields():
+        names = (
+            model._base_manager.filter(**{f"{field.name}__startswith": BLOBS_DIR})
+            .values_list(field.name, flat=True)
+            .iterator()
+        )
+        for name in names:
+            if field.storage.get_name_digest(name):
+                references[field.storage.resolve_name(name)] += 1
+    return references
+
+
+def collect_blobs(storage, grace_period=datetime.timedelta(days=1), dry_run=False):
+    """
+    Update the reference counts of the blobs and delete the blobs without
+    references that weren't uploaded during the grace period, as the file
+    fields of recent uploads may not be saved yet. Return the deleted blobs.
+    """
+    from base.models import StoredBlob
+
+    references = count_references()
+    blobs = list(StoredBlob.objects.only("name", "reference_count"))
+    for blob in blobs:
+        blob.reference_count = references.get(blob.name, 0)
+    StoredBlob.objects.bulk_update(blobs, ["reference_count"], batch_size=1000)
+
+    orphans = StoredBlob.objects.filter(
+        reference_count=0, last_referenced_at__lt=timezone.now() - grace_period
+    )
+    if dry_run:
+        return list(orphans)
+
+    deleted = []
+    for blob in orphans.iterator():
+        with transaction.atomic():
+            # skip the blobs that got a reference since they were counted
+            locked = (
+                orphans.select_for_update(skip_locked=True).filter(pk=blob.pk).first()
+            )
+            if locked is None:
+                continue
+            storage.delete_blob(locked.name)
+            locked.delete()
+        deleted.append(blob)
+    return deleted
@@ -1,6 +1,13 @@
+from django.apps import apps
+from django.conf import settings
+from django.utils.dateparse import parse_datetime
+
 # others libraries
 from celery.utils.log import get_task_logger
 
+from audit.models import AuditLogEntry
+from base import direct_uploads
+from base.integrity import verify_files
 from project.celeryconf import app
 
 logger = get_task_logger(__name__)
@@ -9,3 +16,38 @@ logger = get_task_logger(__name__)
 @app.task
 def sample_scheduled_task():
     logger.info("This task runs every minute!")
+
+
+@app.task
+def write_log_entries(entries):
+    """Stores the audit log entries serialized by `base.audit.AuditLogWriter`"""
+    AuditLogEntry.objects.bulk_create(
+        AuditLogEntry(**{**entry, "action_time": parse_datetime(entry["action_time"])})
+        for entry in entries
+    )
+
+
+@app.task
+def store_direct_upload(model_label, pk, field_name="file"):
+    """Moves a file uploaded directly to the storage to its final name"""
+    model = apps.get_model(model_label)
+    instance = model._base_manager.filter(pk=pk).first()
+    if instance is not None:
+        direct_uploads.store_direct_upload(instance, field_name)
+
+
+@app.task
+def verify_stored_files(time_limit=None):
+    """
+    Verifies the stored files against their shasum, resuming the unfinished
+    check, and logs the drift
+    """
+    check = verify_files(
+        workers=settings.INTEGRITY_CHECK_WORKERS, time_limit=time_limit
+    )
+    for drift in check.drift:
+        logger.error(f"Integrity drift: {drift}")
+    logger.info(
+        f"Integrity check {check.pk}: {check.verified_files} files verified, "
+        f"{len(check.drift)} drifted, {check.gigabytes_per_minute:.2f} GB/min"
+    )
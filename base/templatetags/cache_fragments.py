@@ -0,0 +1,48 @@
+from django import template
+
+from base.cache_keys import get_or_compute
+from base.cache_keys import get_template_vary_on
+
+register = template.Library()
+
+
+class CacheFragmentNode(template.Node):
+    def __init__(self, nodelist, name, dependencies):
+        self.nodelist = nodelist
+        self.name = name
+        self.dependencies = dependencies
+
+    def render(self, context):
+        return get_or_compute(
+            self.name.resolve(context),
+            [dependency.resolve(context) for dependency in self.dependencies],
+            lambda: self.nodelist.render(context),
+            vary_on=get_template_vary_on(),
+        )
+
+
+@register.tag("cache_fragment")
+def do_cache_fragment(parser, token):
+    """
+    Cache the content until one of the dependencies changes.
+
+    Usage:
+        {% load cache_fragments %}
+        {% cache_fragment "control-evidences" control "documents.Evidence" %}
+            ...
+        {% endcache_fragment %}
+
+    The dependencies are model instances and model labels, see
+    `base.cache_keys`. The content is cached by language and time zone.
+    """
+    nodelist = parser.parse(("endcache_fragment",))
+    parser.delete_first_token()
+    bits = token.split_contents()
+    if len(bits) < 3:  # noqa: PLR2004
+        msg = f"'{bits[0]}' tag requires a name and at least one dependency."
+        raise template.TemplateSyntaxError(msg)
+    return CacheFragmentNode(
+        nodelist,
+        parser.compile_filter(bits[1]),
+        [parser.compile_filter(bit) for bit in bits[2:]],
+    )
@@ -0,0 +1,175 @@
+import contextlib
+
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+from django.contrib.admin.models import ADDITION
+from django.contrib.contenttypes.models import ContentType
+from django.db import connections
+from django.db import transaction
+from django.utils import timezone
+
+import pytest
+
+from audit.models import AuditLogEntry
+from base.audit import AuditLogWriter
+from base.audit import ModelPlan
+from base.audit import audited_models
+from base.audit import get_model_plan
+from base.audit import serialize_log_entry
+from base.tasks import write_log_entries
+from documents.models.document import Document
+from documents.models.document_type import DocumentType
+from users.models.user import User
+
+
+@pytest.fixture
+def log_entry_factory(regular_user):
+    def _log_entry_factory(object_repr="object"):
+        return AuditLogEntry(
+            action_time=timezone.now(),
+            user_id=regular_user.id,
+            content_type_id=ContentType.objects.get_for_model(User).id,
+            object_id=str(regular_user.id),
+            object_repr=object_repr,
+            action_flag=ADDITION,
+            changes={"added": {"last_login": timezone.now()}},
+        )
+
+    return _log_entry_factory
+
+
+def test_audit_log_writer_writes_outside_transactions():
+    connection_mock = MagicMock(in_atomic_block=False)
+    entry = MagicMock()
+    with (
+        patch("base.audit.transaction.get_connection", return_value=connection_mock),
+        patch("base.audit.AuditLogEntry.objects.bulk_create") as bulk_create_mock,
+    ):
+        AuditLogWriter().add(entry)
+        bulk_create_mock.assert_called_once_with([entry])
+
+
+@pytest.mark.django_db(databases=["default", "logs"])
+def test_audit_log_writer_bulk_creates_on_commit(
+    log_entry_factory, django_capture_on_commit_callbacks, django_assert_num_queries
+):
+    writer = AuditLogWriter()
+    with django_capture_on_commit_callbacks() as callbacks:
+        for i in range(5):
+            writer.add(log_entry_factory(f"object {i}"))
+
+    assert len(callbacks) == 1
+    assert not AuditLogEntry.objects.exists()
+
+    with django_assert_num_queries(1, connection=connections["logs"]):
+        callbacks[0]()
+    assert AuditLogEntry.objects.count() == 5
+
+
+@pytest.mark.django_db(databases=["default", "logs"])
+def test_audit_log_writer_discards_rolled_back_entries(
+    log_entry_factory, django_capture_on_commit_callbacks
+):
+    writer = AuditLogWriter()
+    with django_capture_on_commit_callbacks(execute=True):
+        writer.add(log_entry_factory("committed"))
+        with contextlib.suppress(ValueError), transaction.atomic():
+            writer.add(log_entry_factory("rolled back"))
+            raise ValueError
+
+    assert list(AuditLogEntry.objects.values_list("object_repr", flat=True)) == [
+        "committed"
+    ]
+
+
+@pytest.mark.django_db(databases=["default", "logs"])
+def test_audit_log_writer_pending_entries_end_with_the_transaction(
+    log_entry_factory, django_capture_on_commit_callbacks
+):
+    writer = AuditLogWriter()
+    with contextlib.suppress(ValueError), transaction.atomic():
+        writer.add(log_entry_factory("rolled back"))
+        raise ValueError
+
+    # the entries of the rolled back savepoint aren't pending anymore
+    assert not writer.pending_entries.default
+    with (
+        django_capture_on_commit_callbacks(execute=True) as callbacks,
+        transaction.atomic(),
+    ):
+        writer.add(log_entry_factory("committed"))
+        writer.add(log_entry_factory("also committed"))
+
+    assert len(callbacks) == 1
+    assert AuditLogEntry.objects.count() == 2
+
+
+def test_audit_log_writer_buffer():
+    writer = AuditLogWriter()
+    entries = [MagicMock() for _ in range(3)]
+    with patch("base.audit.AuditLogEntry.objects.bulk_create") as bulk_create_mock:
+        with writer.buffer():
+            with writer.buffer():
+                writer.write(entries[:1])
+            writer.write(entries[1:])
+            bulk_create_mock.assert_not_called()
+
+        bulk_create_mock.assert_called_once_with(entries)
+
+
+@pytest.mark.django_db(databases=["default", "logs"])
+def test_audit_log_writer_offloads_writes_to_celery(settings, log_entry_factory):
+    settings.LOG_ASYNC_WRITES = True
+    entry = log_entry_factory()
+    with patch("base.tasks.write_log_entries.delay") as delay_mock:
+        AuditLogWriter().write([entry])
+        delay_mock.assert_called_once_with([serialize_log_entry(entry)])
+    assert not AuditLogEntry.objects.exists()
+
+
+@pytest.mark.django_db(databases=["default", "logs"])
+def test_write_log_entries(log_entry_factory):
+    entry = serialize_log_entry(log_entry_factory())
+    write_log_entries([entry])
+    log_entry = AuditLogEntry.objects.get()
+    assert log_entry.action_time.isoformat() == entry["action_time"]
+    assert log_entry.changes == entry["changes"]
+
+
+def test_audited_models_registry():
+    assert isinstance(audited_models[DocumentType], ModelPlan)
+    assert AuditLogEntry not in audited_models
+
+
+def test_model_plan():
+    plan = ModelPlan(Document)
+    assert plan.logged_attnames == (
+        "created_by_id",
+        "updated_by_id",
+        "title",
+        "document_type_id",
+        "description",
+        "code",
+        "drive_folder",
+    )
+    assert plan.m2m_fields == ("documented_controls",)
+    assert plan.get_field_plan(fields=["title", "documented_controls"]) == (
+        ("title",),
+        ("documented_controls",),
+    )
+    assert plan.get_field_plan(fields=["title"]) is plan.get_field_plan(
+        fields=("title",)
+    )
+
+
+def test_model_plan_sensitive_fields():
+    plan = get_model_plan(User)
+    assert "password" in plan.logged_attnames
+    assert "password" not in plan.added_attnames
+
+
+def test_model_plans_are_reset_when_settings_change(settings):
+    settings.LOG_SENSITIVE_FIELDS = ["password", "title"]
+    assert "title" not in audited_models[Document].added_attnames
+    assert "title" not in get_model_plan(Document).added_attnames
@@ -0,0 +1,77 @@
+from django.contrib.admin.models import CHANGE
+
+import pytest
+
+from audit.models import AuditLogEntry
+from base.request_context import user_context
+from documents.models.document import Document
+from documents.models.document_type import DocumentType
+
+
+@pytest.fixture
+def document_type(db):
+    return DocumentType.objects.create(name="Policy")
+
+
+def test_original_dict_is_built_lazily(document_type):
+    instance = DocumentType.objects.get(pk=document_type.pk)
+    assert instance._original_dict is None
+
+    instance.name = "Procedure"
+    assert instance.original_dict == {
+        "created_by_id": None,
+        "updated_by_id": None,
+        "name": "Policy",
+    }
+
+
+def test_original_dict_of_new_instance():
+    instance = DocumentType(name="Policy")
+    instance.name = "Procedure"
+    assert instance.original_dict["name"] == "Policy"
+
+
+def test_original_dict_of_deferred_fields(document_type):
+    instance = DocumentType.objects.only("pk").get(pk=document_type.pk)
+    assert instance.original_dict["name"] is None
+
+
+def test_reset_original_dict(document_type):
+    assert document_type.original_dict["name"] == "Policy"
+    document_type.name = "Procedure"
+    document_type.reset_original_dict()
+    assert document_type.original_dict["name"] == "Procedure"
+
+
+@pytest.mark.django_db(databases=["default", "logs"])
+def test_audit_log_uses_original_dict(
+    document_type, regular_user, django_capture_on_commit_callbacks
+):
+    with user_context(regular_user):
+        instance = DocumentType.objects.get(pk=document_type.pk)
+        instance.name = "Procedure"
+        with django_capture_on_commit_callbacks(execute=True):
+            instance.save()
+
+    log_entry = AuditLogEntry.objects.get(action_flag=CHANGE)
+    assert log_entry.object_id == str(instance.pk)
+    assert log_entry.changes == {
+        "changed": {"fields": {"name": {"from": "Policy", "to": "Procedure"}}}
+    }
+    assert instance.original_dict["name"] == "Procedure"
+
+
+def test_to_dict(document_type):
+    document = Document(title="Policy", code="POL", document_type=document_type)
+    assert document.to_dict(
+        fields=("title", "document_type", "documented_controls")
+    ) == {
+        "title": "Policy",
+        "document_type_id": document_type.pk,
+        "documented_controls": [],
+    }
+
+    document.save()
+    assert document.to_dict(fields=("documented_controls",)) == {
+        "documented_controls_ids": []
+    }
@@ -0,0 +1,249 @@
+"""
+Micro-benchmarks for hot paths of the base app.
+
+They are skipped by default, run them with
+`pytest --run-benchmarks -s base/tests/test_benchmarks.py` to print the measured
+timings.
+The timings are only reported, as they depend on the load of the machine.
+"""
+import decimal
+import hashlib
+import json
+import os
+import statistics
+import time
+import timeit
+import tracemalloc
+import uuid
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import UploadedFile
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models.fields.files import FieldFile
+from django.utils import timezone
+from django.utils.encoding import force_str
+from django.utils.functional import Promise
+from django.utils.translation import gettext_lazy
+
+import pytest
+
+from django_redis.cache import RedisCache
+
+from base.cache import TwoTierCache
+from base.integrity import verify_files
+from base.models import IntegrityCheck
+from base.serializers import ModelEncoder
+from documents.models.document_type import DocumentType
+from documents.models.evidence import Evidence
+from risks.models.risk import Risk
+from risks.views.risk import RiskListView
+
+ROWS = 10_000
+
+
+def report(name, **timings):
+    results = ", ".join(
+        f"{key}: {value * 1000:.1f}ms" for key, value in timings.items()
+    )
+    print(f"\n{name} ({ROWS} rows) -> {results}")  # noqa: T201
+
+
+@pytest.mark.benchmark
+def test_benchmark_model_instantiation():
+    field_names = [field.attname for field in DocumentType._meta.concrete_fields]
+    now = timezone.now()
+    rows = [(pk, now, None, now, None, f"Type {pk}") for pk in range(ROWS)]
+
+    def load_lazy():
+        for row in rows:
+            DocumentType.from_db("default", field_names, row)
+
+    def load_eager():
+        # what BaseModel.__init__ did before the original dict was built lazily
+        for row in rows:
+            instance = DocumentType.from_db("default", field_names, row)
+            instance.to_dict(exclude=settings.LOG_IGNORE_FIELDS, include_m2m=False)
+
+    lazy = min(timeit.repeat(load_lazy, number=1, repeat=5))
+    eager = min(timeit.repeat(load_eager, number=1, repeat=5))
+    report("BaseModel instantiation", lazy=lazy, eager=eager)
+
+
+def measure_peak_memory(function):
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+@pytest.mark.benchmark
+@pytest.mark.django_db
+def test_benchmark_list_rows(regular_user):
+    Risk.objects.bulk_create(
+        Risk(title=f"Risk {i}", responsible=regular_user, updated_by=regular_user)
+        for i in range(ROWS)
+    )
+    projection = RiskListView().get_row_projection()
+
+    def load_instances():
+        for risk in Risk.objects.select_related("updated_by"):
+            (str(risk), risk.get_absolute_url(), risk.updated_by.get_label())
+
+    def load_rows():
+        for row in projection.get_rows(projection.get_queryset(Risk.objects.all())):
+            (str(row), row.get_absolute_url, row.updated_by.get_label)
+
+    instances = min(timeit.repeat(load_instances, number=1, repeat=3))
+    rows = min(timeit.repeat(load_rows, number=1, repeat=3))
+    report("List rows", instances=instances, rows=rows)
+    instances_memory = measure_peak_memory(load_instances)
+    rows_memory = measure_peak_memory(load_rows)
+    print(  # noqa: T201
+        f"peak memory -> instances: {instances_memory // 1024}KiB,"
+        f" rows: {rows_memory // 1024}KiB"
+    )
+    # unlike the timings, the allocations don't depend on the load of the machine
+    assert rows_memory < instances_memory
+
+
+class IsinstanceModelEncoder(DjangoJSONEncoder):
+    """ModelEncoder before the dispatch table, checking every type in turn"""
+
+    def default(self, obj):
+        from base.models import BaseModel
+
+        if isinstance(obj, FieldFile):
+            return obj.url if obj else None
+        if isinstance(obj, UploadedFile):
+            return f"<Unsaved file: {obj.name}>"
+        if isinstance(obj, BaseModel):
+            return obj.to_dict()
+        if isinstance(obj, decimal.Decimal):
+            return str(obj)
+        if isinstance(obj, Promise):
+            return force_str(obj)
+        return super().default(obj)
+
+
+def get_audit_payloads():
+    """Change messages like the ones of AuditLogEntry.changes"""
+    now = timezone.now()
+    return [
+        {
+            "changed": {
+                "fields": {
+                    "updated_at": {"from": now, "to": now},
+                    "amount": {
+                        "from": decimal.Decimal(i),
+                        "to": decimal.Decimal(i + 1),
+                    },
+                    "uuid": {"from": uuid.UUID(int=i), "to": uuid.UUID(int=i + 1)},
+                    "status": {"from": gettext_lazy("Yes"), "to": gettext_lazy("No")},
+                    "title": {"from": f"Title {i}", "to": f"Title {i + 1}"},
+                }
+            }
+        }
+        for i in range(ROWS)
+    ]
+
+
+@pytest.mark.benchmark
+def test_benchmark_json_encoders():
+    payloads = get_audit_payloads()
+
+    def encode(cls):
+        # like JSONField, every payload is encoded on its own
+        return lambda: [json.dumps(payload, cls=cls) for payload in payloads]
+
+    assert encode(ModelEncoder)() == encode(IsinstanceModelEncoder)()
+    # alternate the runs, so changes in the load of the machine affect both
+    timings = {ModelEncoder: [], IsinstanceModelEncoder: []}
+    for _ in range(7):
+        for cls, cls_timings in timings.items():
+            cls_timings.append(timeit.timeit(encode(cls), number=1))
+    dispatch = min(timings[ModelEncoder])
+    size = sum(len(data) for data in encode(ModelEncoder)())
+    report(
+        "JSON encoding of audit payloads",
+        dispatch=dispatch,
+        isinstance=min(timings[IsinstanceModelEncoder]),
+    )
+    print(f"throughput -> {size / dispatch / 2**20:.1f}MiB/s")  # noqa: T201
+
+
+def get_read_latencies(cache, keys, rounds=20):
+    latencies = []
+    for _ in range(rounds):
+        for key in keys:
+            start = time.perf_counter()
+            cache.get(key)
+            latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+@pytest.mark.benchmark
+@pytest.mark.skipif(not os.environ.get("CACHE_URL"), reason="needs a redis CACHE_URL")
+def test_benchmark_two_tier_cache():
+    location = os.environ["CACHE_URL"]
+    redis_cache = RedisCache(location, {})
+    two_tier_cache = TwoTierCache(
+        location, {"OPTIONS": {"LOCAL_KEY_PREFIXES": ["parameters-"]}}
+    )
+    keys = [f"parameters-benchmark-{index}" for index in range(50)]
+    redis_cache.set_many({key: '["value", "str"]' for key in keys})
+
+    try:
+        for name, cache in (("redis", redis_cache), ("two tier", two_tier_cache)):
+            latencies = get_read_latencies(cache, keys)
+            percentiles = statistics.quantiles(latencies, n=100)
+            print(  # noqa: T201
+                f"\n{name} cache reads ({len(latencies)}) -> "
+                f"p50: {percentiles[49] * 1e6:.0f}us, "
+                f"p99: {percentiles[98] * 1e6:.0f}us"
+            )
+    finally:
+        redis_cache.delete_many(keys)
+
+
+@pytest.mark.benchmark
+@pytest.mark.django_db
+def test_benchmark_file_verification(settings, tmp_path):
+    # a local storage stand-in, with distinct files so none is hashed twice
+    settings.MEDIA_ROOT = tmp_path
+    file_size = 4 * 2**20
+    evidences = [
+        Evidence.objects.create(
+            file=ContentFile(os.urandom(file_size), name=f"evidence-{index}.pdf")
+        )
+        for index in range(32)
+    ]
+    size = file_size * len(evidences)
+
+    def verify_serially():
+        # what verifying them was before: hashing the chunks of each file in turn
+        for evidence in evidences:
+            sha256 = hashlib.sha256()
+            with evidence.file.open() as stored_file:
+                for chunk in stored_file.chunks():
+                    sha256.update(chunk)
+            assert sha256.hexdigest() == evidence.shasum
+
+    timings = {"serial": [], "pool": []}
+    for _ in range(3):
+        timings["serial"].append(timeit.timeit(verify_serially, number=1))
+        timings["pool"].append(
+            timeit.timeit(lambda: verify_files(restart=True), number=1)
+        )
+    serial = min(timings["serial"])
+    pool = min(timings["pool"])
+    print(  # noqa: T201
+        f"\nFile verification ({len(evidences)} files, {size / 2**20:.0f}MiB) -> "
+        f"serial: {size / 2**30 / serial * 60:.1f}GB/min, "
+        f"pool: {size / 2**30 / pool * 60:.1f}GB/min"
+    )
+    # only reported: hashing the files in the page cache is bound by the CPU,
+    # so the pool only gains with many cores or slower reads, like the S3 ones
+    assert IntegrityCheck.objects.filter(drift=[]).count() == len(timings["pool"])
@@ -0,0 +1,169 @@
+import time
+
+from django.urls import reverse
+
+import pytest
+
+from base.cache import TwoTierCache
+from base.cache import get_key_prefix
+
+
+def make_cache(location, **options):
+    options = {
+        "REMOTE_BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCAL_KEY_PREFIXES": ["parameters-"],
+        "GENERATION_CHECK_INTERVAL": 0,
+        **options,
+    }
+    return TwoTierCache(location, {"OPTIONS": options})
+
+
+@pytest.fixture
+def worker_caches(request):
+    """Two processes sharing the remote cache"""
+    location = request.node.name
+    first, second = make_cache(location), make_cache(location)
+    yield first, second
+    first.clear()
+
+
+def test_get_key_prefix():
+    assert get_key_prefix("parameters-site-name") == "parameters"
+    assert get_key_prefix("views.decorators.cache:abc") == "views.decorators.cache"
+
+
+def test_local_hits(worker_caches):
+    cache, _ = worker_caches
+    cache.set("parameters-a", [1])
+    cache.set("other-a", 2)
+
+    assert cache.get("parameters-a") == [1]
+    assert cache.get("parameters-a") == [1]
+    assert cache.get("other-a") == 2
+    assert cache.get("other-a") == 2
+    assert cache.get("parameters-missing", "default") == "default"
+
+    assert cache.get_stats() == {
+        "parameters": {
+            "local_hits": 1,
+            "remote_hits": 1,
+            "misses": 1,
+            "hit_rate": 0.667,
+        },
+        "other": {"remote_hits": 2, "hit_rate": 1.0},
+    }
+
+
+def test_local_values_are_copies(worker_caches):
+    cache, _ = worker_caches
+    cache.set("parameters-a", [1])
+    cache.get("parameters-a").append(2)
+
+    assert cache.get("parameters-a") == [1]
+
+
+def test_writes_invalidate_other_workers(worker_caches):
+    first, second = worker_caches
+    first.set("parameters-a", 1)
+    assert second.get("parameters-a") == 1
+
+    first.set("parameters-a", 2)
+    assert second.get("parameters-a") == 2
+
+    first.delete("parameters-a")
+    assert second.get("parameters-a") is None
+
+
+def test_generation_check_interval(request):
+    first = make_cache(request.node.name, GENERATION_CHECK_INTERVAL=60)
+    second = make_cache(request.node.name, GENERATION_CHECK_INTERVAL=60)
+    first.set("parameters-a", 1)
+    assert second.get("parameters-a") == 1
+
+    first.set("parameters-a", 2)
+    # served from the process until the generation is checked again
+    assert second.get("parameters-a") == 1
+    second._generation_checked_at = None
+    assert second.get("parameters-a") == 2
+    first.clear()
+
+
+def test_fills_do_not_invalidate(worker_caches):
+    first, second = worker_caches
+    first.set("parameters-a", 1)
+    assert second.get("parameters-a") == 1
+    generation = second._generation
+
+    assert second.get("parameters-b") is None
+    assert second.add("parameters-b", 2)
+    assert not first.add("parameters-b", 3)
+
+    assert second._generation == generation
+    assert second.get_many(["parameters-a", "parameters-b"]) == {
+        "parameters-a": 1,
+        "parameters-b": 2,
+    }
+    assert second.get_stats()["parameters"]["local_hits"] == 2
+
+
+def test_other_keys_do_not_invalidate(worker_caches):
+    cache, _ = worker_caches
+    cache.set("parameters-a", 1)
+    cache.get("parameters-a")
+    generation = cache._generation
+
+    cache.set("other-a", 1)
+    cache.delete("other-a")
+
+    assert cache._generation == generation
+    assert len(cache._local) == 1
+
+
+def test_local_timeout(request):
+    cache = make_cache(request.node.name, LOCAL_TIMEOUT=0.01)
+    cache.set("parameters-a", 1)
+    cache.get("parameters-a")
+    time.sleep(0.02)
+    cache.get("parameters-a")
+
+    assert cache.get_stats()["parameters"]["remote_hits"] == 2
+    cache.clear()
+
+
+def test_local_max_entries(request):
+    cache = make_cache(request.node.name, LOCAL_MAX_ENTRIES=2)
+    cache.set_many({"parameters-a": 1, "parameters-b": 2, "parameters-c": 3})
+    assert cache.get_many(["parameters-a", "parameters-b", "parameters-c"]) == {
+        "parameters-a": 1,
+        "parameters-b": 2,
+        "parameters-c": 3,
+    }
+
+    assert [key for key, _ in cache._local] == ["parameters-b", "parameters-c"]
+    cache.clear()
+
+
+def test_incr_and_has_key(worker_caches):
+    first, second = worker_caches
+    first.set("parameters-counter", 1)
+    assert second.get("parameters-counter") == 1
+    assert second.has_key("parameters-counter")
+
+    first.incr("parameters-counter")
+    assert second.get("parameters-counter") == 2
+    first.decr("parameters-counter", 2)
+    assert second.get("parameters-counter") == 0
+
+
+def test_remote_backend_methods(worker_caches):
+    cache, _ = worker_caches
+    assert cache.make_key("a") == cache.remote.make_key("a")
+
+
+def test_cache_stats_view(superuser_client, client):
+    url = reverse("debug-cache")
+
+    assert client.get(url).status_code == 404
+    response = superuser_client.get(url)
+    assert response.status_code == 200
+    assert response.json() == {}
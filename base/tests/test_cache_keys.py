@@ -0,0 +1,141 @@
+import time
+
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.template import Context
+from django.template import Template
+from django.template import TemplateSyntaxError
+from django.utils import translation
+
+import pytest
+
+from base.cache_keys import bump_generations
+from base.cache_keys import get_generation_key
+from base.cache_keys import get_or_compute
+from base.cache_keys import make_key
+from documents.models.control import Control
+from documents.models.control_category import ControlCategory
+from documents.models.document_type import DocumentType
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def local_cache(settings):
+    # a cache of its own, to not change the shared one of the other tests
+    settings.CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "test_cache_keys",
+        },
+    }
+    settings.FRAGMENT_CACHE_DEPENDENCIES = [
+        *settings.FRAGMENT_CACHE_DEPENDENCIES,
+        "documents.DocumentType",
+    ]
+    yield
+    cache.clear()
+
+
+class Counter:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.calls
+
+
+def test_get_generation_key(control):
+    assert get_generation_key(Control) == "generation-documents.control"
+    assert get_generation_key("documents.Control") == "generation-documents.control"
+    assert get_generation_key(control) == f"generation-documents.control-{control.pk}"
+    with pytest.raises(TypeError):
+        get_generation_key(1)
+
+
+def test_values_are_cached_until_a_dependency_changes(control):
+    compute = Counter()
+
+    assert get_or_compute("value", [control, DocumentType], compute) == 1
+    assert get_or_compute("value", [control, DocumentType], compute) == 1
+
+    control.save()
+    assert get_or_compute("value", [control, DocumentType], compute) == 2
+
+    DocumentType.objects.create(name="Policy")
+    assert get_or_compute("value", [control, DocumentType], compute) == 3
+
+
+def test_instance_dependencies(control, control_category):
+    other_control = Control.objects.create(category=control_category, title="other")
+    key = make_key("value", [control])
+
+    other_control.save()
+    assert make_key("value", [control]) == key
+    assert make_key("value", [other_control]) != key
+
+    other_control.delete()
+    assert make_key("value", [Control]) != make_key("value", [control])
+
+
+def test_many_to_many_changes(control, process_version):
+    key = make_key("value", [control])
+    model_key = make_key("value", ["processes.ProcessVersion"])
+
+    process_version.controls.remove(control)
+
+    assert make_key("value", [control]) != key
+    assert make_key("value", ["processes.ProcessVersion"]) != model_key
+
+
+def test_bump_generations():
+    key = make_key("value", [DocumentType])
+    bump_generations(model_classes=[DocumentType])
+    assert make_key("value", [DocumentType]) != key
+
+
+def test_only_dependencies_have_generations(settings, control_category):
+    settings.FRAGMENT_CACHE_DEPENDENCIES = ["documents.Control"]
+
+    DocumentType.objects.create(name="Policy")
+    ControlCategory.objects.create(name="Other")
+    assert cache._cache == {}
+
+    with pytest.raises(ImproperlyConfigured):
+        make_key("value", [DocumentType])
+
+
+def test_generations_expire(settings):
+    settings.FRAGMENT_CACHE_TIMEOUT = 60
+    make_key("value", [DocumentType])
+
+    key = cache.make_and_validate_key(get_generation_key(DocumentType))
+    assert cache._expire_info[key] <= time.time() + 60
+
+
+def test_cache_fragment_tag(control):
+    template = Template(
+        "{% load cache_fragments %}"
+        '{% cache_fragment "title" control %}{{ control.title }}{% endcache_fragment %}'
+    )
+    title = control.title
+    assert template.render(Context({"control": control})) == title
+
+    Control.objects.filter(pk=control.pk).update(title="changed without signals")
+    control.title = "changed without signals"
+    assert template.render(Context({"control": control})) == title
+
+    control.save()
+    assert template.render(Context({"control": control})) == control.title
+
+    with translation.override("en"):
+        assert template.render(Context({"control": control})) == control.title
+
+
+def test_cache_fragment_tag_requires_dependencies():
+    with pytest.raises(TemplateSyntaxError):
+        Template(
+            "{% load cache_fragments %}"
+            '{% cache_fragment "name" %}{% endcache_fragment %}'
+        )
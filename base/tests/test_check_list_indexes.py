@@ -0,0 +1,44 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+import pytest
+
+from information_assets.views.asset import AssetListView
+
+
+@pytest.mark.django_db
+def test_check_list_indexes(monkeypatch):
+    monkeypatch.setattr(
+        AssetListView,
+        "filterset",
+        {"owner": ("exact",), "name": ("icontains",), "missing": ("exact",)},
+    )
+    monkeypatch.setattr(AssetListView, "orderable_fields", ("code", "criticality"))
+    out = StringIO()
+    err = StringIO()
+    call_command("check_list_indexes", verbosity=2, stdout=out, stderr=err)
+    lines = out.getvalue().splitlines()
+
+    assert "asset_list: filter owner__exact: ok" in lines
+    assert "asset_list: filter missing: unknown field" in lines
+    assert any(
+        line.startswith("asset_list: filter name__icontains: sequential scan")
+        for line in lines
+    )
+    # code is unique, criticality has no index
+    assert "asset_list: order by code: ok" in lines
+    assert any(
+        line.startswith("asset_list: order by criticality: sort by") for line in lines
+    )
+    assert "unindexed lookups found" in err.getvalue()
+
+
+@pytest.mark.django_db
+def test_check_list_indexes_fail(monkeypatch):
+    monkeypatch.setattr(AssetListView, "orderable_fields", ("criticality",))
+    with pytest.raises(CommandError, match="unindexed lookups found"):
+        call_command(
+            "check_list_indexes", "--fail", stdout=StringIO(), stderr=StringIO()
+        )
@@ -0,0 +1,207 @@
+import hashlib
+
+from http import HTTPStatus
+
+from django.core import signing
+from django.core.files.storage import default_storage
+from django.urls import reverse
+
+import pytest
+
+from base import direct_uploads
+from documents.forms import DocumentVersionForm
+from documents.forms import EvidenceForm
+from documents.models.document_version import DocumentVersion
+from documents.models.evidence import Evidence
+
+pytestmark = pytest.mark.django_db
+
+CONTENT = b"policy content"
+DIGEST = hashlib.sha256(CONTENT).hexdigest()
+
+
+@pytest.fixture(autouse=True)
+def media(settings, tmp_path, monkeypatch):
+    settings.MEDIA_ROOT = tmp_path / "media"
+    settings.FILE_UPLOAD_TEMP_DIR = tmp_path
+    # small parts, to upload the content in many of them
+    settings.DIRECT_UPLOAD_PART_SIZE = 4
+    monkeypatch.setattr(direct_uploads, "MIN_PART_SIZE", 4)
+    return settings.MEDIA_ROOT
+
+
+def upload(client, content=CONTENT, name="policy.pdf"):
+    response = client.post(
+        reverse("direct-upload-start"),
+        {"name": name, "size": len(content), "content_type": "application/pdf"},
+        content_type="application/json",
+    )
+    assert response.status_code == HTTPStatus.OK
+    upload = response.json()
+
+    parts = []
+    part_size = upload["part_size"]
+    for number, url in enumerate(upload["part_urls"], start=1):
+        part = content[(number - 1) * part_size : number * part_size]
+        response = client.put(url, part, content_type="application/octet-stream")
+        assert response.status_code == HTTPStatus.OK
+        parts.append([number, response["ETag"]])
+
+    response = client.post(
+        reverse("direct-upload-complete"),
+        {"upload": upload["upload"], "parts": parts},
+        content_type="application/json",
+    )
+    assert response.status_code == HTTPStatus.OK
+    return response.json()["token"]
+
+
+def test_direct_upload(regular_user_client):
+    token = upload(regular_user_client)
+
+    name = direct_uploads.load_upload_token(token)
+    # the local storage stores the joined parts by content
+    assert name == f"blobs/{DIGEST[:2]}/{DIGEST}/policy.pdf"
+    with default_storage.open(name) as stored_file:
+        assert stored_file.read() == CONTENT
+
+
+def test_direct_upload_requires_login(client):
+    response = client.post(
+        reverse("direct-upload-start"),
+        {"name": "policy.pdf", "size": 1},
+        content_type="application/json",
+    )
+    assert response.status_code == HTTPStatus.FOUND
+
+
+def test_invalid_uploads(regular_user_client, settings):
+    start_url = reverse("direct-upload-start")
+    settings.DIRECT_UPLOAD_MAX_SIZE = 10
+
+    response = regular_user_client.post(
+        start_url, {"name": "policy.pdf", "size": 11}, content_type="application/json"
+    )
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    response = regular_user_client.post(
+        start_url, "not json", content_type="application/json"
+    )
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    response = regular_user_client.put(
+        reverse("direct-upload-part", args=("invalid",)), CONTENT
+    )
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    response = regular_user_client.post(
+        reverse("direct-upload-complete"),
+        {"upload": "invalid", "parts": [[1, ""]]},
+        content_type="application/json",
+    )
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+@pytest.mark.parametrize("upload_id", ["../../media", "/tmp", "a" * 31])  # noqa: S108
+def test_uploads_outside_the_temporary_directory_are_invalid(
+    regular_user_client, tmp_path, upload_id
+):
+    victim = tmp_path / "victim"
+    victim.mkdir()
+    token = signing.dumps(
+        [upload_id, "uploads/a/policy.pdf"], salt=direct_uploads.UPLOAD_TOKEN_SALT
+    )
+
+    # the id of a signed token is still checked before building any path
+    with pytest.raises(direct_uploads.DirectUploadError):
+        direct_uploads.complete_upload(token, [[1, ""]])
+
+    # and the browser can't send an unsigned one
+    response = regular_user_client.post(
+        reverse("direct-upload-complete"),
+        {"upload": upload_id, "upload_id": "../victim", "parts": []},
+        content_type="application/json",
+    )
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert victim.is_dir()
+
+
+def test_uploads_without_parts_are_invalid(regular_user_client):
+    response = regular_user_client.post(
+        reverse("direct-upload-start"),
+        {"name": "policy.pdf", "size": len(CONTENT)},
+        content_type="application/json",
+    )
+
+    response = regular_user_client.post(
+        reverse("direct-upload-complete"),
+        {"upload": response.json()["upload"], "parts": []},
+        content_type="application/json",
+    )
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_missing_parts_fail_the_upload(regular_user_client):
+    response = regular_user_client.post(
+        reverse("direct-upload-start"),
+        {"name": "policy.pdf", "size": len(CONTENT)},
+        content_type="application/json",
+    )
+    upload = response.json()
+
+    response = regular_user_client.post(
+        reverse("direct-upload-complete"),
+        {"upload": upload["upload"], "parts": [[1, ""]]},
+        content_type="application/json",
+    )
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_evidence_form(regular_user_client):
+    form = EvidenceForm(data={"evidence_upload": upload(regular_user_client)})
+    assert form.is_valid(), form.errors
+
+    evidence = Evidence.create_from_form(form)
+
+    assert evidence.file.name == form.cleaned_data["evidence_file"]
+    assert evidence.shasum == DIGEST
+
+
+def test_pending_uploads_are_stored_by_a_task(
+    media, django_capture_on_commit_callbacks
+):
+    # uploaded with a S3 multipart upload
+    upload_name = f"{direct_uploads.DIRECT_UPLOADS_DIR}/a/policy.pdf"
+    (media / "uploads/a").mkdir(parents=True)
+    (media / upload_name).write_bytes(CONTENT)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        evidence = Evidence.objects.create(file=upload_name)
+        assert evidence.shasum == ""
+
+    evidence.refresh_from_db()
+    assert evidence.file.name == f"blobs/{DIGEST[:2]}/{DIGEST}/policy.pdf"
+    assert evidence.shasum == DIGEST
+    with evidence.file.open() as stored_file:
+        assert stored_file.read() == CONTENT
+    assert not (media / upload_name).exists()
+
+
+def test_expired_uploads_are_invalid():
+    form = EvidenceForm(data={"evidence_upload": "invalid"})
+
+    assert not form.is_valid()
+    assert "evidence_upload" in form.errors
+
+
+def test_document_version_form(regular_user_client, regular_user, document):
+    form = DocumentVersionForm(
+        data={"author": regular_user.pk, "upload": upload(regular_user_client)},
+        instance=DocumentVersion(document=document),
+    )
+
+    assert form.is_valid(), form.errors
+    assert form.instance.file.name == f"blobs/{DIGEST[:2]}/{DIGEST}/policy.pdf"
+    widget_attrs = form.fields["file"].widget.attrs
+    assert widget_attrs["data-direct-upload"] == "id_upload"
+    assert widget_attrs["data-direct-upload-url"] == reverse("direct-upload-start")
@@ -0,0 +1,104 @@
+from http import HTTPStatus
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.db.models.fields.files import FieldFile
+
+import pytest
+
+from base.downloads import get_download_url
+from base.downloads import serve_file
+from base.storage import ContentAddressedFileSystemStorage
+from documents.models.evidence import Evidence
+from project.storage_backends import ContentAddressedS3MediaStorage
+
+pytestmark = pytest.mark.django_db
+
+CONTENT = b"policy content"
+
+
+@pytest.fixture(autouse=True)
+def local_cache(settings):
+    # a cache of its own, to not change the shared one of the other tests
+    settings.CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "test_downloads",
+        },
+    }
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def file_field():
+    return Evidence._meta.get_field("file")
+
+
+@pytest.fixture
+def local_file(file_field, monkeypatch, tmp_path):
+    storage = ContentAddressedFileSystemStorage(location=tmp_path, base_url="/media/")
+    monkeypatch.setattr(file_field, "storage", storage)
+    name = storage.save("policy.pdf", ContentFile(CONTENT))
+    return FieldFile(None, file_field, name)
+
+
+@pytest.fixture
+def s3_storage(file_field, monkeypatch):
+    # presigned urls are signed without connecting to the bucket
+    storage = ContentAddressedS3MediaStorage(
+        bucket_name="media", access_key="key", secret_key="secret"  # noqa: S106
+    )
+    monkeypatch.setattr(file_field, "storage", storage)
+
+    signed_names = []
+    url = storage.url
+
+    def signing_url(name, *args, **kwargs):
+        signed_names.append(name)
+        return url(name, *args, **kwargs)
+
+    monkeypatch.setattr(storage, "url", signing_url)
+    storage.signed_names = signed_names
+    return storage
+
+
+def test_presigned_urls_are_cached(s3_storage, file_field):
+    digest = "a" * 64
+    field_file = FieldFile(None, file_field, f"blobs/aa/{digest}/policy.pdf")
+    # the same stored file, uploaded with another name
+    same_content = FieldFile(None, file_field, f"blobs/aa/{digest}/Policy.PDF")
+
+    url = get_download_url(field_file)
+
+    assert "Signature=" in url
+    assert get_download_url(field_file) == url
+    assert get_download_url(same_content) == url
+    assert len(s3_storage.signed_names) == 1
+
+    response = serve_file(field_file)
+    assert response.status_code == HTTPStatus.FOUND
+    assert response.url == url
+
+
+def test_local_files_are_sent_by_nginx(local_file, settings):
+    settings.DOWNLOADS_X_ACCEL_REDIRECT = True
+
+    response = serve_file(local_file, as_attachment=True)
+
+    assert response.status_code == HTTPStatus.OK
+    assert response["X-Accel-Redirect"] == local_file.storage.url(local_file.name)
+    assert response["X-Accel-Redirect"].startswith("/media/blobs/")
+    assert response["Content-Type"] == "application/pdf"
+    assert response["Content-Disposition"] == 'attachment; filename="policy.pdf"'
+    assert response.content == b""
+
+
+def test_local_files_are_sent_by_django(local_file, settings):
+    settings.DOWNLOADS_X_ACCEL_REDIRECT = False
+
+    response = serve_file(local_file)
+
+    assert response.status_code == HTTPStatus.OK
+    assert b"".join(response.streaming_content) == CONTENT
+    assert get_download_url(local_file) == local_file.url
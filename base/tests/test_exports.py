@@ -0,0 +1,118 @@
+import csv
+import io
+import zipfile
+
+from xml.etree import ElementTree
+
+from django.urls import reverse
+
+import pytest
+
+from base.exports import stream_xlsx
+from information_assets.models.asset import Asset
+
+pytestmark = pytest.mark.django_db
+
+SHEET_NS = {"s": "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
+
+
+@pytest.fixture
+def assets(asset, superuser_user):
+    Asset.objects.create(
+        owner=superuser_user,
+        name='other, "asset"',
+        code="OTHER",
+        is_archived=True,
+    )
+    return list(Asset.objects.order_by("code").values_list("code", "name"))
+
+
+def read_sheet(content):
+    with zipfile.ZipFile(io.BytesIO(content)) as archive:
+        assert archive.testzip() is None
+        sheet = ElementTree.fromstring(  # noqa: S314
+            archive.read("xl/worksheets/sheet1.xml")
+        )
+    return [
+        [
+            cell.findtext(
+                "s:is/s:t" if cell.get("t") == "inlineStr" else "s:v",
+                namespaces=SHEET_NS,
+            )
+            for cell in row.findall("s:c", SHEET_NS)
+        ]
+        for row in sheet.findall("s:sheetData/s:row", SHEET_NS)
+    ]
+
+
+def get_export(client, export_format, **params):
+    response = client.get(reverse("asset_list"), {"export": export_format, **params})
+    assert response.status_code == 200
+    assert response.streaming
+    return b"".join(response.streaming_content)
+
+
+@pytest.fixture
+def no_instances(monkeypatch):
+    def from_db(*args):
+        pytest.fail("exports must not build model instances")
+
+    monkeypatch.setattr(Asset, "from_db", from_db)
+
+
+@pytest.mark.usefixtures("no_instances")
+def test_csv_export(superuser_client, assets):
+    content = get_export(superuser_client, "csv", o="code")
+    rows = list(csv.reader(io.StringIO(content.decode("utf-8-sig"))))
+
+    assert rows[0][:3] == ["Code", "Name", "Description"]
+    assert [row[:2] for row in rows[1:]] == [list(asset) for asset in assets]
+    assert rows[2][3] == "admin@example.com"
+    assert rows[2][6] == "Yes"
+
+
+@pytest.mark.parametrize("export_format", ("csv", "xlsx"))
+def test_exports_escape_formulas(superuser_client, asset, export_format):
+    names = ["=1+2", "+SUM(A1)", "-2+3", "@cmd", "\tname", "\rname", "a=b"]
+    Asset.objects.filter(pk=asset.pk).update(name=names[0])
+    for number, name in enumerate(names[1:]):
+        Asset.objects.create(owner=asset.owner, name=name, code=f"CODE{number}")
+
+    content = get_export(superuser_client, export_format, o="code")
+    if export_format == "csv":
+        rows = list(csv.reader(io.StringIO(content.decode("utf-8-sig"))))
+    else:
+        rows = read_sheet(content)
+
+    assert sorted(row[1] for row in rows[1:]) == sorted(
+        [f"'{name}" for name in names[:-1]] + ["a=b"]
+    )
+
+
+@pytest.mark.usefixtures("no_instances")
+def test_xlsx_export(superuser_client, assets):
+    rows = read_sheet(get_export(superuser_client, "xlsx", o="code"))
+
+    assert rows[0][:2] == ["Code", "Name"]
+    assert [row[:2] for row in rows[1:]] == [list(asset) for asset in assets]
+
+
+def test_export_is_filtered(superuser_client, assets):
+    content = get_export(superuser_client, "csv", is_archived="1")
+    rows = list(csv.reader(io.StringIO(content.decode("utf-8-sig"))))
+    assert [row[0] for row in rows[1:]] == ["OTHER"]
+
+
+def test_export_requires_permission(regular_user_client, assets):
+    response = regular_user_client.get(reverse("asset_list"), {"export": "csv"})
+    assert response.status_code == 403
+
+
+def test_stream_xlsx_yields_while_writing():
+    rows = ([i, f"row {i}\x01 <&>"] for i in range(5000))
+    chunks = list(stream_xlsx(["number", "text"], rows, "a/sheet: name"))
+    assert len(chunks) > 2
+
+    sheet = read_sheet(b"".join(chunks))
+    assert len(sheet) == 5001
+    assert sheet[-1] == ["4999", "row 4999 <&>"]
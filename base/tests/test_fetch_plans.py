@@ -0,0 +1,157 @@
+from django.db.models import QuerySet
+from django.db.models.fields.related_descriptors import ForeignKeyDeferredAttribute
+from django.db.models.fields.related_descriptors import ForwardManyToOneDescriptor
+
+import pytest
+
+from base.fetch_plans import FetchPlanRecorder
+from base.fetch_plans import apply_fetch_plan
+from base.fetch_plans import load_fetch_plans
+from base.fetch_plans import recording
+from base.fetch_plans import save_fetch_plans
+from documents.models.control import Control
+from documents.views.control import ControlListView
+from risks.models.risk import Risk
+
+pytestmark = pytest.mark.django_db
+
+PLAN = {
+    "select": ["category", "risks__responsible"],
+    "prefetch": ["risks"],
+    "fields": [
+        "category",
+        "category__name",
+        "risks__responsible",
+        "risks__responsible__email",
+    ],
+}
+
+
+@pytest.fixture
+def controls(risk, control, control_category):
+    Control.objects.create(category=control_category, title="other control")
+    return Control.objects.order_by("title")
+
+
+@pytest.fixture
+def fetch_plans_file(settings, tmp_path):
+    settings.FETCH_PLANS_FILE = tmp_path / "fetch_plans.json"
+    load_fetch_plans.cache_clear()
+    yield settings.FETCH_PLANS_FILE
+    load_fetch_plans.cache_clear()
+
+
+def render(controls):
+    """Access the relations like a template listing the controls"""
+    return [
+        (
+            control.category.name,
+            [risk.responsible.email for risk in control.risks.all()],
+        )
+        for control in controls
+    ]
+
+
+def test_recording(controls):
+    with recording() as recorder:
+        objects = list(controls)
+        recorder.start("controls", objects)
+        render(objects)
+        # clones of the related querysets are not prefetched by the plan
+        objects[0].risks.filter(title="test risk").first()
+        objects[0].risks.count()
+
+    assert recorder.get_plans() == {"controls": PLAN}
+    # the fields that weren't read are back after the recording
+    assert "title" in objects[1].__dict__
+    assert objects[1].title == Control.objects.get(pk=objects[1].pk).title
+
+
+def test_classes_are_only_patched_while_recording():
+    get = ForwardManyToOneDescriptor.__get__
+    fetch_all = QuerySet._fetch_all
+
+    with recording(), recording():
+        assert ForwardManyToOneDescriptor.__get__ is not get
+    assert ForwardManyToOneDescriptor.__get__ is get
+    assert QuerySet._fetch_all is fetch_all
+    assert "__get__" not in ForeignKeyDeferredAttribute.__dict__
+
+
+def test_recording_untagged_objects(controls):
+    with recording() as recorder:
+        recorder.start("controls", [])
+        render(controls)
+
+    assert recorder.get_plans() == {}
+
+
+def test_prefetch_is_not_downgraded():
+    recorder = FetchPlanRecorder()
+    recorder.start("key", [])
+    recorder.add("risks", "prefetch")
+    recorder.add("risks", "select")
+
+    assert recorder.get_plans() == {
+        "key": {"select": [], "prefetch": ["risks"], "fields": []}
+    }
+
+
+def test_apply_fetch_plan(controls, django_assert_num_queries):
+    expected = render(controls)
+    queryset = apply_fetch_plan(controls.all(), PLAN)
+
+    with django_assert_num_queries(2):
+        assert render(queryset) == expected
+
+
+def test_apply_fetch_plan_loads_the_read_fields(controls):
+    queryset = apply_fetch_plan(controls.all(), PLAN)
+    control = queryset.get(title="test control")
+
+    assert control.get_deferred_fields() >= {"title", "description"}
+    assert "name" not in control.category.get_deferred_fields()
+    risk = control.risks.all()[0]
+    assert "title" in risk.get_deferred_fields()
+    assert risk.responsible.get_deferred_fields() >= {"first_name"}
+
+    queryset = apply_fetch_plan(controls.all(), PLAN, only_root=False)
+    assert queryset.get(title="test control").get_deferred_fields() == set()
+
+
+def test_apply_fetch_plan_skips_invalid_paths(controls):
+    plan = {"select": ["missing", "risks", "category__name"], "prefetch": ["category"]}
+    queryset = apply_fetch_plan(controls, plan)
+
+    assert queryset.query.select_related is False
+    assert queryset._prefetch_related_lookups == ()
+
+
+def test_apply_fetch_plan_keeps_view_prefetches(controls):
+    queryset = apply_fetch_plan(controls.prefetch_related("risks__assets"), PLAN)
+
+    assert queryset._prefetch_related_lookups == ("risks__assets",)
+
+
+def test_list_view_applies_fetch_plan(rf, superuser_user, fetch_plans_file):
+    request = rf.get("/")
+    request.user = superuser_user
+    view = ControlListView()
+    view.setup(request)
+    key = "documents.views.control.ControlListView:documents/control/list.html"
+    assert view.get_fetch_plan_key() == key
+
+    save_fetch_plans({key: {"select": ["category"], "prefetch": []}})
+
+    assert view.get_queryset().query.select_related == {"category": {}}
+
+
+def test_views_record_fetch_plans(superuser_client, risk, fetch_plans_file):
+    with recording() as recorder:
+        superuser_client.get(Risk.objects.get().get_absolute_url())
+
+    plan = recorder.get_plans()[
+        "risks.views.risk.RiskDetailView:risks/risk/detail.html"
+    ]
+    assert "responsible" in plan["select"]
+    assert "controls" in plan["prefetch"]
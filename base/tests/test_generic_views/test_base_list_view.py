@@ -0,0 +1,55 @@
+import pytest
+
+from information_assets.models.asset import Asset
+from information_assets.views.asset import AssetListView
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def assets(asset, superuser_user):
+    other_asset = Asset.objects.create(
+        owner=superuser_user,
+        name="other asset",
+        code="OTHER",
+        is_archived=True,
+    )
+    return [asset, other_asset]
+
+
+def get_view(rf, query_string):
+    view = AssetListView()
+    view.setup(rf.get(f"/?{query_string}"))
+    return view
+
+
+@pytest.mark.parametrize(
+    ("query_string", "expected"),
+    (
+        ("", [0, 1]),
+        ("is_archived=1", [1]),
+        ("owner__exact={owner}", [0]),
+        # not declared in the filterset
+        ("name=other asset", [0, 1]),
+        ("owner__email__icontains=user", [0, 1]),
+        # invalid values
+        ("owner=invalid", [0, 1]),
+    ),
+)
+def test_filterset(assets, query_string, expected, rf):
+    query_string = query_string.format(owner=assets[0].owner_id)
+    queryset = get_view(rf, query_string).get_queryset()
+    assert sorted(queryset, key=lambda a: a.pk) == [assets[i] for i in expected]
+
+
+def test_orderable_fields(assets, rf):
+    view = get_view(rf, "o=-name&o=description")
+    assert view.get_ordering() == ["-name"]
+    assert list(view.get_queryset()) == assets
+
+    view = get_view(rf, "o=description")
+    assert view.get_ordering() == view.ordering
+
+    # ordering by a many to many field would repeat the objects
+    view = get_view(rf, "o=asset_types")
+    assert view.get_ordering() == view.ordering
@@ -0,0 +1,128 @@
+from concurrent.futures import ThreadPoolExecutor
+from importlib import import_module
+from types import SimpleNamespace
+
+from django.apps import apps
+from django.db import connection
+from django.db import transaction
+
+import pytest
+
+from base.models import IncrementCounter
+from processes.models.process_activity import ProcessActivity
+from processes.models.process_version import ProcessVersion
+
+pytestmark = pytest.mark.django_db
+
+
+def create_activity(process_version, title="activity"):
+    return ProcessActivity.objects.create(
+        process_version=process_version, title=title, description="description"
+    )
+
+
+def test_increments_are_consecutive(process_version):
+    assert [create_activity(process_version).order for _ in range(3)] == [1, 2, 3]
+    assert (
+        IncrementCounter.objects.get(
+            key=f"processes.processactivity.order:{process_version.id}"
+        ).value
+        == 3
+    )
+
+
+def test_counters_are_seeded_from_existing_values(process_version):
+    ProcessActivity.objects.bulk_create(
+        [ProcessActivity(process_version=process_version, order=7, title="old")]
+    )
+    seed_increment_counters = import_module(
+        "base.migrations.0005_seed_increment_counters"
+    ).seed_increment_counters
+
+    seed_increment_counters(apps, SimpleNamespace(connection=connection))
+
+    assert create_activity(process_version).order == 8
+
+
+def test_deleting_the_last_object_frees_its_number(process_version):
+    first, second, third = (create_activity(process_version) for _ in range(3))
+
+    third.delete()
+    assert create_activity(process_version).order == 3
+
+    # like with the maximum, only the last number is reused
+    second.delete()
+    assert create_activity(process_version).order == 4
+    assert first.order == 1
+
+
+def test_increments_need_a_scope(process_version, monkeypatch):
+    monkeypatch.delattr(ProcessActivity, "_get_increment_scope")
+    with pytest.raises(NotImplementedError):
+        create_activity(process_version)
+
+
+def test_increments_are_not_shared_between_groups(process, process_version):
+    other_version = ProcessVersion.objects.create(
+        process=process, defined_in=process_version.defined_in
+    )
+    assert other_version.version == process_version.version + 1
+    assert create_activity(process_version).order == 1
+    assert create_activity(other_version).order == 1
+
+
+def test_assign_increments(process, process_version, django_assert_num_queries):
+    other_version = ProcessVersion.objects.create(
+        process=process, defined_in=process_version.defined_in
+    )
+    create_activity(process_version)
+    create_activity(other_version)
+    activities = [
+        ProcessActivity(process_version=version, title=f"Activity {i}")
+        for i in range(20)
+        for version in (process_version, other_version)
+    ]
+
+    # one query per process version
+    with django_assert_num_queries(2):
+        ProcessActivity.assign_increments(activities)
+
+    ProcessActivity.objects.bulk_create(activities)
+    for version in (process_version, other_version):
+        assert list(version.activities.values_list("order", flat=True)) == list(
+            range(1, 22)
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_increments(process_version):
+    def create_activities(thread):
+        try:
+            for i in range(5):
+                with transaction.atomic():
+                    create_activity(process_version, f"{thread}-{i}")
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(create_activities, range(4)))
+
+    orders = process_version.activities.values_list("order", flat=True)
+    assert sorted(orders) == list(range(1, 21))
+
+
+def test_new_versions_copy_the_activities(process, process_version, group):
+    first = create_activity(process_version, "first")
+    first.assignee_groups.add(group)
+    create_activity(process_version, "second").delete()
+    create_activity(process_version, "third")
+    process_version.publish(None)
+
+    new_version = ProcessVersion.objects.create(
+        process=process, defined_in=process_version.defined_in
+    )
+
+    activities = new_version.activities.all()
+    assert [(a.order, a.title) for a in activities] == [(1, "first"), (2, "third")]
+    assert list(activities[0].assignee_groups.all()) == [group]
+    assert create_activity(new_version).order == 3
@@ -0,0 +1,127 @@
+import hashlib
+import json
+
+from io import StringIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+
+import pytest
+
+from base.integrity import hash_stored_file
+from base.integrity import verify_files
+from base.models import IntegrityCheck
+from base.tasks import verify_stored_files
+from documents.models.evidence import Evidence
+
+pytestmark = pytest.mark.django_db
+
+CONTENT = b"policy content"
+
+
+@pytest.fixture(autouse=True)
+def media(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+
+
+@pytest.fixture
+def evidences():
+    return [
+        Evidence.objects.create(file=ContentFile(content, name="policy.pdf"))
+        for content in (CONTENT, CONTENT, b"other content")
+    ]
+
+
+def test_hash_stored_file(evidences):
+    digest, size = hash_stored_file(default_storage, evidences[0].file.name, 4)
+
+    assert digest == hashlib.sha256(CONTENT).hexdigest()
+    assert size == len(CONTENT)
+
+
+def test_verify_files(evidences, document_version):
+    check = verify_files(workers=2)
+
+    assert check.finished_at is not None
+    assert check.drift == []
+    assert check.verified_files == len(evidences) + 1
+    # the evidences with the same content share their stored file
+    assert check.verified_bytes == (
+        len(CONTENT) + len(b"other content") + document_version.file.size
+    )
+    assert check.checkpoints["documents.Evidence"] == evidences[-1].pk
+
+
+def test_stored_files_are_hashed_once(evidences, monkeypatch):
+    hashed_names = []
+
+    def hash_file(storage, name, buffer_size):
+        hashed_names.append(name)
+        return hash_stored_file(storage, name, buffer_size)
+
+    monkeypatch.setattr("base.integrity.hash_stored_file", hash_file)
+    # the same stored file, with another name
+    Evidence.objects.filter(pk=evidences[1].pk).update(
+        file=evidences[1].file.name.replace("policy.pdf", "copy.pdf")
+    )
+
+    check = verify_files(batch_size=1)
+
+    assert len(hashed_names) == 2
+    assert check.verified_files == 3
+
+
+def test_drift_is_reported(evidences):
+    corrupted, same_file, missing = evidences
+    with open(default_storage.path(corrupted.file.name), "wb") as stored_file:
+        stored_file.write(b"tampered content")
+    default_storage.delete_blob(default_storage.resolve_name(missing.file.name))
+    Evidence.objects.create(url="https://example.com")
+
+    check = verify_files()
+
+    assert check.verified_files == 0
+    assert [(drift["pk"], drift["problem"]) for drift in check.drift] == [
+        (corrupted.pk, "mismatch"),
+        (same_file.pk, "mismatch"),
+        (missing.pk, "missing"),
+    ]
+    assert check.drift[0]["expected"] == corrupted.shasum
+    assert check.drift[0]["actual"] == hashlib.sha256(b"tampered content").hexdigest()
+
+
+def test_checks_resume_from_their_checkpoints(evidences):
+    check = verify_files(batch_size=1, time_limit=1e-9)
+
+    assert check.finished_at is None
+    assert check.checkpoints == {"documents.Evidence": evidences[0].pk}
+    assert check.verified_files == 1
+
+    resumed = verify_files(batch_size=1)
+    assert resumed == check
+    assert resumed.finished_at is not None
+    assert resumed.verified_files == len(evidences)
+
+    assert verify_files(restart=True) != check
+
+
+def test_verify_files_command(evidences, tmp_path):
+    report_path = tmp_path / "drift.json"
+    Evidence.objects.filter(pk=evidences[0].pk).update(shasum="0" * 64)
+    stdout = StringIO()
+
+    call_command("verify_files", report=str(report_path), stdout=stdout)
+
+    output = stdout.getvalue()
+    assert f"documents.Evidence {evidences[0].pk}" in output
+    assert "2 files verified, 1 drifted" in output
+    assert json.loads(report_path.read_text())[0]["pk"] == evidences[0].pk
+
+
+def test_verify_stored_files_task(evidences):
+    verify_stored_files()
+
+    check = IntegrityCheck.objects.get()
+    assert check.finished_at is not None
+    assert check.verified_files == len(evidences)
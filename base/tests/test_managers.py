@@ -0,0 +1,156 @@
+from django.contrib.admin.models import ADDITION
+from django.contrib.admin.models import CHANGE
+from django.db.models import F
+
+import pytest
+
+from audit.models import AuditLogEntry
+from base.managers import summarize_pks
+from base.request_context import user_context
+from documents.models.document_type import DocumentType
+from information_assets.models.asset_type import AssetType
+
+
+@pytest.fixture
+def document_types(db):
+    return DocumentType.objects.bulk_create(
+        DocumentType(name=f"Type {i}") for i in range(5)
+    )
+
+
+@pytest.mark.parametrize(
+    ("pks", "expected"),
+    (
+        ([3, 1, 2], {"count": 3, "range": [1, 3]}),
+        ([1, 2], {"count": 2, "pks": [1, 2]}),
+        ([5, 1, 2], {"count": 3, "pks": [1, 2, 5]}),
+        (["b", "a", "c"], {"count": 3, "pks": ["a", "b", "c"]}),
+    ),
+)
+def test_summarize_pks(pks, expected):
+    assert summarize_pks(pks) == expected
+
+
+@pytest.mark.django_db(databases=["default", "logs"])
+def test_audited_update(
+    document_types, regular_user, django_capture_on_commit_callbacks
+):
+    pks = [document_type.pk for document_type in document_types]
+    with django_capture_on_commit_callbacks(execute=True):
+        updated = DocumentType.objects.filter(pk__in=pks[1:4]).audited_update(
+            user=regular_user, name=F("name")
+        )
+
+    assert updated == 3
+    assert DocumentType.objects.filter(updated_by=regular_user).count() == 3
+    log_entry = AuditLogEntry.objects.get()
+    assert log_entry.action_flag == CHANGE
+    assert log_entry.object_id is None
+    assert log_entry.object_repr == "3 document types"
+    assert log_entry.changes == {
+        "changed": {
+            "fields": {
+                "name": {"to": "F(name)"},
+                "updated_by_id": {"to": regular_user.pk},
+            },
+            "objects": {"count": 3, "range": [pks[1], pks[3]]},
+        }
+    }
+
+
+@pytest.mark.django_db(databases=["default", "logs"])
+def test_audited_update_runs_a_single_update(
+    document_types, regular_user, django_assert_num_queries
+):
+    pks = [document_type.pk for document_type in document_types]
+    queryset = DocumentType.objects.filter(name__in=["Type 0", "Type 4"])
+
+    # the savepoint, and the update filtered like the queryset
+    with django_assert_num_queries(3) as context:
+        assert queryset.audited_update(user=regular_user, name=F("name")) == 2
+
+    assert "RETURNING" in context.captured_queries[1]["sql"]
+    assert list(
+        DocumentType.objects.filter(updated_by=regular_user)
+        .order_by("pk")
+        .values_list("pk", flat=True)
+    ) == [pks[0], pks[4]]
+
+
+@pytest.mark.django_db(databases=["default", "logs"])
+def test_update_skipping_save_is_logged(
+    document_types, regular_user, django_capture_on_commit_callbacks
+):
+    document_type = document_types[0]
+    with user_context(regular_user), django_capture_on_commit_callbacks(execute=True):
+        document_type.update(name="Renamed", skip_save=True)
+
+    assert document_type.updated_by == regular_user
+    document_type.refresh_from_db()
+    assert document_type.name == "Renamed"
+    assert document_type.updated_by == regular_user
+    log_entry = AuditLogEntry.objects.get()
+    assert log_entry.changes["changed"]["fields"]["name"] == {"to": "Renamed"}
+    assert log_entry.changes["changed"]["objects"]["pks"] == [document_type.pk]
+
+
+@pytest.mark.django_db(databases=["default", "logs"])
+def test_audited_update_without_user(
+    document_types, django_capture_on_commit_callbacks
+):
+    with django_capture_on_commit_callbacks(execute=True):
+        DocumentType.objects.all().audited_update(name=F("name"))
+
+    assert DocumentType.objects.filter(updated_by=None).count() == 5
+    assert not AuditLogEntry.objects.exists()
+
+
+@pytest.mark.django_db(databases=["default", "logs"])
+def test_audited_bulk_create(regular_user, django_capture_on_commit_callbacks):
+    asset_types = [AssetType(name=f"Asset type {i}") for i in range(3)]
+    with django_capture_on_commit_callbacks(execute=True):
+        AssetType.objects.audited_bulk_create(asset_types, user=regular_user)
+
+    assert all(asset_type.created_by == regular_user for asset_type in asset_types)
+    log_entry = AuditLogEntry.objects.get()
+    assert log_entry.action_flag == ADDITION
+    assert log_entry.changes == {
+        "added": {
+            "objects": {
+                "count": 3,
+                "range": [asset_types[0].pk, asset_types[-1].pk],
+            },
+        }
+    }
+
+
+@pytest.mark.django_db(databases=["default", "logs"])
+def test_audited_bulk_create_ignoring_conflicts(
+    regular_user, django_capture_on_commit_callbacks
+):
+    asset_types = [AssetType(name=f"Asset type {i}") for i in range(3)]
+    with django_capture_on_commit_callbacks(execute=True):
+        AssetType.objects.audited_bulk_create(
+            asset_types, user=regular_user, ignore_conflicts=True
+        )
+
+    assert AssetType.objects.filter(created_by=regular_user).count() == 3
+    assert not AuditLogEntry.objects.exists()
+
+
+@pytest.mark.django_db(databases=["default", "logs"])
+def test_audited_bulk_update(
+    document_types, regular_user, django_capture_on_commit_callbacks
+):
+    for document_type in document_types:
+        document_type.name = f"Renamed {document_type.pk}"
+
+    with django_capture_on_commit_callbacks(execute=True):
+        DocumentType.objects.audited_bulk_update(
+            document_types, ["name"], user=regular_user
+        )
+
+    assert DocumentType.objects.filter(name__startswith="Renamed").count() == 5
+    message = AuditLogEntry.objects.get().changes
+    assert message["changed"]["fields"] == ["name", "updated_by_id", "updated_at"]
+    assert message["changed"]["objects"]["count"] == 5
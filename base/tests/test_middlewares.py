@@ -1,10 +1,9 @@
+import json
+
+from http import HTTPStatus
 from unittest.mock import MagicMock
-from unittest.mock import PropertyMock
 from unittest.mock import patch
 
-from django.http import HttpResponse
-from django.http import HttpResponseServerError
-
 import pytest
 
 from base.middleware import ReadinessCheckMiddleware
@@ -45,43 +44,44 @@ def test_readiness_check_middleware_process_request(
 
 
 @pytest.mark.parametrize(
-    ("side_effect", "expected_class_type"),
+    ("ready", "expected_status"),
     (
-        (None, str),
-        (Exception, HttpResponseServerError),
+        (True, HTTPStatus.OK),
+        (False, HTTPStatus.SERVICE_UNAVAILABLE),
     ),
 )
-def test_readiness_check_middleware_perform_readiness_request(
-    side_effect, expected_class_type
+def test_readiness_check_middleware_perform_readiness_check(
+    ready, expected_status, rf, settings
 ):
-    with (
-        patch(
-            "base.middleware.ReadinessCheckMiddleware.check_connections",
-            side_effect=side_effect,
-            return_value="check_connections_return_value",
-        )
-    ):
+    settings.DEBUG = True
+    readiness = {
+        "ready": ready,
+        "checks": {"database:default": {"ok": ready}},
+        "checked_at": "2023-01-01T00:00:00+00:00",
+    }
+    with patch("base.middleware.get_readiness", return_value=readiness):
         middleware = ReadinessCheckMiddleware(MagicMock())
-        assert isinstance(middleware.perform_readiness_check(), expected_class_type)
+        response = middleware.perform_readiness_check(rf.get("/_ready/"))
 
+    assert response.status_code == expected_status
+    assert json.loads(response.content) == readiness
 
-@pytest.mark.parametrize(
-    ("fetchone_return_value", "expected_check"),
-    ((None, HttpResponseServerError), ("fetchone_return_value", HttpResponse)),
-)
-def test_readiness_check_middleware_check_connections(
-    fetchone_return_value, expected_check
-):
-    mock = MagicMock()
-    mock.cursor.fetchone.return_value = fetchone_return_value
-    mock.cursor.return_value = mock.cursor
-    with patch(
-        "django.db.connections",
-        new_callable=PropertyMock(
-            return_value={
-                "default": mock,
-            }
-        ),
-    ):
-        middleware = ReadinessCheckMiddleware(MagicMock())
-        assert isinstance(middleware.check_connections(), expected_check)
+
+@pytest.mark.django_db
+def test_readiness_check_details_need_a_user(client, regular_user, settings):
+    settings.DEBUG = False
+    readiness = {
+        "ready": False,
+        "checks": {
+            "database:default": {"ok": True, "connections": 3},
+            "cache": {"ok": False, "error": "ConnectionError"},
+        },
+        "checked_at": "2023-01-01T00:00:00+00:00",
+    }
+    with patch("base.middleware.get_readiness", return_value=readiness):
+        response = client.get("/_ready/")
+        assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+        assert response.json() == {"ready": False, "failed": ["cache"]}
+
+        client.force_login(regular_user)
+        assert client.get("/_ready/").json() == readiness
@@ -1,42 +1,84 @@
-from unittest.mock import MagicMock
-from unittest.mock import patch
+from django.apps import apps
+from django.db import connection
+from django.db import models
 
 import pytest
 
 from base.models import OrderableModel
 
 
-class OrderbaleModelMagicMock(MagicMock):
-    def __init__(self):
-        super().__init__()
-        self.__class__ = MagicMock()
-        self.__class__.objects.count.return_value = 5
-
-
-@pytest.mark.parametrize(
-    ("pk", "expected_calls"),
-    (
-        (None, 1),
-        (1, 0),
-    ),
-)
-def test_orderable_model_save(pk, expected_calls):
-    with (patch("base.models.base_model.BaseModel.save")):
-        instance_mock = MagicMock(spec=OrderableModel)
-        instance_mock.pk = pk
-        OrderableModel.save(instance_mock)
-        assert instance_mock._set_display_order.call_count == expected_calls
-
-
-def test_set_display_order():
-    instance_mock = OrderbaleModelMagicMock()
-    OrderableModel._set_display_order(instance_mock)
-    assert instance_mock.display_order == 6
-
-
-def test_reorder_display_order():
-    OrderableModel.objects = MagicMock()
-    OrderableModel.objects.all.return_value = [MagicMock() for _ in range(5)]
-    OrderableModel.reorder_display_order()
-    for i in range(5):
-        assert OrderableModel.objects.all()[i].display_order == i
+@pytest.fixture
+def item_model(db):
+    """A concrete OrderableModel, only registered while the test runs"""
+
+    class Item(OrderableModel):
+        name = models.CharField(max_length=50)
+
+        class Meta(OrderableModel.Meta):
+            app_label = "base"
+
+        def __str__(self):
+            return self.name
+
+    with connection.schema_editor() as editor:
+        editor.create_model(Item)
+    yield Item
+    del apps.all_models["base"]["item"]
+    apps.clear_cache()
+
+
+@pytest.fixture
+def items(item_model):
+    return [item_model.objects.create(name=name) for name in "abcde"]
+
+
+def get_names(item_model):
+    return "".join(item_model.objects.values_list("name", flat=True))
+
+
+def test_new_objects_are_placed_last(item_model, items):
+    step = item_model.display_order_step
+    assert [item.display_order for item in items] == [
+        step * position for position in range(1, 6)
+    ]
+
+
+def test_reorder_display_order(item_model, items, django_assert_num_queries):
+    item_model.objects.update(display_order=0)
+    item_model.objects.filter(name="a").update(display_order=5)
+
+    # savepoint, lock, renumber and release
+    with django_assert_num_queries(4):
+        assert item_model.reorder_display_order() == 5
+
+    assert get_names(item_model) == "bcdea"
+    assert list(item_model.objects.values_list("display_order", flat=True)) == [
+        item_model.display_order_step * position for position in range(1, 6)
+    ]
+    assert item_model.reorder_display_order() == 0
+
+
+def test_move_updates_a_single_object(item_model, items):
+    a, b, c, d, e = items
+    item_model.move(e, after=a)
+    item_model.move(b, before=a)
+    item_model.move(c)
+
+    assert get_names(item_model) == "baedc"
+    assert item_model.objects.get(pk=d.pk).display_order == d.display_order
+
+
+def test_move_shifts_the_following_objects_without_room(item_model, items):
+    a, b, c, d, e = items
+    item_model.objects.filter(pk=b.pk).update(display_order=a.display_order + 1)
+
+    item_model.move(e, after=a)
+    assert get_names(item_model) == "aebcd"
+
+
+def test_move_renumbers_objects_with_the_same_order(item_model, items):
+    item_model.objects.update(display_order=0)
+    a, b, c, d, e = items
+
+    item_model.move(e, before=b)
+    assert get_names(item_model) == "aebcd"
@@ -0,0 +1,126 @@
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.http import HttpResponse
+from django.urls import reverse
+
+import pytest
+
+from asgiref.sync import async_to_sync
+from asgiref.sync import iscoroutinefunction
+from asgiref.sync import sync_to_async
+
+from base.middleware import QueryBudgetMiddleware
+from base.query_budget import check_query_budget
+from base.query_budget import get_fingerprint
+from base.query_budget import get_report
+from base.query_budget import load_query_budgets
+from base.query_budget import record_queries
+from base.query_budget import save_query_budgets
+from documents.models.control import Control
+from documents.views.control import ControlListView
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def query_budgets_file(settings, tmp_path):
+    settings.QUERY_BUDGETS_FILE = tmp_path / "query_budgets.json"
+    load_query_budgets.cache_clear()
+    yield settings.QUERY_BUDGETS_FILE
+    load_query_budgets.cache_clear()
+
+
+@pytest.fixture
+def controls(control, control_category):
+    Control.objects.create(category=control_category, title="other control")
+    return Control.objects.order_by("title")
+
+
+def test_get_fingerprint():
+    sql = 'SELECT "a"."id" FROM "a"\n  WHERE "a"."id" IN (%s, %s, %s) LIMIT 21'
+    assert (
+        get_fingerprint(sql)
+        == 'SELECT "a"."id" FROM "a" WHERE "a"."id" IN (...) LIMIT ?'
+    )
+
+
+def test_record_queries(controls):
+    with record_queries() as stats:
+        for control in controls:
+            str(control.category)
+
+    assert stats.count == 3
+    assert stats.time > 0
+    [(fingerprint, count)] = stats.get_duplicates()
+    assert count == 2
+    assert '"documents_controlcategory"' in fingerprint
+
+
+def test_record_queries_keeps_other_wrappers(controls):
+    def wrapper(execute, sql, params, many, context):
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(wrapper), record_queries() as stats:
+        list(controls)
+    with record_queries():
+        pass
+
+    assert stats.count == 1
+    assert wrapper not in connection.execute_wrappers
+
+
+def test_async_middleware(rf):
+    async def get_response(request):
+        await sync_to_async(list)(Control.objects.all())
+        return HttpResponse()
+
+    request = rf.get("/")
+    request.resolver_match = None
+    middleware = QueryBudgetMiddleware(get_response)
+
+    assert iscoroutinefunction(middleware)
+    async_to_sync(middleware)(request)
+    assert request.query_stats.count == 1
+
+
+def test_middleware_is_not_used_without_sampling(settings):
+    settings.QUERY_BUDGET_SAMPLE_RATE = 0
+    with pytest.raises(MiddlewareNotUsed):
+        QueryBudgetMiddleware(lambda request: None)
+
+
+def test_declared_budget(monkeypatch, superuser_client, controls):
+    monkeypatch.setattr(ControlListView, "query_budget", 1)
+    monkeypatch.setattr(ControlListView, "query_time_budget", 0)
+
+    response = superuser_client.get(reverse("control_list"))
+    request = response.wsgi_request
+    problems = check_query_budget(request.resolver_match, request.query_stats)
+
+    assert len(problems) == 2
+    assert problems[0] == f"{request.query_stats.count} queries, the budget is 1"
+
+
+def test_learned_budget(superuser_client, controls, query_budgets_file):
+    response = superuser_client.get(reverse("control_list"))
+    request = response.wsgi_request
+    stats = request.query_stats
+
+    save_query_budgets({"control_list": stats.count})
+    assert check_query_budget(request.resolver_match, stats) == []
+
+    save_query_budgets({"control_list": stats.count - 1})
+    assert check_query_budget(request.resolver_match, stats) == [
+        f"{stats.count} queries, the budget is {stats.count - 1}"
+    ]
+
+
+def test_report(controls):
+    with record_queries() as stats:
+        for control in controls:
+            str(control.category)
+
+    report = get_report("control_list", stats, ["3 queries, the budget is 1"])
+    lines = report.splitlines()
+    assert lines[0] == "control_list: 3 queries, the budget is 1"
+    assert lines[1].startswith("    2x SELECT")
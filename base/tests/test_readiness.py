@@ -0,0 +1,100 @@
+import time
+
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.db import connection
+
+import pytest
+
+from base.readiness import CACHE_KEY
+from base.readiness import CheckFailedError
+from base.readiness import get_readiness
+from base.readiness import run_checks
+
+pytestmark = pytest.mark.django_db(databases=["default", "logs"])
+
+
+@pytest.fixture(autouse=True)
+def _clear_readiness_cache():
+    cache.delete(CACHE_KEY)
+    yield
+    cache.delete(CACHE_KEY)
+
+
+def test_run_checks():
+    readiness = run_checks(timeout=5)
+
+    assert readiness["ready"]
+    assert set(readiness["checks"]) == {"database:default", "database:logs", "cache"}
+    for check in readiness["checks"].values():
+        assert check["ok"]
+        assert check["latency_ms"] >= 0
+    database = readiness["checks"]["database:default"]
+    assert 0 < database["connections"] <= database["max_connections"]
+
+
+def test_database_checks_reuse_the_connection():
+    with connection.cursor():
+        pass
+    connection_id = id(connection.connection)
+
+    assert run_checks(timeout=5)["checks"]["database:default"]["ok"]
+    assert id(connection.connection) == connection_id
+
+
+def test_run_checks_failure():
+    error = CheckFailedError("Got invalid response from DB")
+    with patch("base.readiness.check_database", side_effect=error):
+        readiness = run_checks(timeout=5)
+
+    assert not readiness["ready"]
+    assert readiness["checks"]["database:logs"] == {
+        "ok": False,
+        "error": "Got invalid response from DB",
+    }
+    assert readiness["checks"]["cache"]["ok"]
+
+
+def test_run_checks_timeout():
+    with patch("base.readiness.check_cache", side_effect=lambda: time.sleep(1)):
+        start = time.monotonic()
+        readiness = run_checks(timeout=0.1)
+
+    assert time.monotonic() - start < 1
+    assert not readiness["ready"]
+    assert readiness["checks"]["cache"] == {
+        "ok": False,
+        "error": "timed out after 0.1s",
+    }
+    assert readiness["checks"]["database:default"]["ok"]
+
+
+def test_broker_is_not_required(settings):
+    settings.CELERY_BROKER_URL = "redis://broker"
+    settings.CELERY_TASK_ALWAYS_EAGER = False
+    with patch("base.readiness.check_broker", side_effect=ConnectionError):
+        readiness = run_checks(timeout=5)
+
+    assert readiness["ready"]
+    assert readiness["checks"]["celery_broker"] == {
+        "ok": False,
+        "error": "ConnectionError",
+    }
+
+
+def test_get_readiness_is_cached():
+    with patch("base.readiness.run_checks", wraps=run_checks) as run_checks_mock:
+        first = get_readiness()
+        second = get_readiness()
+
+    assert run_checks_mock.call_count == 1
+    assert first == second
+    assert first["ready"]
+
+
+def test_ready_url(client):
+    response = client.get("/_ready/")
+
+    assert response.status_code == 200
+    assert response.json() == {"ready": True, "failed": []}
@@ -0,0 +1,78 @@
+from django.contrib.admin.models import ADDITION
+from django.http import HttpResponse
+
+import pytest
+
+from asgiref.sync import async_to_sync
+from asgiref.sync import iscoroutinefunction
+from asgiref.sync import sync_to_async
+
+from audit.models import AuditLogEntry
+from base.audit import audit_log_writer
+from base.middleware import RequestMiddleware
+from base.request_context import get_current_user
+from base.request_context import user_context
+from base.signals import get_user
+from documents.models.document_type import DocumentType
+
+
+def test_user_context(regular_user, superuser_user):
+    assert get_current_user() is None
+    with user_context(regular_user):
+        with user_context(superuser_user):
+            assert get_user() == superuser_user
+        assert get_user() == regular_user
+    assert get_current_user() is None
+
+
+def test_sync_middleware(rf, regular_user):
+    def get_response(request):
+        return HttpResponse(str(get_user().pk))
+
+    request = rf.get("/")
+    request.user = regular_user
+    middleware = RequestMiddleware(get_response)
+
+    assert not iscoroutinefunction(middleware)
+    assert middleware(request).content == str(regular_user.pk).encode()
+    assert get_user() is None
+
+
+def test_async_middleware_user_in_threads(rf, regular_user):
+    async def get_response(request):
+        # sync code run in a thread of the pool gets the user too
+        user = await sync_to_async(get_user, thread_sensitive=False)()
+        return HttpResponse(str(user.pk))
+
+    request = rf.get("/")
+    request.user = regular_user
+    middleware = RequestMiddleware(get_response)
+
+    assert iscoroutinefunction(middleware)
+    response = async_to_sync(middleware)(request)
+    assert response.content == str(regular_user.pk).encode()
+    assert get_user() is None
+
+
+@pytest.mark.django_db(databases=["default", "logs"])
+def test_async_middleware_audit_log(
+    rf, regular_user, django_capture_on_commit_callbacks
+):
+    def create_document_type():
+        with django_capture_on_commit_callbacks(execute=True):
+            DocumentType.objects.create(name="Policy")
+        # buffered until the response is ready
+        assert not AuditLogEntry.objects.exists()
+
+    async def get_response(request):
+        await sync_to_async(create_document_type)()
+        return HttpResponse()
+
+    request = rf.get("/")
+    request.user = regular_user
+    async_to_sync(RequestMiddleware(get_response))(request)
+
+    log_entry = AuditLogEntry.objects.get()
+    assert log_entry.action_flag == ADDITION
+    assert log_entry.user_id == regular_user.pk
+    assert audit_log_writer.buffered_entries.get() is None
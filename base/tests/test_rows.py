@@ -0,0 +1,73 @@
+from django.template.loader import render_to_string
+from django.urls import reverse
+
+import pytest
+
+from base.rows import RowProjection
+from risks.models.risk import Risk
+from users.models.user import User
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def risks(risk, regular_user):
+    Risk.objects.filter(pk=risk.pk).update(updated_by=regular_user)
+    Risk.objects.create(title="other risk", responsible=regular_user)
+    return Risk.objects.order_by("title")
+
+
+@pytest.fixture
+def projection():
+    return RowProjection(
+        Risk,
+        {
+            "title": "title",
+            "updated_at": "updated_at",
+            "responsible__email": "responsible__email",
+            "updated_by__get_label": User.get_label_expression("updated_by"),
+        },
+        str_column="title",
+        url_name="risk_detail",
+    )
+
+
+def test_row_projection(risks, projection, django_assert_num_queries):
+    with django_assert_num_queries(1):
+        rows = projection.get_rows(projection.get_queryset(risks))
+
+    for row, risk in zip(rows, risks, strict=True):
+        assert str(row) == str(risk)
+        assert row.pk == row.id == risk.pk
+        assert row.get_absolute_url == risk.get_absolute_url()
+        assert row.responsible.email == risk.responsible.email
+        if risk.updated_by is None:
+            assert row.updated_by is None
+        else:
+            assert row.updated_by.get_label == risk.updated_by.get_label()
+
+
+def test_rows_have_no_dict(risks, projection):
+    row = projection.get_rows(projection.get_queryset(risks))[0]
+    assert not hasattr(row, "__dict__")
+    with pytest.raises(AttributeError):
+        row.description = "description"
+
+
+def test_rows_render_like_instances(rf, risks, projection, superuser_user):
+    request = rf.get("/")
+    request.user = superuser_user
+    rows = projection.get_rows(projection.get_queryset(risks))
+    risk_table = "risks/includes/risk_table.html"
+
+    assert render_to_string(
+        risk_table, {"object_list": rows}, request
+    ) == render_to_string(risk_table, {"object_list": risks}, request)
+
+
+def test_list_view_rows(superuser_client, risks):
+    response = superuser_client.get(reverse("risk_list"))
+    assert sorted(str(row) for row in response.context["object_list"]) == [
+        str(risk) for risk in risks
+    ]
+    assert response.context["risk_list"] == response.context["object_list"]
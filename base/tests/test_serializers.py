@@ -1,3 +1,4 @@
+import json
 import uuid
 
 from collections.abc import MutableMapping
@@ -12,12 +13,16 @@ from unittest.mock import patch
 from django.core.files.uploadedfile import UploadedFile
 from django.db.models.fields.files import FieldFile
 from django.utils.functional import Promise
+from django.utils.functional import SimpleLazyObject
+from django.utils.translation import gettext_lazy
 
 import pytest
 
 from base.models import BaseModel
 from base.serializers import ModelEncoder
 from base.serializers import StringFallbackJSONEncoder
+from base.serializers import iter_json_array
+from documents.models.document_type import DocumentType
 
 
 class DictLike(MutableMapping):
@@ -201,3 +206,72 @@ def test_string_fall_back_json_encoder_process_date():
 )
 def test_string_fall_back_json_encoder_process_datetime(obj, expected):
     assert StringFallbackJSONEncoder().process_datetime(obj) == expected
+
+
+class KeyedLookup:
+    """Object with `__getitem__` that is neither a sequence nor a mapping"""
+
+    def __getitem__(self, key):
+        return key
+
+    def __str__(self):
+        return "keyed lookup"
+
+
+def test_string_fall_back_json_encoder_process_other_not_a_mapping():
+    assert StringFallbackJSONEncoder().process_other(KeyedLookup()) == "keyed lookup"
+
+
+@pytest.mark.parametrize(
+    ("obj", "expected"),
+    (
+        (
+            SimpleLazyObject(lambda: datetime.fromisoformat("2023-07-12T15:30:00")),
+            "2023-07-12T15:30:00",
+        ),
+        (gettext_lazy("Yes"), "Yes"),
+        (Decimal("1.10"), "1.10"),
+    ),
+)
+def test_model_encoder_dispatch(obj, expected):
+    assert json.loads(json.dumps(obj, cls=ModelEncoder)) == expected
+
+
+def test_type_encoders_are_cached():
+    ModelEncoder.dispatch_cache.clear()
+    encoder = ModelEncoder()
+    with patch.object(
+        ModelEncoder,
+        "get_type_encoder",
+        wraps=encoder.get_type_encoder,
+    ) as get_type_encoder:
+        for value in range(3):
+            encoder.default(Decimal(value))
+
+    assert get_type_encoder.call_count == 1
+    assert ModelEncoder.dispatch_cache == {Decimal: "encode_str"}
+
+
+@pytest.mark.parametrize("chunk_size", (1, 2, 1000))
+def test_iter_json_array(chunk_size):
+    items = [{"a": Decimal("1.1"), "b": [1, 2]}, {"c": None}, "d"]
+    chunks = list(iter_json_array(items, chunk_size=chunk_size))
+
+    assert "".join(chunks) == json.dumps(items, cls=ModelEncoder)
+    assert len(chunks) == 2 + -(-len(items) // chunk_size)
+    assert "".join(iter_json_array([])) == "[]"
+
+
+@pytest.mark.django_db
+def test_queryset_iter_json():
+    DocumentType.objects.bulk_create(DocumentType(name=f"Type {i}") for i in range(3))
+    queryset = DocumentType.objects.order_by("name")
+
+    chunks = list(queryset.iter_json(chunk_size=2))
+    assert len(chunks) == 4
+    assert [row["name"] for row in json.loads("".join(chunks))] == [
+        "Type 0",
+        "Type 1",
+        "Type 2",
+    ]
+    assert queryset.to_json() == "".join(chunks)
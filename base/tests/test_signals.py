@@ -8,7 +8,7 @@ from base.signals import audit_log
 def test_audit_log_not_in_our_models():
     with (
         patch("base.signals.get_user", return_value="user"),
-        patch("base.signals.get_our_models", return_value=[]),
+        patch.dict("base.signals.audited_models", clear=True),
     ):
         instance_mock = MagicMock()
         model = MagicMock()
@@ -21,7 +21,7 @@ def test_audit_log_in_our_models_raw():
     model = MagicMock()
     with (
         patch("base.signals.get_user", return_value="user"),
-        patch("base.signals.get_our_models", return_value=[model]),
+        patch.dict("base.signals.audited_models", {model: MagicMock()}),
     ):
         instance_mock = MagicMock()
         audit_log(model, instance_mock, created=False, raw=True)
@@ -33,7 +33,7 @@ def test_audit_delete_log_in_our_models():
     model = MagicMock()
     with (
         patch("base.signals.get_user", return_value="user"),
-        patch("base.signals.get_our_models", return_value=[model]),
+        patch.dict("base.signals.audited_models", {model: MagicMock()}),
     ):
         instance_mock = MagicMock()
         audit_delete_log(model, instance_mock)
@@ -43,7 +43,7 @@ def test_audit_delete_log_in_our_models():
 def test_audit_delete_log_not_in_our_models():
     with (
         patch("base.signals.get_user", return_value="user"),
-        patch("base.signals.get_our_models", return_value=[]),
+        patch.dict("base.signals.audited_models", clear=True),
     ):
         instance_mock = MagicMock()
         model = MagicMock()
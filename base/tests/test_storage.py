@@ -0,0 +1,104 @@
+import datetime
+import hashlib
+
+from django.core.files.base import ContentFile
+from django.utils import timezone
+
+import pytest
+
+from base.models import StoredBlob
+from base.storage import ContentAddressedFileSystemStorage
+from base.storage import collect_blobs
+from documents.models.evidence import Evidence
+
+pytestmark = pytest.mark.django_db
+
+CONTENT = b"policy content"
+DIGEST = hashlib.sha256(CONTENT).hexdigest()
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return ContentAddressedFileSystemStorage(location=tmp_path, base_url="/media/")
+
+
+def test_files_are_stored_once(storage, tmp_path):
+    first = storage.save("Evidence/a/policy.pdf", ContentFile(CONTENT))
+    second = storage.save("Evidence/b/Policy.PDF", ContentFile(CONTENT))
+
+    assert first == f"blobs/{DIGEST[:2]}/{DIGEST}/policy.pdf"
+    assert second == f"blobs/{DIGEST[:2]}/{DIGEST}/Policy.PDF"
+    assert [path.name for path in tmp_path.glob("blobs/*/*")] == [f"{DIGEST}.pdf"]
+    with storage.open(second) as stored_file:
+        assert stored_file.read() == CONTENT
+    assert storage.size(first) == len(CONTENT)
+    assert storage.url(first) == f"/media/blobs/{DIGEST[:2]}/{DIGEST}.pdf"
+    assert storage.get_name_digest(first) == DIGEST
+
+    blob = StoredBlob.objects.get()
+    assert blob.reference_count == 2
+    assert blob.size == len(CONTENT)
+
+
+def test_blobs_of_each_extension_are_counted(storage):
+    pdf = storage.save("policy.pdf", ContentFile(CONTENT))
+    txt = storage.save("policy.txt", ContentFile(CONTENT))
+    Evidence.objects.create(file=pdf)
+    StoredBlob.objects.update(
+        last_referenced_at=timezone.now() - datetime.timedelta(days=2)
+    )
+
+    assert StoredBlob.objects.count() == 2
+    [deleted] = collect_blobs(storage)
+
+    assert deleted.name == storage.resolve_name(txt)
+    assert not storage.exists(txt)
+    assert storage.exists(pdf)
+    assert StoredBlob.objects.get().reference_count == 1
+
+
+def test_upload_digest_is_used(storage):
+    content = ContentFile(CONTENT)
+    content.sha256 = "a" * 64
+
+    assert storage.save("policy.pdf", content) == f"blobs/aa/{'a' * 64}/policy.pdf"
+
+
+def test_blobs_are_not_deleted_with_the_files(storage):
+    name = storage.save("policy.pdf", ContentFile(CONTENT))
+    storage.delete(name)
+
+    assert storage.exists(name)
+
+
+def test_other_names_are_stored_as_usual(storage, tmp_path):
+    (tmp_path / "old.txt").write_bytes(CONTENT)
+
+    assert storage.exists("old.txt")
+    assert storage.open("old.txt").read() == CONTENT
+    storage.delete("old.txt")
+    assert not storage.exists("old.txt")
+
+
+def test_collect_blobs(storage):
+    used = storage.save("policy.pdf", ContentFile(CONTENT))
+    unused = storage.save("other.pdf", ContentFile(b"other content"))
+    recent = storage.save("recent.pdf", ContentFile(b"recent content"))
+    Evidence.objects.create(file=used)
+    old = timezone.now() - datetime.timedelta(days=2)
+    StoredBlob.objects.exclude(name=storage.resolve_name(recent)).update(
+        last_referenced_at=old
+    )
+    StoredBlob.objects.update(reference_count=5)
+
+    assert [blob.name for blob in collect_blobs(storage, dry_run=True)] == [
+        storage.resolve_name(unused)
+    ]
+    [deleted] = collect_blobs(storage)
+
+    assert deleted.name == storage.resolve_name(unused)
+    assert not storage.exists(unused)
+    assert storage.exists(used)
+    assert storage.exists(recent)
+    counts = dict(StoredBlob.objects.values_list("name", "reference_count"))
+    assert counts == {storage.resolve_name(used): 1, storage.resolve_name(recent): 0}
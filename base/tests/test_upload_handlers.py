@@ -0,0 +1,21 @@
+import hashlib
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.uploadedfile import TemporaryUploadedFile
+
+CONTENT = b"evidence content\n" * 1000
+
+
+def test_uploaded_files_are_hashed(rf):
+    request = rf.post("/", {"file": SimpleUploadedFile("evidence.txt", CONTENT)})
+
+    assert request.FILES["file"].sha256 == hashlib.sha256(CONTENT).hexdigest()
+
+
+def test_large_uploaded_files_are_hashed(rf, settings):
+    settings.FILE_UPLOAD_MAX_MEMORY_SIZE = 100
+    request = rf.post("/", {"file": SimpleUploadedFile("evidence.txt", CONTENT)})
+
+    uploaded_file = request.FILES["file"]
+    assert isinstance(uploaded_file, TemporaryUploadedFile)
+    assert uploaded_file.sha256 == hashlib.sha256(CONTENT).hexdigest()
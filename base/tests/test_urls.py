@@ -1,9 +1,12 @@
 import datetime
+import os
 import re
 
 from http import HTTPStatus
 
+from django.apps import apps
 from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
 from django.db.models import Model
 
 import pytest
@@ -11,7 +14,12 @@ import pytz
 
 from inflection import underscore
 
+from base.fetch_plans import load_fetch_plans
+from base.fetch_plans import recording
+from base.fetch_plans import save_fetch_plans
 from base.fixtures import MODEL_FIXTURE_CUSTOM_NAMES
+from base.query_budget import save_query_budgets
+from base.tests.url_helper import QueryBudgetCheck
 from base.tests.url_helper import UrlTestHelper
 from base.utils import get_our_models
 from base.utils import get_slug_fields
@@ -94,30 +102,47 @@ def extra_parameter_values(extra_objects):
     return {}
 
 
-@pytest.mark.slow
-@pytest.mark.django_db(transaction=True, databases=["default", "logs"])
-def test_responses(
-    superuser_user,
-    superuser_client,
+@pytest.fixture
+def url_helper(
     default_objects,
     extra_objects,
     default_parameter_values,
     extra_parameter_values,
 ):
-    """Test all URLs."""
-
     helper_objects = {**default_objects, **extra_objects}
     helper_params = {**default_parameter_values, **extra_parameter_values}
-    url_helper = UrlTestHelper(
+    return UrlTestHelper(
         excluded_namespaces=EXCLUDED_NAMESPACES,
         excluded_patterns=EXCLUDED_PATTERNS,
         default_objects=helper_objects,
         default_params=helper_params,
     )
 
+
+@pytest.mark.slow
+@pytest.mark.django_db(transaction=True, databases=["default", "logs"])
+def test_responses(settings, superuser_user, superuser_client, url_helper):
+    """
+    Test all URLs, and that their views don't exceed their query budget. Set
+    the UPDATE_QUERY_BUDGETS environment variable to store the number of
+    queries of the views that don't declare a budget.
+    """
+
+    # the urls find the same cached values, whatever tests ran before, so they
+    # run the same queries
+    settings.CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "test_responses",
+        },
+    }
+    ContentType.objects.get_for_models(*apps.get_models(), for_concrete_models=False)
+
+    query_budget_check = QueryBudgetCheck()
     for url in url_helper.get_urls_to_test():
         superuser_client.force_login(superuser_user)
         response = superuser_client.get(url)
+        query_budget_check.add(url, response)
 
         msg = f'url "{url}" returned {response.status_code}'
         assert response.status_code in (
@@ -126,3 +151,37 @@ def test_responses(
             HTTPStatus.FORBIDDEN,  # 403
             HTTPStatus.METHOD_NOT_ALLOWED,  # 405
         ), msg
+
+    if os.environ.get("UPDATE_QUERY_BUDGETS"):
+        save_query_budgets(query_budget_check.learned_budgets)
+    elif query_budget_check.reports:
+        pytest.fail(
+            "Query budgets exceeded, update the learned budgets with: "
+            "UPDATE_QUERY_BUDGETS=1 pytest -m slow "
+            "base/tests/test_urls.py::test_responses\n"
+            + "\n".join(query_budget_check.reports)
+        )
+
+
+@pytest.mark.slow
+@pytest.mark.django_db(transaction=True, databases=["default", "logs"])
+def test_fetch_plans(superuser_user, superuser_client, url_helper):
+    """
+    Test the fetch plans file has the relations the views access, set the
+    UPDATE_FETCH_PLANS environment variable to update it.
+    """
+
+    with recording() as recorder:
+        for url in url_helper.get_urls_to_test():
+            superuser_client.force_login(superuser_user)
+            superuser_client.get(url)
+
+    plans = recorder.get_plans()
+    if os.environ.get("UPDATE_FETCH_PLANS"):
+        save_fetch_plans(plans)
+
+    msg = (
+        "The fetch plans are stale, update them with: UPDATE_FETCH_PLANS=1 "
+        "pytest -m slow base/tests/test_urls.py::test_fetch_plans"
+    )
+    assert plans == load_fetch_plans(), msg
@@ -0,0 +1,77 @@
+import pytest
+
+from documents.models.document import Document
+from documents.models.document_version import DocumentVersion
+from processes.models.process import Process
+from processes.models.process_version import ProcessVersion
+
+pytestmark = pytest.mark.django_db
+
+
+def get_document_summary(document):
+    return (
+        document.last_version,
+        str(document.last_version),
+        document.last_approved_version,
+        document.can_add_new_versions,
+        document.latest_update,
+        document.latest_updator,
+    )
+
+
+def get_process_summary(process):
+    return (
+        process.last_version,
+        process.last_published_version,
+        process.can_add_new_versions,
+        process.latest_update,
+        process.latest_updator,
+    )
+
+
+@pytest.fixture
+def documents(django_file, regular_user):
+    documents = [
+        Document.objects.create(title=f"Document {i}", code=f"DOC{i}") for i in range(3)
+    ]
+    for document in documents[1:]:
+        DocumentVersion.objects.create(
+            document=document,
+            file=django_file,
+            is_approved=True,
+            updated_by=regular_user,
+        )
+    DocumentVersion.objects.create(document=documents[2], file=django_file)
+    return documents
+
+
+def test_document_version_summary(documents, django_assert_num_queries):
+    expected = [get_document_summary(document) for document in documents]
+    assert expected[0][0] is None
+    assert expected[1][3]
+    assert not expected[2][3]
+
+    # documents and the last, last approved and latest updated versions
+    with django_assert_num_queries(4):
+        summaries = [
+            get_document_summary(document)
+            for document in Document.objects.order_by("pk").with_version_summary()
+        ]
+    assert summaries == expected
+
+
+def test_process_version_summary(process, document, django_assert_num_queries):
+    other_process = Process.objects.create(name="other process")
+    ProcessVersion.objects.create(process=process, defined_in=document)
+    ProcessVersion.objects.create(
+        process=process, defined_in=document, is_published=True
+    )
+    processes = [process, other_process]
+    expected = [get_process_summary(process) for process in processes]
+
+    with django_assert_num_queries(4):
+        summaries = [
+            get_process_summary(process)
+            for process in Process.objects.order_by("pk").with_version_summary()
+        ]
+    assert summaries == expected
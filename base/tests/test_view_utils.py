@@ -1,6 +1,14 @@
+import itertools
+
+from django.db import connection
+from django.urls import reverse
+
 import pytest
 
+from base.pagination import KeysetPaginator
 from base.view_utils import paginate
+from documents.models.document import Document
+from documents.models.document_type import DocumentType
 
 
 @pytest.mark.parametrize(
@@ -17,3 +25,114 @@ def test_paginate(page, objects, expected_page, expected_objects, rf):
     paginated_objects = paginate(request, objects)
     assert paginated_objects.number == expected_page
     assert paginated_objects.object_list == expected_objects
+
+
+@pytest.fixture
+def documents(db):
+    document_type = DocumentType.objects.create(name="Type")
+    # repeated descriptions, so the pk decides the order between them
+    return Document.objects.bulk_create(
+        Document(
+            title=f"Document {i}",
+            code=f"DOC{i}",
+            description=f"Description {i % 4}",
+            document_type=document_type if i % 3 else None,
+        )
+        for i in range(23)
+    )
+
+
+def get_all_pages(rf, queryset, cursor=""):
+    pages = []
+    while True:
+        page = paginate(rf.get("/", {"cursor": cursor}), queryset, 5, keyset=True)
+        pages.append(page)
+        if not page.has_next():
+            return pages
+        cursor = page.next_cursor
+
+
+@pytest.mark.parametrize(
+    ("ordering", "expected_ordering"),
+    (
+        (("description",), ("description", "pk")),
+        (("-description",), ("-description", "pk")),
+        (("-description", "-pk"), ("-description", "-pk")),
+        # the default ordering of the model
+        (None, ("title", "pk")),
+    ),
+)
+def test_keyset_paginate(documents, ordering, expected_ordering, rf):
+    queryset = Document.objects.all()
+    if ordering is not None:
+        queryset = queryset.order_by(*ordering)
+    pages = get_all_pages(rf, queryset)
+
+    assert [len(page) for page in pages] == [5, 5, 5, 5, 3]
+    assert [obj for page in pages for obj in page] == list(
+        Document.objects.order_by(*expected_ordering)
+    )
+    assert not pages[0].has_previous()
+    assert all(page.has_previous() for page in pages[1:])
+
+    # going back returns the same pages
+    for previous, page in itertools.pairwise(pages):
+        request = rf.get("/", {"cursor": page.previous_cursor})
+        assert list(paginate(request, queryset, 5, keyset=True)) == list(previous)
+
+
+def test_keyset_paginate_null_values(documents, rf):
+    for ordering in ("document_type", "-document_type"):
+        queryset = Document.objects.order_by(ordering)
+        pages = get_all_pages(rf, queryset)
+        assert [obj for page in pages for obj in page] == list(
+            queryset.order_by(ordering, "pk")
+        )
+
+
+@pytest.mark.parametrize("cursor", ("invalid", "WyJuIiwgWzFdXQ", "%%"))
+def test_keyset_paginate_invalid_cursor(documents, cursor, rf):
+    page = paginate(
+        rf.get("/", {"cursor": cursor}), Document.objects.all(), 5, keyset=True
+    )
+    assert list(page) == list(Document.objects.order_by("title")[:5])
+    assert not page.has_previous()
+
+
+def test_keyset_paginate_does_not_count(documents, rf, django_assert_num_queries):
+    queryset = Document.objects.order_by("description")
+    cursor = paginate(rf.get("/"), queryset, 5, keyset=True).next_cursor
+    with django_assert_num_queries(1):
+        list(paginate(rf.get("/", {"cursor": cursor}), queryset, 5, keyset=True))
+
+
+def test_keyset_estimated_count(documents, rf):
+    with connection.cursor() as cursor:
+        cursor.execute(f"ANALYZE {Document._meta.db_table}")
+
+    paginator = KeysetPaginator(Document.objects.all(), 5, 20)
+    assert paginator.count == len(documents)
+    assert paginator.count_is_estimated
+
+    paginator = KeysetPaginator(Document.objects.all(), 5, 100)
+    assert paginator.count == len(documents)
+    assert not paginator.count_is_estimated
+
+    # filtered querysets are always counted
+    paginator = KeysetPaginator(
+        Document.objects.filter(description="Description 0"), 5, 1
+    )
+    assert paginator.count == 6
+    assert not paginator.count_is_estimated
+
+
+def test_keyset_list_view(superuser_client, process_instance):
+    url = reverse("processinstance_list")
+    response = superuser_client.get(url)
+    assert response.status_code == 200
+    assert isinstance(response.context["paginator"], KeysetPaginator)
+    assert list(response.context["object_list"]) == [process_instance]
+
+    response = superuser_client.get(url, {"cursor": "invalid"})
+    assert response.status_code == 200
+    assert list(response.context["object_list"]) == [process_instance]
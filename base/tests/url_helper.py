@@ -18,6 +18,9 @@ from django.urls.converters import SlugConverter
 
 from inflection import underscore
 
+from base.query_budget import check_query_budget
+from base.query_budget import get_report
+from base.query_budget import get_view_class
 from base.utils import get_our_models
 
 if TYPE_CHECKING:
@@ -35,6 +38,37 @@ class SkipUrl(Exception):  # noqa: N818
     """Signals a certain URL pattern should be skipped due to missing data."""
 
 
+class QueryBudgetCheck:
+    """
+    Collects the queries recorded by QueryBudgetMiddleware for the responses of
+    the test_responses test, and the views that exceed their query budget.
+    """
+
+    def __init__(self):
+        self.reports = []
+        # number of queries of the views without a declared budget, by url name
+        self.learned_budgets = {}
+
+    def add(self, url: str, response):
+        request = response.wsgi_request
+        stats = getattr(request, "query_stats", None)
+        resolver_match = request.resolver_match
+        if stats is None or resolver_match is None:
+            return
+
+        view_name = resolver_match.view_name
+        if getattr(get_view_class(resolver_match), "query_budget", None) is None:
+            self.learned_budgets[view_name] = max(
+                stats.count, self.learned_budgets.get(view_name, 0)
+            )
+
+        problems = check_query_budget(resolver_match, stats)
+        if problems:
+            self.reports.append(
+                get_report(f'url "{url}" [{view_name}]', stats, problems)
+            )
+
+
 class UrlTestHelper:
     """Helper class for the test_responses test."""
 
@@ -0,0 +1,41 @@
+"""
+Upload handlers that compute the SHA-256 of the uploaded files while they are
+received, so models don't read them again from the storage to hash them.
+
+The uploaded files get the hex digest in their `sha256` attribute.
+"""
+import hashlib
+
+from django.core.files.uploadhandler import MemoryFileUploadHandler
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+
+
+class HashingUploadHandlerMixin:
+    def new_file(self, *args, **kwargs):
+        # before the memory handler stops the next handlers with an exception
+        self.sha256 = hashlib.sha256()
+        super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        # the memory handler passes large files on to the next handler
+        if getattr(self, "activated", True):
+            self.sha256.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        file = super().file_complete(file_size)
+        if file is not None:
+            file.sha256 = self.sha256.hexdigest()
+        return file
+
+
+class HashingMemoryFileUploadHandler(
+    HashingUploadHandlerMixin, MemoryFileUploadHandler
+):
+    pass
+
+
+class HashingTemporaryFileUploadHandler(
+    HashingUploadHandlerMixin, TemporaryFileUploadHandler
+):
+    pass
@@ -4,8 +4,18 @@ from django.core.paginator import EmptyPage
 from django.core.paginator import PageNotAnInteger
 from django.core.paginator import Paginator
 
+from base.pagination import KeysetPaginator
+
+
+def paginate(request, objects, page_size=25, keyset=False, **kwargs):
+    """
+    Return the page of `objects` requested on the query string. When `keyset`
+    is True, the queryset is paginated with a cursor, see `KeysetPaginator`.
+    """
+    if keyset:
+        paginator = KeysetPaginator(objects, page_size, **kwargs)
+        return paginator.page(request.GET.get("cursor"))
 
-def paginate(request, objects, page_size=25):
     paginator = Paginator(objects, page_size)
     page = request.GET.get("p")
 
@@ -29,6 +39,9 @@ def clean_query_string(request):
     with contextlib.suppress(KeyError):
         del clean_query_set["p"]
 
+    with contextlib.suppress(KeyError):
+        del clean_query_set["cursor"]
+
     mstring = []
     for key in clean_query_set:
         valuelist = request.GET.getlist(key)
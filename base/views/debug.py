@@ -1,3 +1,4 @@
+from django.core.cache import cache
 from django.http import JsonResponse
 from django.utils.decorators import method_decorator
 from django.views import View
@@ -29,5 +30,17 @@ class HttpRequestPrintView(SuperuserRestrictedMixin, View):
         )
 
 
+@method_decorator(never_cache, name="dispatch")
+class CacheStatsView(SuperuserRestrictedMixin, View):
+    """View that displays the hits and misses of the cache in this process."""
+
+    hide_with_404 = True
+
+    def get(self, request, *args, **kwargs):
+        get_stats = getattr(cache, "get_stats", None)
+        stats = get_stats() if get_stats else {}
+        return JsonResponse(stats, json_dumps_params={"sort_keys": True, "indent": 4})
+
+
 def get_sorted_request_variable(variable):
     return {k: variable.get(k) for k in sorted(variable)}
@@ -0,0 +1,89 @@
+import json
+
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core import signing
+from django.core.files.storage import default_storage
+from django.http import HttpResponse
+from django.http import HttpResponseBadRequest
+from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.cache import never_cache
+from django.views.decorators.csrf import csrf_exempt
+
+from base import direct_uploads
+
+PART_CHUNK_SIZE = 2**20
+
+
+class DirectUploadMixin(LoginRequiredMixin):
+    def load_json(self):
+        try:
+            return json.loads(self.request.body)
+        except ValueError as error:
+            msg = "Invalid JSON"
+            raise direct_uploads.DirectUploadError(msg) from error
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        except (
+            direct_uploads.DirectUploadError,
+            KeyError,
+            TypeError,
+            ValueError,
+        ) as error:
+            return HttpResponseBadRequest(str(error))
+
+
+@method_decorator(never_cache, name="dispatch")
+class DirectUploadStartView(DirectUploadMixin, View):
+    """
+    Starts a direct upload of the file with the `name`, `size` and
+    `content_type` of the JSON body, and returns the urls of its parts.
+    """
+
+    def post(self, request, *args, **kwargs):
+        data = self.load_json()
+        upload = direct_uploads.start_upload(
+            str(data["name"]),
+            int(data["size"]),
+            str(data.get("content_type") or "application/octet-stream"),
+        )
+        return JsonResponse(upload)
+
+
+@method_decorator(never_cache, name="dispatch")
+class DirectUploadCompleteView(DirectUploadMixin, View):
+    """
+    Completes a direct upload with the `upload` token and `parts`, pairs of
+    part number and ETag, of the JSON body, and returns the token the forms
+    receive.
+    """
+
+    def post(self, request, *args, **kwargs):
+        data = self.load_json()
+        token = direct_uploads.complete_upload(str(data["upload"]), data["parts"])
+        return JsonResponse({"token": token})
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class DirectUploadPartView(DirectUploadMixin, View):
+    """
+    Receives a part of a direct upload when the storage doesn't support
+    presigned urls. The url is signed like the S3 ones, so it doesn't need the
+    CSRF token.
+    """
+
+    def put(self, request, token, *args, **kwargs):
+        try:
+            upload_id, part_number = direct_uploads.load_part_token(token)
+        except signing.BadSignature:
+            return HttpResponseBadRequest("Invalid part")
+
+        backend = direct_uploads.FileSystemDirectUploadBackend(default_storage)
+        chunks = iter(lambda: request.read(PART_CHUNK_SIZE), b"")
+        etag = backend.save_part(upload_id, part_number, chunks)
+        response = HttpResponse()
+        response["ETag"] = etag
+        return response
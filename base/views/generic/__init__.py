@@ -1,6 +1,7 @@
 from base.views.generic.base import BaseRedirectView
 from base.views.generic.base import BaseTemplateView
 from base.views.generic.detail import BaseDetailView
+from base.views.generic.detail import BaseDownloadView
 from base.views.generic.edit import BaseCreateView
 from base.views.generic.edit import BaseDeleteView
 from base.views.generic.edit import BaseSubModelCreateView
@@ -12,6 +13,7 @@ __all__ = [
     "BaseTemplateView",
     "BaseRedirectView",
     "BaseDetailView",
+    "BaseDownloadView",
     "BaseCreateView",
     "BaseDeleteView",
     "BaseUpdateView",
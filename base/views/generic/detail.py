@@ -1,9 +1,15 @@
+from django.http import Http404
 from django.views.generic import DetailView
+from django.views.generic import View
+from django.views.generic.detail import SingleObjectMixin
 
+from base.downloads import serve_file
+
+from ..mixins import FetchPlanMixin
 from ..mixins import LoginPermissionRequiredMixin
 
 
-class BaseDetailView(LoginPermissionRequiredMixin, DetailView):
+class BaseDetailView(LoginPermissionRequiredMixin, FetchPlanMixin, DetailView):
     login_required = True
     permission_required = ()
     title = None
@@ -14,10 +20,30 @@ class BaseDetailView(LoginPermissionRequiredMixin, DetailView):
         verbose_name = self.model._meta.verbose_name
         return f"{verbose_name}: {self.object}".title()
 
+    def get_queryset(self):
+        return self.apply_fetch_plan(super().get_queryset(), only_root=False)
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        self.record_fetch_plan([self.object])
 
         context["opts"] = self.model._meta
         context["title"] = self.get_title()
 
         return context
+
+
+class BaseDownloadView(LoginPermissionRequiredMixin, SingleObjectMixin, View):
+    """Sends the file in the `file_field` of the object, see base.downloads"""
+
+    login_required = True
+    permission_required = ()
+    file_field = "file"
+    as_attachment = False
+
+    def get(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        field_file = getattr(self.object, self.file_field)
+        if not field_file:
+            raise Http404
+        return serve_file(field_file, as_attachment=self.as_attachment)
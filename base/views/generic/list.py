@@ -1,44 +1,173 @@
 import contextlib
 
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+from django.utils.text import slugify
 from django.views.generic import ListView
 
+from base.exports import EXPORT_FORMATS
+from base.exports import export_queryset
+from base.pagination import KeysetPaginator
+from base.rows import RowProjection
 from base.view_utils import clean_query_string
 
+from ..mixins import FetchPlanMixin
 from ..mixins import LoginPermissionRequiredMixin
 
 
-class BaseListView(LoginPermissionRequiredMixin, ListView):
+class BaseListView(LoginPermissionRequiredMixin, FetchPlanMixin, ListView):
     login_required = True
     permission_required = ()
     paginate_by = 25
     page_kwarg = "p"
-    ignore_kwargs_on_filter = ("q", page_kwarg, "o")
+    # paginate with a cursor instead of page numbers, for big tables
+    keyset_pagination = False
+    cursor_kwarg = "cursor"
+    # with keyset pagination, estimate the total above this number of rows
+    estimate_count_threshold = None
+    ignore_kwargs_on_filter = ("q", page_kwarg, cursor_kwarg, "o")
+    # lookups that can be filtered on the query string, by field path, e.g.
+    # {"process_version__process": ("exact", "in")}. Check that they have an
+    # index with `./manage.py check_list_indexes`
+    filterset = {}
+    # fields that can be used to sort the list on the query string
+    orderable_fields = ()
+    # columns of the CSV and XLSX exports, as lookup paths or (path, header)
+    export_fields = ()
+    export_kwarg = "export"
+    export_chunk_size = 2000
+    # render lightweight rows with these columns instead of model instances,
+    # by attribute name and lookup path or expression, see `base.rows`
+    row_columns = None
+    # attribute used as the string representation of the rows
+    row_str_column = None
+    # url name of the detail view, for the `get_absolute_url` of the rows
+    row_url_name = None
     title = None
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        projection = self.get_row_projection()
+        if projection is not None and context["paginator"] is None:
+            # without pagination, the rows are not built by paginate_queryset
+            values = projection.get_queryset(context["object_list"])
+            context["object_list"] = projection.get_rows(values)
+            context_object_name = self.get_context_object_name(self.object_list)
+            if context_object_name is not None:
+                context[context_object_name] = context["object_list"]
+        self.record_fetch_plan(context["object_list"])
         context["opts"] = self.model._meta
         context["clean_query_string"] = clean_query_string(self.request)
         context["q"] = self.request.GET.get("q")
         context["title"] = self.get_title()
-        context["ordering"] = self.request.GET.getlist("o")
+        context["ordering"] = self.get_requested_ordering()
+        context["export_formats"] = EXPORT_FORMATS if self.export_fields else ()
         return context
 
+    def get(self, request, *args, **kwargs):
+        export_format = request.GET.get(self.export_kwarg)
+        if self.export_fields and export_format in EXPORT_FORMATS:
+            return self.export(export_format)
+        return super().get(request, *args, **kwargs)
+
+    def export(self, export_format):
+        """
+        Return a streaming response with all the objects of the list, filtered
+        and ordered like the list.
+        """
+        filename = "{}-{}".format(
+            slugify(self.model._meta.verbose_name_plural),
+            timezone.localdate().isoformat(),
+        )
+        return export_queryset(
+            self.get_queryset(),
+            self.export_fields,
+            export_format,
+            filename,
+            chunk_size=self.export_chunk_size,
+        )
+
     def get_title(self):
         if self.title is not None:
             return self.title
         return self.model._meta.verbose_name_plural.title()
 
+    def get_row_projection(self):
+        if self.row_columns is None:
+            return None
+        return RowProjection(
+            self.model,
+            self.row_columns,
+            str_column=self.row_str_column,
+            url_name=self.row_url_name,
+        )
+
+    def paginate_queryset(self, queryset, page_size):
+        projection = self.get_row_projection()
+        if projection is not None:
+            queryset = projection.get_queryset(queryset)
+
+        if self.keyset_pagination:
+            paginator = KeysetPaginator(
+                queryset,
+                page_size,
+                estimate_count_threshold=self.estimate_count_threshold,
+            )
+            page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+            is_paginated = page.has_other_pages()
+        else:
+            paginator, page, _, is_paginated = super().paginate_queryset(
+                queryset, page_size
+            )
+
+        if projection is not None:
+            page.object_list = projection.get_rows(page.object_list)
+        return (paginator, page, page.object_list, is_paginated)
+
+    @classmethod
+    def get_allowed_filters(cls):
+        """Return the query string parameters that can be used as filters"""
+        allowed_filters = set()
+        for field, lookups in cls.filterset.items():
+            for lookup in lookups:
+                allowed_filters.add(f"{field}__{lookup}")
+                if lookup == "exact":
+                    allowed_filters.add(field)
+        return allowed_filters
+
+    def get_requested_ordering(self):
+        """Return the orderings of the query string that are allowed"""
+        return [
+            order
+            for order in self.request.GET.getlist("o")
+            if order.removeprefix("-") in self.orderable_fields
+        ]
+
     def get_ordering(self):
         """
         Return the field or fields to use for ordering the queryset.
         """
-        order = self.request.GET.getlist("o")
+        order = self.get_requested_ordering()
         if order:
             return order
 
         return self.ordering
 
+    def get_filter_params(self):
+        """Return the filters of the query string that are allowed"""
+        allowed_filters = self.get_allowed_filters()
+        params = {}
+        for key, value in self.request.GET.items():
+            if key not in allowed_filters or key in self.ignore_kwargs_on_filter:
+                continue
+            if key.endswith("__in"):
+                params[key] = value.split(",")
+            elif key.endswith("__isnull"):
+                params[key] = value.lower() in ("1", "true")
+            else:
+                params[key] = value
+        return params
+
     def get_queryset(self):
         """
         return the queryset to use on the list and filter by what comes on the
@@ -46,13 +175,9 @@ class BaseListView(LoginPermissionRequiredMixin, ListView):
         """
         queryset = super().get_queryset()
 
-        # obtain non ignored kwargs for the filter method
-        items = self.request.GET.items()
-        params = {k: v for k, v in items if k not in self.ignore_kwargs_on_filter}
-
-        # filter
-        for key, value in params.items():
-            with contextlib.suppress(Exception):
+        for key, value in self.get_filter_params().items():
+            # invalid values are ignored
+            with contextlib.suppress(ValidationError, ValueError, TypeError):
                 queryset = queryset.filter(**{key: value})
 
-        return queryset
+        return self.apply_fetch_plan(queryset)
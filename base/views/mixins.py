@@ -2,6 +2,10 @@ from django.contrib.auth.mixins import PermissionRequiredMixin
 from django.core.exceptions import ImproperlyConfigured
 from django.http import Http404
 
+from base.fetch_plans import apply_fetch_plan
+from base.fetch_plans import get_recorder
+from base.fetch_plans import load_fetch_plans
+
 
 class LoginPermissionRequiredMixin(PermissionRequiredMixin):
     """
@@ -10,6 +14,10 @@ class LoginPermissionRequiredMixin(PermissionRequiredMixin):
     """
 
     login_required = None
+    # maximum number of queries and milliseconds of database time of a request,
+    # see base.query_budget
+    query_budget = None
+    query_time_budget = None
 
     def is_login_required(self) -> bool:
         if self.login_required is None or not isinstance(self.login_required, bool):
@@ -46,3 +54,32 @@ class StaffRestrictedMixin:
         if not (user.is_authenticated and user.is_staff):
             raise Http404
         return super().dispatch(request, *args, **kwargs)
+
+
+class FetchPlanMixin:
+    """
+    Fetch the relations the template of the view uses, as recorded in its
+    fetch plan, see `base.fetch_plans`.
+    """
+
+    def get_fetch_plan_key(self):
+        view_class = self.__class__
+        template_name = self.template_name
+        if template_name is None:
+            # the default template, get_template_names() needs the objects
+            model = self.model if self.model is not None else self.queryset.model
+            opts = model._meta
+            template_name = (
+                f"{opts.app_label}/{opts.model_name}{self.template_name_suffix}.html"
+            )
+        return f"{view_class.__module__}.{view_class.__qualname__}:{template_name}"
+
+    def apply_fetch_plan(self, queryset, only_root=True):
+        plan = load_fetch_plans().get(self.get_fetch_plan_key())
+        return apply_fetch_plan(queryset, plan, only_root=only_root)
+
+    def record_fetch_plan(self, objects):
+        """Record the relations accessed from `objects`, when recording"""
+        recorder = get_recorder()
+        if recorder is not None:
+            recorder.start(self.get_fetch_plan_key(), objects)
@@ -1,6 +1,21 @@
 import pytest
 
 
+def pytest_addoption(parser):
+    parser.addoption(
+        "--run-benchmarks", action="store_true", help="run the benchmark tests"
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--run-benchmarks"):
+        return
+    skip_benchmark = pytest.mark.skip(reason="needs --run-benchmarks")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip_benchmark)
+
+
 @pytest.fixture(scope="session", autouse=True)
 def faker_session_locale():
     return ["es_CL"]
@@ -10,6 +25,7 @@ def faker_session_locale():
 pytest_plugins = [
     "base.fixtures",
     "api_client.fixtures",
+    "audit.fixtures",
     "parameters.fixtures",
     "regions.fixtures",
     "users.fixtures",
@@ -5,6 +5,8 @@ from django.utils.translation import gettext_lazy as _
 
 from base.forms import BaseForm
 from base.forms import BaseModelForm
+from base.forms import DirectUploadField
+from base.forms import DirectUploadFormMixin
 from documents.models.control import Control
 from documents.models.control_category import ControlCategory
 from documents.models.document import Document
@@ -25,7 +27,9 @@ class DocumentForm(BaseModelForm):
         )
 
 
-class DocumentVersionForm(BaseModelForm):
+class DocumentVersionForm(DirectUploadFormMixin, BaseModelForm):
+    upload = DirectUploadField(file_field="file")
+
     class Meta:
         model = DocumentVersion
         fields = ("author", "file", "file_url", "comment")
@@ -60,7 +64,7 @@ class ControlCategoryForm(BaseModelForm):
         fields = ("name",)
 
 
-class EvidenceForm(BaseForm):
+class EvidenceForm(DirectUploadFormMixin, BaseForm):
     evidence_file = forms.FileField(
         label=_("Evidence file"),
         required=False,
@@ -77,6 +81,7 @@ class EvidenceForm(BaseForm):
         widget=forms.Textarea(attrs={"rows": 3}),
         help_text=_("Text as evidence of the activity completion."),
     )
+    evidence_upload = DirectUploadField(file_field="evidence_file")
 
     class Meta:
         fields = ("evidence_file", "evidence_url", "evidence_text")
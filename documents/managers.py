@@ -1,15 +1,37 @@
 from __future__ import annotations
 
 from django.db import models
-from django.db.models import QuerySet
 
 from typing_extensions import Self
 
+from base.managers import BaseQuerySet
+from base.managers import VersionableQuerySet
 from documents.models.document_version_read_by_user import DocumentVersionReadByUser
 from users.models.user import User
 
 
-class DocumentVersionQuerySet(QuerySet):
+class DocumentQuerySet(VersionableQuerySet):
+    def with_version_summary(self) -> Self:
+        versions = self.get_versions_manager()
+        return (
+            super()
+            .with_version_summary()
+            .prefetch_related(
+                models.Prefetch(
+                    "versions",
+                    queryset=versions.approved().order_by("-version")[:1],
+                    to_attr="_prefetched_last_approved_version",
+                )
+            )
+            .annotate(
+                has_unapproved_versions=models.Exists(
+                    versions.not_approved().filter(document=models.OuterRef("pk"))
+                )
+            )
+        )
+
+
+class DocumentVersionQuerySet(BaseQuerySet):
     def approved(self) -> Self:
         return self.filter(is_approved=True)
 
@@ -9,6 +9,7 @@ from django.utils.translation import gettext_lazy as _
 
 from base.models import BaseModel
 from base.models.versionable_mixin import VersionableMixin
+from documents.managers import DocumentQuerySet
 from documents.models.control import Control
 from documents.models.document_type import DocumentType
 
@@ -61,6 +62,8 @@ class Document(VersionableMixin, BaseModel):
         blank=True,
     )
 
+    objects = DocumentQuerySet.as_manager()
+
     class Meta:
         verbose_name = _("document")
         verbose_name_plural = _("documents")
@@ -71,10 +74,15 @@ class Document(VersionableMixin, BaseModel):
 
     @property
     def last_approved_version(self) -> DocumentVersion | None:
-        return self.versions.approved().order_by("-version").first()
+        return self.get_summary_version(
+            "_prefetched_last_approved_version",
+            self.versions.approved().order_by("-version"),
+        )
 
     @property
     def can_add_new_versions(self) -> bool:
+        if "has_unapproved_versions" in self.__dict__:
+            return not self.has_unapproved_versions
         return not self.versions.not_approved().exists()
 
     @property
@@ -14,6 +14,8 @@ from django.utils.translation import gettext_lazy as _
 
 from base.fields.base import BaseFileField
 from base.models.base_model import BaseModel
+from base.models.file_shasum_mixin import FileShasumMixin
+from base.models.file_shasum_mixin import get_file_shasum
 from base.models.version_mixin import VersionModelBase
 from documents.managers import DocumentVersionQuerySet
 from documents.models.document import Document
@@ -30,7 +32,7 @@ def generate_verification_code():
     return "".join(secrets.choice(alphabet) for _ in range(8))
 
 
-class DocumentVersion(VersionModelBase, BaseModel):
+class DocumentVersion(FileShasumMixin, VersionModelBase, BaseModel):
     document = models.ForeignKey(
         verbose_name=_("document"),
         to=Document,
@@ -99,6 +101,9 @@ class DocumentVersion(VersionModelBase, BaseModel):
         related_name="read_document_versions",
     )
 
+    # the fields the shasum is computed from
+    shasum_fields = ("file", "file_url")
+
     objects = DocumentVersionQuerySet.as_manager()
 
     class Meta:
@@ -127,20 +132,14 @@ class DocumentVersion(VersionModelBase, BaseModel):
     def can_be_updated(self) -> bool:
         return not self.is_approved
 
-    def save(self, *args, **kwargs) -> None:
-        self._set_shasum()
-        return super().save(*args, **kwargs)
-
-    def _set_shasum(self) -> str:
-        self.shasum = (
-            self.get_shasum_of_file() if self.file else self.get_shasum_of_file_url()
-        )
+    def _set_shasum(self) -> None:
+        if not self.file:
+            self.shasum = self.get_shasum_of_file_url()
+        elif self.file_has_changed():
+            self.shasum = self.get_shasum_of_file()
 
     def get_shasum_of_file(self) -> str:
-        sha256 = hashlib.sha256()
-        for chunk in self.file.chunks():
-            sha256.update(chunk)
-        return sha256.hexdigest()
+        return get_file_shasum(self.file)
 
     def get_shasum_of_file_url(self) -> str:
         return hashlib.sha256(self.file_url.encode()).hexdigest()
@@ -151,6 +150,9 @@ class DocumentVersion(VersionModelBase, BaseModel):
     def _get_increment_queryset(self) -> DocumentVersionQuerySet:
         return self.document.versions.all()
 
+    def _get_increment_scope(self) -> str:
+        return str(self.document_id)
+
     def mark_as_approved(self, user: User, form: DocumentVersionApproveForm) -> None:
         update_dict = self.get_approve_update_dict(user, form)
         evidence = Evidence.create_from_form(form)
@@ -176,3 +178,8 @@ class DocumentVersion(VersionModelBase, BaseModel):
         return reverse(
             "documentversion_detail", args=(self.document.code, self.version)
         )
+
+    def get_download_url(self):
+        return reverse(
+            "documentversion_download", args=(self.document.code, self.version)
+        )
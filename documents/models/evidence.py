@@ -13,13 +13,15 @@ from django.utils.translation import gettext_lazy as _
 
 from base.fields.base import BaseFileField
 from base.models.base_model import BaseModel
+from base.models.file_shasum_mixin import FileShasumMixin
+from base.models.file_shasum_mixin import get_file_shasum
 from base.utils import build_absolute_url_wo_req
 
 if TYPE_CHECKING:
     from documents.forms import EvidenceForm
 
 
-class Evidence(BaseModel):
+class Evidence(FileShasumMixin, BaseModel):
     file = BaseFileField(
         verbose_name=_("file"),
         null=True,
@@ -38,6 +40,9 @@ class Evidence(BaseModel):
         max_length=64,
     )
 
+    # the fields the shasum is computed from
+    shasum_fields = ("file", "url")
+
     class Meta:
         verbose_name = _("evidence")
         verbose_name_plural = _("evidences")
@@ -62,20 +67,14 @@ class Evidence(BaseModel):
             return f"Evidence for {self.approved_document_version}"
         return "Evidence"
 
-    def save(self, *args, **kwargs) -> None:
-        self._set_shasum()
-        return super().save(*args, **kwargs)
-
     def _set_shasum(self) -> None:
-        self.shasum = (
-            self.get_shasum_of_file() if self.file else self.get_shasum_of_url()
-        )
+        if not self.file:
+            self.shasum = self.get_shasum_of_url()
+        elif self.file_has_changed():
+            self.shasum = self.get_shasum_of_file()
 
     def get_shasum_of_file(self) -> str:
-        sha256 = hashlib.sha256()
-        for chunk in self.file.chunks():
-            sha256.update(chunk)
-        return sha256.hexdigest()
+        return get_file_shasum(self.file)
 
     def get_shasum_of_url(self) -> str:
         return hashlib.sha256(self.url.encode()).hexdigest()
@@ -83,13 +82,12 @@ class Evidence(BaseModel):
     def get_absolute_url(self) -> str:
         return reverse("evidence_detail", args=(self.pk,))
 
+    def get_download_url(self) -> str:
+        return reverse("evidence_download", args=(self.pk,))
+
     def get_html_content(self) -> str:
         if self.file:
-            url = (
-                build_absolute_url_wo_req(self.file.url)
-                if self.file.url.startswith("/")
-                else self.file.url
-            )
+            url = build_absolute_url_wo_req(self.get_download_url())
             return format_html(
                 '<a target="_blank" href="{}">{}</a>',
                 url,
@@ -103,11 +101,7 @@ class Evidence(BaseModel):
 
     def get_text_content(self) -> str:
         if self.file:
-            url = (
-                build_absolute_url_wo_req(self.file.url)
-                if self.file.url.startswith("/")
-                else self.file.url
-            )
+            url = build_absolute_url_wo_req(self.get_download_url())
             return f"{os.path.basename(self.file.name)} ({url})"
         if self.url:
             return self.url
@@ -1,4 +1,11 @@
+import hashlib
+
+from http import HTTPStatus
+from unittest.mock import patch
+
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.db import IntegrityError
+from django.db.models.fields.files import FieldFile
 
 import pytest
 
@@ -58,3 +65,69 @@ def test_evidence_file_url_or_text_violation_raises(file, url, text):
 def test_evidence_no_file_nor_url_nor_text_raises():
     with pytest.raises(IntegrityError, match=INTEGRITY_ERROR_MSG):
         Evidence.objects.create()
+
+
+@pytest.fixture
+def uploaded_file():
+    uploaded_file = SimpleUploadedFile("evidence.txt", b"evidence content")
+    # as computed by the upload handlers
+    uploaded_file.sha256 = "0" * 64
+    return uploaded_file
+
+
+@pytest.mark.django_db
+def test_evidence_uses_the_shasum_of_the_upload(uploaded_file):
+    evidence = Evidence.objects.create(file=uploaded_file)
+
+    assert evidence.shasum == "0" * 64
+
+
+@pytest.mark.django_db
+def test_shasum_is_only_computed_when_the_file_changes(evidence, django_file):
+    shasum = evidence.shasum
+    assert shasum == hashlib.sha256(django_file.open("rb").read()).hexdigest()
+
+    with patch.object(FieldFile, "chunks", side_effect=AssertionError):
+        evidence.save()
+        Evidence.objects.get(pk=evidence.pk).save()
+        evidence.update(text="")
+
+    evidence.file = SimpleUploadedFile("other.txt", b"other content")
+    evidence.save()
+    assert evidence.shasum == hashlib.sha256(b"other content").hexdigest()
+
+
+@pytest.mark.django_db
+def test_document_version_approval_does_not_read_the_file(document_version):
+    with patch.object(FieldFile, "chunks", side_effect=AssertionError):
+        document_version.update(is_approved=True)
+
+    document_version.update(file_url="https://example.com", file="")
+    assert document_version.shasum == hashlib.sha256(b"https://example.com").hexdigest()
+
+
+@pytest.mark.django_db
+def test_evidence_download(evidence, superuser_client, regular_user_client, settings):
+    settings.DOWNLOADS_X_ACCEL_REDIRECT = True
+    url = evidence.get_download_url()
+
+    response = superuser_client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    assert response["X-Accel-Redirect"] == evidence.file.url
+    assert evidence.get_download_url() in evidence.get_html_content()
+
+    response = regular_user_client.get(url)
+    assert response.status_code == HTTPStatus.FORBIDDEN
+
+
+@pytest.mark.django_db
+def test_document_version_download(document_version, superuser_client):
+    response = superuser_client.get(document_version.get_download_url())
+
+    assert response.status_code == HTTPStatus.OK
+    with document_version.file.open() as stored_file:
+        assert b"".join(response.streaming_content) == stored_file.read()
+
+    document_version.update(file_url="https://example.com", file="")
+    response = superuser_client.get(document_version.get_download_url())
+    assert response.status_code == HTTPStatus.NOT_FOUND
@@ -47,6 +47,11 @@ documentversion_urlpatterns = [
         documentversion_views.DocumentVersionDetailView.as_view(),
         name="documentversion_detail",
     ),
+    path(
+        "<slug:document_code>/V<int:version>/download/",
+        documentversion_views.DocumentVersionDownloadView.as_view(),
+        name="documentversion_download",
+    ),
     path(
         "<slug:document_code>/V<int:version>/update/",
         documentversion_views.DocumentVersionUpdateView.as_view(),
@@ -130,7 +135,12 @@ evidence_urlpatterns = [
         "<int:pk>/",
         evidence_views.EvidenceDetailView.as_view(),
         name="evidence_detail",
-    )
+    ),
+    path(
+        "<int:pk>/download/",
+        evidence_views.EvidenceDownloadView.as_view(),
+        name="evidence_download",
+    ),
 ]
 
 documenttype_urlpatterns = [
@@ -9,8 +9,10 @@ from documents.models.document import Document
 
 class DocumentListView(BaseListView):
     model = Document
+    queryset = Document.objects.with_version_summary()
     template_name = "documents/document/list.html"
     permission_required = "documents.view_document"
+    filterset = {"document_type": ("exact",)}
 
 
 class DocumentCreateView(BaseCreateView):
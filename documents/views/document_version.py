@@ -5,6 +5,7 @@ from django.http import HttpResponseRedirect
 from django.utils.translation import gettext as _
 
 from base.views.generic.detail import BaseDetailView
+from base.views.generic.detail import BaseDownloadView
 from base.views.generic.edit import BaseDeleteView
 from base.views.generic.edit import BaseSubModelCreateView
 from base.views.generic.edit import BaseUpdateRedirectView
@@ -69,6 +70,11 @@ class DocumentVersionDetailView(DocumentVersionGetObjectMixin, BaseDetailView):
         }
 
 
+class DocumentVersionDownloadView(DocumentVersionGetObjectMixin, BaseDownloadView):
+    model = DocumentVersion
+    permission_required = "documents.view_documentversion"
+
+
 class DocumentVersionUpdateView(DocumentVersionGetObjectMixin, BaseUpdateView):
     model = DocumentVersion
     form_class = DocumentVersionForm
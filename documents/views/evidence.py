@@ -1,4 +1,5 @@
 from base.views.generic.detail import BaseDetailView
+from base.views.generic.detail import BaseDownloadView
 from documents.models.evidence import Evidence
 
 
@@ -6,3 +7,8 @@ class EvidenceDetailView(BaseDetailView):
     model = Evidence
     template_name = "documents/evidence/detail.html"
     permission_required = "documents.view_evidence"
+
+
+class EvidenceDownloadView(BaseDownloadView):
+    model = Evidence
+    permission_required = "documents.view_evidence"
@@ -1,7 +1,7 @@
-from django.db import models
+from base.managers import BaseQuerySet
 
 
-class AssetQuerySet(models.QuerySet):
+class AssetQuerySet(BaseQuerySet):
     def archived(self):
         return self.filter(is_archived=True)
 
@@ -1,3 +1,5 @@
+from django.utils.translation import gettext_lazy as _
+
 from base.views.generic import BaseCreateView
 from base.views.generic import BaseDetailView
 from base.views.generic import BaseListView
@@ -12,6 +14,27 @@ class AssetListView(BaseListView):
     model = Asset
     template_name = "information_assets/asset/list.html"
     permission_required = "information_assets.view_asset"
+    filterset = {"owner": ("exact",), "is_archived": ("exact",)}
+    orderable_fields = (
+        "code",
+        "name",
+        "owner",
+        "criticality",
+        "classification",
+        "is_archived",
+        "updated_at",
+        "updated_by",
+    )
+    export_fields = (
+        "code",
+        "name",
+        "description",
+        ("owner__email", _("owner")),
+        "criticality",
+        "classification",
+        "is_archived",
+        "updated_at",
+    )
 
 
 class AssetCreateView(BaseCreateView):
@@ -27,8 +27,11 @@ def parameter_definition_with_validators() -> ParameterDefinition:
 
 @pytest.fixture
 def set_parameter_test_definition_with_validators(parameter_definition_with_validators):
+    definitions = ParameterDefinitionList.definitions
     cache.delete(Parameter.cache_key(parameter_definition_with_validators.name))
     ParameterDefinitionList.definitions = [parameter_definition_with_validators]
+    yield
+    ParameterDefinitionList.definitions = definitions
 
 
 @pytest.fixture
@@ -43,5 +46,8 @@ def parameter_definition() -> ParameterDefinition:
 
 @pytest.fixture
 def set_parameter_test_definition(parameter_definition):
+    definitions = ParameterDefinitionList.definitions
     cache.delete(Parameter.cache_key(parameter_definition.name))
     ParameterDefinitionList.definitions = [parameter_definition]
+    yield
+    ParameterDefinitionList.definitions = definitions
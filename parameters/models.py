@@ -89,7 +89,7 @@ class Parameter(BaseModel):
             parameter = Parameter.objects.get(name=name)
         except Parameter.DoesNotExist:
             parameter = Parameter.create_parameter(name)
-        parameter.store_in_cache()
+        parameter.store_in_cache(only_if_missing=True)
         return parameter.value
 
     @classmethod
@@ -122,10 +122,16 @@ class Parameter(BaseModel):
         super().save(*args, **kwargs)
         self.store_in_cache()
 
-    def store_in_cache(self):
+    def store_in_cache(self, only_if_missing=False):
+        """
+        Store the value in the cache, or only fill it `only_if_missing`, after
+        a miss, to not replace a value saved meanwhile nor invalidate the local
+        values of the two-tier cache.
+        """
         cache_key = Parameter.cache_key(self.name)
+        store = cache.add if only_if_missing else cache.set
 
-        cache.set(
+        store(
             cache_key,
             json.dumps([self.raw_value, self.kind]),
             self.cache_seconds,  # the time in seconds to store the value
@@ -4,11 +4,14 @@ from typing import TYPE_CHECKING
 
 from django.db import models
 
+from base.managers import BaseQuerySet
+from base.managers import VersionableQuerySet
+
 if TYPE_CHECKING:
     from users.models.user import User
 
 
-class ProcessQuerySet(models.QuerySet):
+class ProcessQuerySet(VersionableQuerySet):
     def instantiable_by_user(self, user: User):
         return self.filter(
             versions__is_published=True,
@@ -16,8 +19,27 @@ class ProcessQuerySet(models.QuerySet):
             versions__activities__assignee_groups__user=user,
         ).distinct()
 
+    def with_version_summary(self):
+        versions = self.get_versions_manager()
+        return (
+            super()
+            .with_version_summary()
+            .prefetch_related(
+                models.Prefetch(
+                    "versions",
+                    queryset=versions.published().order_by("-version")[:1],
+                    to_attr="_prefetched_last_published_version",
+                )
+            )
+            .annotate(
+                has_unpublished_versions=models.Exists(
+                    versions.not_published().filter(process=models.OuterRef("pk"))
+                )
+            )
+        )
+
 
-class ProcessVersionQuerySet(models.QuerySet):
+class ProcessVersionQuerySet(BaseQuerySet):
     def published(self):
         return self.filter(is_published=True)
 
@@ -25,7 +47,7 @@ class ProcessVersionQuerySet(models.QuerySet):
         return self.filter(is_published=False)
 
 
-class ProcessInstanceQuerySet(models.QuerySet):
+class ProcessInstanceQuerySet(BaseQuerySet):
     def completed(self):
         return self.filter(is_completed=True)
 
@@ -36,7 +58,7 @@ class ProcessInstanceQuerySet(models.QuerySet):
         return self.filter(activity_instances__assignee=user).distinct()
 
 
-class ProcessActivityInstanceQuerySet(models.QuerySet):
+class ProcessActivityInstanceQuerySet(BaseQuerySet):
     def completed(self):
         return self.filter(is_completed=True)
 
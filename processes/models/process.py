@@ -28,10 +28,15 @@ class Process(VersionableMixin, BaseModel):
 
     @property
     def last_published_version(self) -> ProcessVersion | None:
-        return self.versions.published().order_by("-version").first()
+        return self.get_summary_version(
+            "_prefetched_last_published_version",
+            self.versions.published().order_by("-version"),
+        )
 
     @property
     def can_add_new_versions(self) -> bool:
+        if "has_unpublished_versions" in self.__dict__:
+            return not self.has_unpublished_versions
         return not self.versions.not_published().exists()
 
     def __str__(self):
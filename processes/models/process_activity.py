@@ -58,6 +58,9 @@ class ProcessActivity(IncrementFieldModelBase, BaseModel):
     def _get_increment_queryset(self) -> models.QuerySet[ProcessActivity]:
         return self.process_version.activities.all()
 
+    def _get_increment_scope(self) -> str:
+        return str(self.process_version_id)
+
     def _get_field_to_increment(self) -> str:
         return "order"
 
@@ -15,6 +15,7 @@ from documents.models.document import Document
 from processes.enums import TimeFrameChoices
 from processes.managers import ProcessVersionQuerySet
 from processes.models.process import Process
+from processes.models.process_activity import ProcessActivity
 
 if TYPE_CHECKING:
     from processes.models.process_instance import ProcessInstance
@@ -97,16 +98,32 @@ class ProcessVersion(VersionModelBase, BaseModel):
     ) -> None:
         if not adding or previous_version is None:
             return
-        for activity in previous_version.activities.all():
-            assignee_groups = tuple(activity.assignee_groups.all())
+        activities = list(
+            previous_version.activities.prefetch_related("assignee_groups")
+        )
+        assignee_groups = [
+            list(activity.assignee_groups.all()) for activity in activities
+        ]
+        for activity in activities:
             activity.pk = None
             activity.process_version = self
-            activity.save()
-            activity.assignee_groups.set(assignee_groups)
+        # numbered in the order of the previous version
+        ProcessActivity.assign_increments(activities)
+        ProcessActivity.objects.audited_bulk_create(activities)
+
+        through = ProcessActivity.assignee_groups.through
+        through.objects.bulk_create(
+            through(processactivity_id=activity.pk, group_id=group.pk)
+            for activity, groups in zip(activities, assignee_groups, strict=True)
+            for group in groups
+        )
 
     def _get_increment_queryset(self) -> models.QuerySet[ProcessVersion]:
         return self.process.versions.all()
 
+    def _get_increment_scope(self) -> str:
+        return str(self.process_id)
+
     def create_first_activity_instance(self, process_instance: ProcessInstance) -> None:
         if self.activities.exists():
             self.activities.earliest("order").create_instance(process_instance)
@@ -9,6 +9,7 @@ from processes.models.process import Process
 
 class ProcessListView(BaseListView):
     model = Process
+    queryset = Process.objects.with_version_summary()
     template_name = "processes/process/list.html"
     permission_required = "processes.view_process"
 
@@ -1,5 +1,7 @@
 from typing import Any
 
+from django.utils.translation import gettext_lazy as _
+
 from base.views.generic import BaseCreateView
 from base.views.generic import BaseDeleteView
 from base.views.generic import BaseDetailView
@@ -14,6 +16,18 @@ class ProcessInstanceListView(BaseListView):
     model = ProcessInstance
     template_name = "processes/processinstance/list.html"
     permission_required = "processes.view_processinstance"
+    keyset_pagination = True
+    filterset = {"process_version__process": ("exact",), "is_completed": ("exact",)}
+    export_fields = (
+        ("process_version__process__name", _("process")),
+        ("process_version__version", _("version")),
+        "comment",
+        "created_at",
+        ("created_by__email", _("created by")),
+        "is_completed",
+        "completed_at",
+    )
+    estimate_count_threshold = 100_000
 
 
 class ProcessInstanceCreateView(BaseCreateView):
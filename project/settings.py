@@ -112,10 +112,12 @@ INSTALLED_APPS = [
     "information_assets.apps.InformationAssetsConfig",
     "risks.apps.RisksConfig",
     "processes.apps.ProcessesConfig",
+    "audit.apps.AuditConfig",
 ]
 
 MIDDLEWARE = [
     "base.middleware.ReadinessCheckMiddleware",
+    "base.middleware.QueryBudgetMiddleware",
     "xff.middleware.XForwardedForMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -157,6 +159,29 @@ if ENABLE_DEBUG_TOOLBAR:
         "debug_toolbar.panels.profiling.ProfilingPanel",
     ]
 
+# Seconds the result of the /_ready/ checks is cached for, in the default cache,
+# and seconds each check of a service may take
+READINESS_CACHE_TTL = int(
+    get_env_value("READINESS_CACHE_TTL", default=5, default_if_blank=True)
+)
+READINESS_CHECK_TIMEOUT = float(
+    get_env_value("READINESS_CHECK_TIMEOUT", default=2, default_if_blank=True)
+)
+
+# Fraction of the requests whose queries are checked against the budget of their
+# view, see base/query_budget.py
+QUERY_BUDGET_SAMPLE_RATE = float(
+    get_env_value("QUERY_BUDGET_SAMPLE_RATE", default=0, default_if_blank=True)
+)
+QUERY_BUDGETS_FILE = BASE_DIR / "query_budgets.json"
+
+# Record the relations views access in their fetch plans, see base/fetch_plans.py
+FETCH_PLANS_FILE = BASE_DIR / "fetch_plans.json"
+RECORD_FETCH_PLANS = DEBUG and get_bool_from_env("RECORD_FETCH_PLANS", False)
+
+if RECORD_FETCH_PLANS:
+    MIDDLEWARE.append("base.middleware.FetchPlanRecordMiddleware")
+
 if find_spec("django_extensions"):
     ENABLE_DJANGO_EXTENSIONS = get_bool_from_env("ENABLE_DJANGO_EXTENSIONS", False)
 else:
@@ -193,7 +218,10 @@ WSGI_APPLICATION = "project.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
-DATABASE_ROUTERS = ["api_client.db_router.ClientLogDbRouter"]
+DATABASE_ROUTERS = [
+    "audit.db_router.AuditLogDbRouter",
+    "api_client.db_router.ClientLogDbRouter",
+]
 
 DATABASES = {
     "default": {
@@ -342,7 +370,7 @@ if AWS_STORAGE_BUCKET_NAME:
             "BACKEND": "project.storage_backends.S3StaticStorage",
         },
         "default": {
-            "BACKEND": "project.storage_backends.S3MediaStorage",
+            "BACKEND": "project.storage_backends.ContentAddressedS3MediaStorage",
         },
     }
 
@@ -353,6 +381,36 @@ else:
     MEDIA_ROOT = PROJECT_DIR / "media"
     MEDIA_URL = "/media/"
 
+    STORAGES = {
+        "staticfiles": {
+            "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
+        },
+        "default": {
+            "BACKEND": "base.storage.ContentAddressedFileSystemStorage",
+        },
+    }
+
+# File uploads
+# Uploaded files are hashed while they are received, see base.upload_handlers
+FILE_UPLOAD_HANDLERS = [
+    "base.upload_handlers.HashingMemoryFileUploadHandler",
+    "base.upload_handlers.HashingTemporaryFileUploadHandler",
+]
+
+# Large files are uploaded by the browser straight to the storage, in parts,
+# see base.direct_uploads
+DIRECT_UPLOAD_PART_SIZE = int(os.getenv("DIRECT_UPLOAD_PART_SIZE", str(16 * 2**20)))
+DIRECT_UPLOAD_MAX_SIZE = int(os.getenv("DIRECT_UPLOAD_MAX_SIZE", str(5 * 2**30)))
+DIRECT_UPLOAD_URL_EXPIRATION = 60 * 60
+
+# Local media is sent by nginx after the download views check the permissions,
+# see base.downloads
+DOWNLOADS_X_ACCEL_REDIRECT = get_bool_from_env("DOWNLOADS_X_ACCEL_REDIRECT", False)
+
+# Number of files hashed at the same time by the integrity checks, see
+# base.integrity
+INTEGRITY_CHECK_WORKERS = int(os.getenv("INTEGRITY_CHECK_WORKERS", "4"))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
 
@@ -519,9 +577,46 @@ LOG_IGNORE_FIELDS = [
     "last_login",
 ]
 
+# Write the logs from a celery worker instead of at the end of each transaction
+LOG_ASYNC_WRITES = get_bool_from_env("LOG_ASYNC_WRITES", False)
+
+# Audit snapshots keep every object every AUDIT_FULL_SNAPSHOT_DAYS days, and
+# only the changed ones in between. The snapshots older than
+# AUDIT_SNAPSHOT_RETENTION_DAYS are deleted by the daily snapshot task.
+AUDIT_FULL_SNAPSHOT_DAYS = int(
+    get_env_value("AUDIT_FULL_SNAPSHOT_DAYS", default=30, default_if_blank=True)
+)
+AUDIT_SNAPSHOT_RETENTION_DAYS = int(
+    get_env_value("AUDIT_SNAPSHOT_RETENTION_DAYS", default=365, default_if_blank=True)
+)
+
 # Cache
 # https://docs.djangoproject.com/en/3.2/topics/cache/#setting-up-the-cache
-if os.environ.get("CACHE_URL"):
+# Keys with these prefixes are also kept for CACHE_LOCAL_TIMEOUT seconds in an
+# in-process LRU of CACHE_LOCAL_MAX_ENTRIES entries, 0 disables it
+CACHE_LOCAL_KEY_PREFIXES = ["parameters-"]
+CACHE_LOCAL_MAX_ENTRIES = int(
+    get_env_value("CACHE_LOCAL_MAX_ENTRIES", default=1000, default_if_blank=True)
+)
+CACHE_LOCAL_TIMEOUT = int(
+    get_env_value("CACHE_LOCAL_TIMEOUT", default=5, default_if_blank=True)
+)
+
+if os.environ.get("CACHE_URL") and CACHE_LOCAL_MAX_ENTRIES:
+    CACHES = {
+        "default": {
+            "BACKEND": "base.cache.TwoTierCache",
+            "LOCATION": os.environ.get("CACHE_URL"),
+            "OPTIONS": {
+                "REMOTE_BACKEND": "django_redis.cache.RedisCache",
+                "LOCAL_KEY_PREFIXES": CACHE_LOCAL_KEY_PREFIXES,
+                "LOCAL_MAX_ENTRIES": CACHE_LOCAL_MAX_ENTRIES,
+                "LOCAL_TIMEOUT": CACHE_LOCAL_TIMEOUT,
+                "GENERATION_CHECK_INTERVAL": 1,
+            },
+        },
+    }
+elif os.environ.get("CACHE_URL"):
     CACHES = {
         "default": {
             "BACKEND": "django_redis.cache.RedisCache",
@@ -535,6 +630,20 @@ else:
         },
     }
 
+# Seconds the values cached with base.cache_keys are kept after their
+# dependencies change, they are invalidated by the model signals before that
+FRAGMENT_CACHE_TIMEOUT = 60 * 60 * 24
+# Models the values cached with base.cache_keys depend on, only their changes
+# invalidate cached values
+FRAGMENT_CACHE_DEPENDENCIES = [
+    "documents.Control",
+    "documents.Evidence",
+    "processes.ProcessActivityInstance",
+    "processes.ProcessInstance",
+    "processes.ProcessVersion",
+    "users.User",
+]
+
 # HTTPS
 # https://docs.djangoproject.com/en/3.2/ref/settings/#secure-proxy-ssl-header
 
@@ -590,6 +699,18 @@ CELERY_BEAT_SCHEDULE = {
         "task": "api_client.tasks.client_log_cleanup",
         "schedule": crontab(0, 0, day_of_month="1"),
     },
+    "monthly-audit-log-partitions": {
+        "task": "audit.tasks.create_audit_log_partitions",
+        "schedule": crontab(0, 0, day_of_month="1"),
+    },
+    "daily-audit-snapshots": {
+        "task": "audit.tasks.take_audit_snapshots",
+        "schedule": crontab(0, 3),
+    },
+    "weekly-file-integrity-check": {
+        "task": "base.tasks.verify_stored_files",
+        "schedule": crontab(0, 4, day_of_week="sunday"),
+    },
 }
 """
 More examples:
@@ -3,6 +3,8 @@ from django.conf import settings
 
 from storages.backends import s3boto3
 
+from base.storage import ContentAddressedStorageMixin
+
 
 class S3StaticStorage(s3boto3.S3StaticStorage):
     location = "static"
@@ -41,3 +43,7 @@ class S3MediaStorage(s3boto3.S3Boto3Storage):
     # example a.jpg, this setting prevents it by uploading the new one with name
     # a_K7dJ7Ys.jpg
     file_overwrite = False
+
+
+class ContentAddressedS3MediaStorage(ContentAddressedStorageMixin, S3MediaStorage):
+    pass
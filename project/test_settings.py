@@ -26,6 +26,9 @@ CACHES = {
 # and pytest overrides are applied after
 ENABLE_DEBUG_TOOLBAR = False
 
+# Record the queries of every request, the urls test checks them
+QUERY_BUDGET_SAMPLE_RATE = 1
+
 DJANGO_AUTH_ENABLED = True
 USER_REGISTRATION_ENABLED = True
 
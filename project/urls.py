@@ -21,10 +21,30 @@ from django.urls import include
 from django.urls import path
 
 from base.views import debug as debug_views
+from base.views import direct_uploads as direct_upload_views
 from base.views import misc as misc_views
 
 debug_patterns = [
     path("request/", debug_views.HttpRequestPrintView.as_view(), name="debug-request"),
+    path("cache/", debug_views.CacheStatsView.as_view(), name="debug-cache"),
+]
+
+direct_upload_patterns = [
+    path(
+        "",
+        direct_upload_views.DirectUploadStartView.as_view(),
+        name="direct-upload-start",
+    ),
+    path(
+        "complete/",
+        direct_upload_views.DirectUploadCompleteView.as_view(),
+        name="direct-upload-complete",
+    ),
+    path(
+        "parts/<str:token>/",
+        direct_upload_views.DirectUploadPartView.as_view(),
+        name="direct-upload-part",
+    ),
 ]
 
 urlpatterns = [
@@ -32,6 +52,7 @@ urlpatterns = [
     path("admin/", admin.site.urls),
     path("", include("users.urls")),
     path("debug/", include(debug_patterns)),
+    path("uploads/", include(direct_upload_patterns)),
     path("regions/", include("regions.urls")),
     path("status/", misc_views.StatusView.as_view(), name="status"),
     path("api/v1/", include("dummy_app.urls")),
@@ -1,8 +1,11 @@
+from django.utils.translation import gettext_lazy as _
+
 from base.views.generic import BaseCreateView
 from base.views.generic import BaseDeleteView
 from base.views.generic import BaseDetailView
 from base.views.generic import BaseListView
 from base.views.generic import BaseUpdateView
+from users.models.user import User
 
 from ..forms import RiskForm
 from ..models.risk import Risk
@@ -12,6 +15,23 @@ class RiskListView(BaseListView):
     model = Risk
     template_name = "risks/risk/list.html"
     permission_required = "risks.view_risk"
+    filterset = {"responsible": ("exact",)}
+    row_columns = {
+        "title": "title",
+        "updated_at": "updated_at",
+        "updated_by__get_label": User.get_label_expression("updated_by"),
+    }
+    row_str_column = "title"
+    row_url_name = "risk_detail"
+    export_fields = (
+        "title",
+        "description",
+        ("responsible__email", _("responsible")),
+        "severity",
+        "likelihood",
+        "treatment",
+        "updated_at",
+    )
 
 
 class RiskCreateView(BaseCreateView):
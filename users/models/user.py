@@ -13,6 +13,11 @@ from django.contrib.auth.tokens import default_token_generator
 from django.contrib.sessions.models import Session
 from django.contrib.sites.shortcuts import get_current_site
 from django.db import models
+from django.db.models import Case
+from django.db.models import Value
+from django.db.models import When
+from django.db.models.functions import Concat
+from django.db.models.functions import Trim
 from django.template import loader
 from django.urls import reverse
 from django.utils import timezone
@@ -168,6 +173,26 @@ class User(AbstractBaseUser, PermissionsMixin, BaseModel):
     def get_label(self):
         return f"{self.get_full_name()} ({self.email})"
 
+    @staticmethod
+    def get_label_expression(relation):
+        """
+        Return an expression with the `get_label` of the user at the end of
+        the `relation` lookup path, to compute it in the database.
+        """
+        first_name, last_name, email = (
+            f"{relation}__{name}" for name in ("first_name", "last_name", "email")
+        )
+        return Case(
+            When(**{f"{relation}__isnull": True}, then=Value(None)),
+            default=Concat(
+                Trim(Concat(first_name, Value(" "), last_name)),
+                Value(" ("),
+                email,
+                Value(")"),
+            ),
+            output_field=models.CharField(),
+        )
+
     def get_instantiable_processes(self) -> ProcessQuerySet:
         from processes.models.process import Process
 
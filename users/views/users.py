@@ -183,6 +183,16 @@ class UserListView(BaseListView):
     template_name = "users/list.html"
     permission_required = "users.view_user"
     ordering = ("first_name", "last_name")
+    orderable_fields = ("first_name", "email", "is_active")
+    export_fields = (
+        "first_name",
+        "last_name",
+        "email",
+        "is_active",
+        "is_staff",
+        "date_joined",
+        "last_login",
+    )
 
     def get_queryset(self):
         queryset = super().get_queryset()